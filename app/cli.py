@@ -0,0 +1,58 @@
+"""
+Management commands.
+
+Usage:
+  python -m app.cli migrate [revision]   # apply migrations (default: head)
+  python -m app.cli init-db              # migrate to head and ensure the default admin
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+from app.core.config import logger, settings
+from app.db import ensure_default_admin, init_lock, migrate
+
+
+def migrate_database(revision: str = "head", *, ensure_admin: bool = False) -> None:
+    """Run migrations under the init lock; concurrent callers wait, then find nothing to do."""
+    started = time.perf_counter()
+    with init_lock():
+        migrate(revision)
+        if ensure_admin:
+            ensure_default_admin()
+    logger.info(
+        "Database migrated to %s in %.0f ms (env=%s)",
+        revision,
+        (time.perf_counter() - started) * 1000,
+        settings.ENVIRONMENT,
+    )
+
+
+def init_database() -> None:
+    """Bring the schema to head and make sure the default admin exists."""
+    migrate_database(ensure_admin=True)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Todo app management commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = commands.add_parser("migrate", help="Apply Alembic migrations")
+    migrate_parser.add_argument("revision", nargs="?", default="head")
+    commands.add_parser("init-db", help="Migrate to head and ensure the default admin user")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "migrate":
+            migrate_database(args.revision)
+        else:
+            init_database()
+    except Exception:
+        logger.exception("Database %s failed", args.command)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
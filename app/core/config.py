@@ -40,6 +40,28 @@ class Settings(BaseSettings):
         "sqlite:///./todo.db"  # Default to SQLite for local dev
     )
     
+    # Connection pool (ignored for in-memory SQLite)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    DB_POOL_PRE_PING: bool = _env_bool("DB_POOL_PRE_PING", True)
+    # PostgreSQL only; 0 leaves the server default in place
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+    # Run migrations and ensure the default admin when an app process starts.
+    # gunicorn.conf.py does this once before forking and turns it off for workers.
+    DB_INIT_ON_STARTUP: bool = _env_bool("DB_INIT_ON_STARTUP", True)
+    # Rows per committed batch in data migrations
+    DB_MIGRATION_BATCH_SIZE: int = int(os.getenv("DB_MIGRATION_BATCH_SIZE", "1000"))
+
+    # SQLite tuning applied to every new file-backed connection
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    # Negative values are KiB, positive values are pages (SQLite semantics)
+    SQLITE_CACHE_SIZE: int = int(os.getenv("SQLITE_CACHE_SIZE", "-20000"))
+
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "dev-secret-key-change-in-production")
     
@@ -67,9 +89,54 @@ class Settings(BaseSettings):
     # Reminder scheduler
     REMINDER_ENABLED: bool = _env_bool("REMINDER_ENABLED", True)
     REMINDER_LEAD_MINUTES: int = int(os.getenv("REMINDER_LEAD_MINUTES", "30"))
-    REMINDER_CHECK_INTERVAL_SECONDS: int = int(os.getenv("REMINDER_CHECK_INTERVAL_SECONDS", "60"))
+    # Reconciliation sweep interval; due reminders are woken up by deadline, not by this poll
+    REMINDER_CHECK_INTERVAL_SECONDS: int = int(os.getenv("REMINDER_CHECK_INTERVAL_SECONDS", "300"))
     REMINDER_GRACE_PERIOD_MINUTES: int = int(os.getenv("REMINDER_GRACE_PERIOD_MINUTES", "5"))
     REMINDER_MAX_LEAD_MINUTES: int = int(os.getenv("REMINDER_MAX_LEAD_MINUTES", "240"))
+    REMINDER_SEND_CONCURRENCY: int = int(os.getenv("REMINDER_SEND_CONCURRENCY", "4"))
+    # Resend accepts up to 100 messages per batch call; 1 disables the batch API
+    REMINDER_BATCH_SIZE: int = int(os.getenv("REMINDER_BATCH_SIZE", "50"))
+    REMINDER_SEND_MAX_RETRIES: int = int(os.getenv("REMINDER_SEND_MAX_RETRIES", "3"))
+    REMINDER_RETRY_BACKOFF_SECONDS: float = float(os.getenv("REMINDER_RETRY_BACKOFF_SECONDS", "1.0"))
+    # Rows claimed per tick and how long a claim blocks other workers/nodes
+    REMINDER_CLAIM_LIMIT: int = int(os.getenv("REMINDER_CLAIM_LIMIT", "500"))
+    REMINDER_CLAIM_LEASE_SECONDS: int = int(os.getenv("REMINDER_CLAIM_LEASE_SECONDS", "600"))
+
+    # Upper bound on operations accepted by POST /api/v1/todos/batch
+    TODO_BATCH_MAX_ITEMS: int = int(os.getenv("TODO_BATCH_MAX_ITEMS", "500"))
+
+    # GET /api/v1/todos/changes never moves a client's watermark past rows
+    # younger than this: updated_at is stamped before commit, so a slower
+    # transaction can still commit an older stamp. Must exceed the longest
+    # write transaction; rows inside the window are re-served.
+    CHANGES_SAFETY_LAG_SECONDS: float = float(os.getenv("CHANGES_SAFETY_LAG_SECONDS", "30"))
+
+    # Live todo events (GET /api/v1/todos/stream): "local" delivers within this
+    # worker only, "postgres" fans out to every worker via LISTEN/NOTIFY
+    TODO_EVENTS_BACKEND: str = os.getenv("TODO_EVENTS_BACKEND", "local").lower()
+    SSE_MAX_CONNECTIONS: int = int(os.getenv("SSE_MAX_CONNECTIONS", "200"))
+    SSE_QUEUE_SIZE: int = int(os.getenv("SSE_QUEUE_SIZE", "100"))
+    SSE_HEARTBEAT_SECONDS: float = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+    # Authenticated-user cache (per process); a TTL of 0 disables it
+    USER_CACHE_TTL_SECONDS: int = int(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+    USER_CACHE_MAX_SIZE: int = int(os.getenv("USER_CACHE_MAX_SIZE", "2048"))
+
+    # Password hashing: pbkdf2_sha256 cost, and the pool that runs it off the
+    # request threads (total pending and per-endpoint caps answer 503 when hit);
+    # PASSWORD_HASH_MAX_PENDING also caps queued rehash-on-login jobs
+    PASSWORD_HASH_ROUNDS: int = int(os.getenv("PASSWORD_HASH_ROUNDS", "29000"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "16"))
+    PASSWORD_HASH_ENDPOINT_CONCURRENCY: int = int(os.getenv("PASSWORD_HASH_ENDPOINT_CONCURRENCY", "8"))
+
+    # Decoded-JWT cache (per process); entries never outlive the token's exp
+    TOKEN_CACHE_TTL_SECONDS: int = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", "1800"))
+    TOKEN_CACHE_MAX_SIZE: int = int(os.getenv("TOKEN_CACHE_MAX_SIZE", "4096"))
+
+    # Internal metrics endpoints (/internal/*) answer 403 until this is set;
+    # callers then send "Authorization: Bearer <token>"
+    INTERNAL_METRICS_TOKEN: str | None = os.getenv("INTERNAL_METRICS_TOKEN")
 
     @field_validator("ALLOWED_HOSTS", mode="before")
     def _split_hosts(cls, value):
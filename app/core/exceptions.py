@@ -54,7 +54,20 @@ class AuthenticationError(AppError):
 
 
 class EmailError(AppError):
-    """Raised when outbound email sending fails."""
+    """Raised when outbound email sending fails.
 
-    def __init__(self, message: str = "Email delivery failed"):
+    ``rejected`` is set only when the provider answered and refused the
+    request, i.e. nothing was sent; timeouts and server errors leave it unset.
+    """
+
+    def __init__(self, message: str = "Email delivery failed", *, rejected: bool = False):
         super().__init__(message, code="email_error")
+        self.rejected = rejected
+
+
+class ServiceBusyError(AppError):
+    """Raised when a bounded resource is exhausted and the caller should retry later."""
+
+    def __init__(self, message: str = "Service busy", *, retry_after: Optional[int] = None):
+        super().__init__(message, code="service_busy")
+        self.retry_after = retry_after
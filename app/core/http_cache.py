@@ -0,0 +1,59 @@
+"""Conditional GET support: strong ETags and ``If-None-Match`` handling.
+
+Validators are derived from a per-user change stamp (the owner's latest todo
+``updated_at``, which every create, edit and delete moves), so a revalidation
+costs one index lookup instead of the full query and render. While that
+stamp is younger than ``CHANGES_SAFETY_LAG_SECONDS`` it is not trusted (see
+``TodoService.change_stamp``) and nothing revalidates.
+"""
+from __future__ import annotations
+
+from hashlib import sha256
+from pathlib import Path
+from typing import Iterable, Optional
+
+from starlette.responses import Response
+
+# JSON API responses: stored per user, revalidated on every use
+API_CACHE_CONTROL = "private, no-cache"
+# Cookie-authenticated HTML pages: never shared, always revalidated
+PAGE_CACHE_CONTROL = "private, no-cache, must-revalidate"
+
+
+def make_etag(*parts: object) -> str:
+    """Strong ETag over ``parts``; any part changing yields a new tag."""
+    digest = sha256("\x1f".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """``If-None-Match`` check using the weak comparison RFC 9110 prescribes for it."""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def apply_validators(response: Response, etag: str, cache_control: str, vary: str) -> Response:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    response.headers["Vary"] = vary
+    return response
+
+
+def not_modified(etag: str, cache_control: str, vary: str) -> Response:
+    return apply_validators(Response(status_code=304), etag, cache_control, vary)
+
+
+def fingerprint_files(paths: Iterable[Path]) -> str:
+    """Short hash of file names, sizes and mtimes, e.g. to tie page ETags to a deploy."""
+    stats = []
+    for path in sorted(paths):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        stats.append(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}")
+    return sha256("|".join(stats).encode()).hexdigest()[:12]
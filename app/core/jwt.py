@@ -3,16 +3,24 @@ from typing import Optional
 from jose import JWTError, jwt
 import hashlib
 import secrets
+import time
 from passlib.context import CryptContext
 from passlib.exc import UnknownHashError
 
+from app.core.cache import token_cache
 from app.core.config import settings
 
 # Configuration
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["pbkdf2_sha256"],
+    deprecated="auto",
+    pbkdf2_sha256__rounds=settings.PASSWORD_HASH_ROUNDS,
+)
+# Clock for the token-cache expiry check; tests patch this rather than time.time
+_now = time.time
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -23,6 +31,13 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     except (ValueError, UnknownHashError):
         return _verify_legacy_password(plain_password, hashed_password)
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True for legacy ``salt$hex`` hashes and for hashes made with outdated settings (e.g. rounds)."""
+    try:
+        return pwd_context.needs_update(hashed_password)
+    except (ValueError, UnknownHashError):
+        return True
+
 def _verify_legacy_password(plain_password: str, hashed_password: str) -> bool:
     try:
         salt, hashed = hashed_password.split('$')
@@ -43,10 +58,35 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 def decode_token(token: str) -> Optional[str]:
+    """Subject of a valid token, or None.
+
+    Verified tokens are cached until their ``exp`` (bounded by the cache TTL),
+    so repeat requests skip the HMAC check and JSON parsing. Invalid tokens
+    are never cached.
+    """
+    cached = token_cache.get(token)
+    if cached is not None:
+        email, expires_at = cached
+        if expires_at > _now():
+            return email
+        token_cache.delete(token)
+        return None
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        return email
     except JWTError:
         return None
+    email: str = payload.get("sub")
+    expires_at = payload.get("exp")
+    if email and isinstance(expires_at, (int, float)):
+        token_cache.set(token, (email, expires_at), ttl=expires_at - _now())
+    return email
+
+def decode_request_token(request, token: str) -> Optional[str]:
+    """``decode_token`` memoized on ``request.state`` for the rest of the request."""
+    decoded = getattr(request.state, "decoded_tokens", None)
+    if decoded is None:
+        decoded = request.state.decoded_tokens = {}
+    if token not in decoded:
+        decoded[token] = decode_token(token)
+    return decoded[token]
 
@@ -0,0 +1,115 @@
+"""Bounded worker pool for password hashing and verification.
+
+pbkdf2 is deliberately slow. Run inline, a burst of logins occupies every
+request thread and stalls unrelated routes. Hashes instead run on a few
+dedicated threads; ``hashlib.pbkdf2_hmac`` releases the GIL, so they proceed
+in parallel without the pickling and fork-safety costs of a process pool.
+Admission is bounded in total and per endpoint. Past either limit the caller
+gets ``ServiceBusyError`` (503) straight away instead of queueing.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Callable, Optional, TypeVar
+import time
+
+from app.core.config import settings
+from app.core.exceptions import ServiceBusyError
+
+T = TypeVar("T")
+
+
+class PasswordHashPool:
+    def __init__(self, *, workers: int, max_pending: int, endpoint_limit: int) -> None:
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.endpoint_limit = max(1, endpoint_limit)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = Lock()
+        self._pending = 0
+        self._running = 0
+        self._per_endpoint: dict[str, int] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.completed = 0
+            self.rejected: dict[str, int] = {}
+            self.max_queued = 0
+            self._wait_total = 0.0
+            self._wait_max = 0.0
+            self._run_total = 0.0
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hash"
+                )
+            return self._executor
+
+    def run(self, endpoint: str, fn: Callable[..., T], *args) -> T:
+        """Run ``fn(*args)`` on the pool and wait for it, or refuse if saturated."""
+        with self._lock:
+            in_endpoint = self._per_endpoint.get(endpoint, 0)
+            if self._pending >= self.max_pending or in_endpoint >= self.endpoint_limit:
+                self.rejected[endpoint] = self.rejected.get(endpoint, 0) + 1
+                raise ServiceBusyError("password hashing is busy, retry shortly", retry_after=1)
+            self._pending += 1
+            self._per_endpoint[endpoint] = in_endpoint + 1
+            self.max_queued = max(self.max_queued, self._pending - self._running)
+        submitted = time.perf_counter()
+        try:
+            return self._pool().submit(self._timed, fn, args, submitted).result()
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._per_endpoint[endpoint] -= 1
+
+    def _timed(self, fn: Callable[..., T], args: tuple, submitted: float) -> T:
+        started = time.perf_counter()
+        with self._lock:
+            self._running += 1
+            waited = started - submitted
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self.completed += 1
+                self._run_total += time.perf_counter() - started
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            done = self.completed
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "endpoint_limit": self.endpoint_limit,
+                "pending": self._pending,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "max_queued": self.max_queued,
+                "in_flight_by_endpoint": {k: v for k, v in self._per_endpoint.items() if v},
+                "completed": done,
+                "rejected": dict(self.rejected),
+                "avg_wait_ms": round(self._wait_total / done * 1000, 3) if done else None,
+                "max_wait_ms": round(self._wait_max * 1000, 3),
+                "avg_hash_ms": round(self._run_total / done * 1000, 3) if done else None,
+            }
+
+
+password_pool = PasswordHashPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    endpoint_limit=settings.PASSWORD_HASH_ENDPOINT_CONCURRENCY,
+)
@@ -1,66 +1,206 @@
-from typing import Callable, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Iterator, Optional
+import time
 
-from sqlmodel import SQLModel, create_engine, Session, select
-from sqlalchemy import inspect, text
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, init runs unlocked
+    fcntl = None
+
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlmodel import create_engine, Session, select
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
 
 from app.core.config import settings, logger
-from app.core.jwt import hash_password, verify_password
+from app.core.exceptions import DatabaseError
+from app.core.jwt import hash_password, password_needs_rehash, verify_password
 from app.models import User
 
-engine = create_engine(settings.DATABASE_URL, echo=False)
-_session_override: Optional[Callable[[], Session]] = None
+class PoolMetrics:
+    """Counters describing how long requests wait for a pooled connection."""
 
-def init_db():
-    SQLModel.metadata.create_all(bind=engine)
-    _ensure_user_columns()
-    _ensure_todo_columns()
-    _ensure_default_admin()
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self.reset()
 
-def _ensure_user_columns():
-    if engine.url.get_backend_name() != "sqlite":
-        return
-    inspector = inspect(engine)
-    if "user" not in inspector.get_table_names():
-        return
-    columns = {column["name"] for column in inspector.get_columns("user")}
-    statements: list[str] = []
-    if "role" not in columns:
-        statements.append('ALTER TABLE "user" ADD COLUMN role VARCHAR(20) DEFAULT \'user\'')
-        statements.append('UPDATE "user" SET role = \'user\' WHERE role IS NULL')
-    if "otp_code" not in columns:
-        statements.append('ALTER TABLE "user" ADD COLUMN otp_code VARCHAR(6)')
-    if "otp_expire" not in columns:
-        statements.append('ALTER TABLE "user" ADD COLUMN otp_expire DATETIME')
-    if "otp_used" not in columns:
-        statements.append('ALTER TABLE "user" ADD COLUMN otp_used BOOLEAN DEFAULT 0')
-        statements.append('UPDATE "user" SET otp_used = 0 WHERE otp_used IS NULL')
-    if "deleted_at" not in columns:
-        statements.append('ALTER TABLE "user" ADD COLUMN deleted_at DATETIME')
-    if not statements:
-        return
-    with engine.begin() as conn:
-        for statement in statements:
-            conn.execute(text(statement))
+    def reset(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            average = self.wait_seconds_total / self.checkouts if self.checkouts else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": round(average * 1000, 3),
+                "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+            }
+
+
+pool_metrics = PoolMetrics()
 
 
-def _ensure_todo_columns():
-    if engine.url.get_backend_name() != "sqlite":
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records checkout wait time and pool timeouts."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.record_timeout()
+            raise
+        pool_metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+
+def _engine_options(database_url: str) -> dict:
+    url = make_url(database_url)
+    options: dict = {"echo": False, "pool_pre_ping": settings.DB_POOL_PRE_PING}
+    backend = url.get_backend_name()
+    if backend == "sqlite" and url.database in (None, "", ":memory:"):
+        return options
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    )
+    if backend == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        options["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+def sqlite_pragmas() -> list[str]:
+    return [
+        f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}",
+        f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}",
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}",
+        f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}",
+    ]
+
+
+def install_sqlite_pragmas(target_engine) -> None:
+    """Apply WAL/busy_timeout/synchronous/mmap/cache tuning on every new connection."""
+    url = target_engine.url
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
         return
-    inspector = inspect(engine)
-    if "todo" not in inspector.get_table_names():
+    pragmas = sqlite_pragmas()
+
+    @event.listens_for(target_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+engine = create_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL))
+install_sqlite_pragmas(engine)
+_session_override: Optional[Callable[[], Session]] = None
+
+# Arbitrary application-wide key for pg_advisory_lock
+INIT_LOCK_KEY = 0x746F646F
+
+
+@contextmanager
+def init_lock() -> Iterator[None]:
+    """Hold a cross-process lock while the schema is created or upgraded.
+
+    PostgreSQL uses a session advisory lock; file-backed SQLite an exclusive
+    ``flock`` on ``<database>.init.lock``. In-memory databases need none.
+    """
+    url = engine.url
+    if url.get_backend_name() == "postgresql":
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": INIT_LOCK_KEY})
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": INIT_LOCK_KEY})
         return
-    columns = {column["name"] for column in inspector.get_columns("todo")}
-    statements: list[str] = []
-    if "reminder_sent_at" not in columns:
-        statements.append('ALTER TABLE "todo" ADD COLUMN reminder_sent_at DATETIME')
-    if not statements:
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:") or fcntl is None:
+        yield
         return
-    with engine.begin() as conn:
-        for statement in statements:
-            conn.execute(text(statement))
+    with open(f"{url.database}.init.lock", "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+ALEMBIC_INI = BASE_DIR / "alembic.ini"
+
+
+def alembic_config(connection: Optional[Connection] = None) -> AlembicConfig:
+    config = AlembicConfig(str(ALEMBIC_INI))
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
 
+def migrate(revision: str = "head") -> None:
+    """Apply Alembic migrations up to ``revision`` (callers hold ``init_lock``)."""
+    with engine.connect() as connection:
+        command.upgrade(alembic_config(connection), revision)
+        connection.commit()
 
-def _ensure_default_admin():
+
+@lru_cache(maxsize=1)
+def expected_revisions() -> tuple[str, ...]:
+    return tuple(sorted(ScriptDirectory.from_config(alembic_config()).get_heads()))
+
+
+def current_revisions() -> tuple[str, ...]:
+    with engine.connect() as connection:
+        return tuple(sorted(MigrationContext.configure(connection).get_current_heads()))
+
+
+def init_db():
+    """Check that the database is at the latest migration; the schema is never altered here.
+
+    One read of ``alembic_version``. Migrations run from ``python -m app.cli migrate``
+    (or ``init-db``) instead, once per deploy rather than once per worker.
+    """
+    current, expected = current_revisions(), expected_revisions()
+    if current != expected:
+        raise DatabaseError(
+            f"Database schema is at revision {', '.join(current) or 'none'} but the code expects "
+            f"{', '.join(expected)}; run `python -m app.cli migrate`"
+        )
+    logger.info("Database schema at revision %s", ", ".join(current))
+
+
+def ensure_default_admin():
     email = settings.DEFAULT_ADMIN_EMAIL
     password = settings.DEFAULT_ADMIN_PASSWORD
     if not email or not password:
@@ -68,9 +208,8 @@ def _ensure_default_admin():
     session = Session(engine)
     try:
         user = session.exec(select(User).where(User.email == email)).first()
-        hashed = hash_password(password)
         if not user:
-            user = User(email=email, hashed_password=hashed, role="admin")
+            user = User(email=email, hashed_password=hash_password(password), role="admin")
             session.add(user)
             session.commit()
             logger.info("Created default admin user %s", email)
@@ -79,8 +218,9 @@ def _ensure_default_admin():
         if user.role != "admin":
             user.role = "admin"
             updated = True
-        if not verify_password(password, user.hashed_password):
-            user.hashed_password = hashed
+        # Hash only when the stored one is wrong or outdated, not on every boot
+        if not verify_password(password, user.hashed_password) or password_needs_rehash(user.hashed_password):
+            user.hashed_password = hash_password(password)
             updated = True
         if updated:
             session.commit()
@@ -91,6 +231,17 @@ def _ensure_default_admin():
     finally:
         session.close()
 
+def pool_status() -> dict:
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        reader = getattr(pool, name, None)
+        status[name] = reader() if callable(reader) else None
+    status["max_overflow"] = getattr(pool, "_max_overflow", None)
+    status.update(pool_metrics.snapshot())
+    return status
+
+
 def get_session():
     if _session_override is not None:
         return _session_override()
@@ -101,3 +252,149 @@ def set_session_override(factory: Callable[[], Session] | None) -> None:
     """Allow tests to inject a custom session factory."""
     global _session_override
     _session_override = factory
+
+
+class RequestScope:
+    """Unit of work shared by every repository call made while handling one request.
+
+    The Session is opened lazily on first use, repositories flush instead of
+    committing, and ``finish`` commits once before the response is sent.
+    """
+
+    def __init__(self) -> None:
+        self.session: Optional[Session] = None
+        self.failed = False
+        self.closed = False
+        self._after_commit: list[Callable[[], None]] = []
+        self._collected: dict[Callable[[list], None], list] = {}
+
+    def finish(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        session, self.session = self.session, None
+        callbacks, self._after_commit = self._after_commit, []
+        if session is None:
+            return
+        try:
+            if self.failed:
+                session.rollback()
+                return
+            session.commit()
+        except Exception:
+            session.rollback()
+            logger.error("DB error while committing request unit of work", exc_info=True)
+            raise
+        finally:
+            session.close()
+        for callback in callbacks:
+            _run_after_commit(callback)
+
+    def abort(self) -> None:
+        self.failed = True
+        self._after_commit = []
+        self._collected = {}
+        self.finish()
+
+
+_request_scope: ContextVar[Optional[RequestScope]] = ContextVar("request_db_scope", default=None)
+
+
+@contextmanager
+def request_session_scope() -> Iterator[RequestScope]:
+    """Open a unit of work for the duration of a request."""
+    scope = RequestScope()
+    token = _request_scope.set(scope)
+    try:
+        yield scope
+    except BaseException:
+        scope.abort()
+        raise
+    else:
+        scope.finish()
+    finally:
+        _request_scope.reset(token)
+
+
+def _active_scope(session: Optional[Session] = None) -> Optional[RequestScope]:
+    scope = _request_scope.get()
+    if scope is None or scope.closed:
+        return None
+    if session is not None and scope.session is not session:
+        return None
+    return scope
+
+
+@contextmanager
+def unit_of_work() -> Iterator[None]:
+    """Join the current unit of work, or open one so several calls commit together."""
+    if _active_scope() is not None:
+        yield
+        return
+    with request_session_scope():
+        yield
+
+
+def in_unit_of_work(session: Session) -> bool:
+    """True when ``session`` is shared by a unit of work (so ``commit`` only flushes)."""
+    return _active_scope(session) is not None
+
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """Yield the request's shared Session, or a short-lived one outside a request."""
+    scope = _active_scope()
+    if scope is None:
+        with get_session() as session:
+            yield session
+        return
+    if scope.session is None:
+        scope.session = get_session()
+    yield scope.session
+
+
+def commit(session: Session) -> None:
+    """Commit, or only flush when ``session`` belongs to the request unit of work."""
+    if _active_scope(session) is not None:
+        session.flush()
+    else:
+        session.commit()
+
+
+def rollback(session: Session) -> None:
+    scope = _active_scope(session)
+    if scope is not None:
+        scope.failed = True
+    session.rollback()
+
+
+def on_commit(callback: Callable[[], None]) -> None:
+    """Run ``callback`` once the current unit of work commits (immediately if none)."""
+    scope = _active_scope()
+    if scope is None:
+        _run_after_commit(callback)
+        return
+    scope._after_commit.append(callback)
+
+
+def collect_on_commit(flush: Callable[[list], None], item: object) -> None:
+    """Queue ``item`` for ``flush``, which runs once per unit of work with every item queued for it.
+
+    Outside a unit of work ``flush`` runs right away with ``[item]``.
+    """
+    scope = _active_scope()
+    if scope is None:
+        _run_after_commit(lambda: flush([item]))
+        return
+    items = scope._collected.get(flush)
+    if items is None:
+        items = scope._collected[flush] = []
+        scope._after_commit.append(lambda: flush(items))
+    items.append(item)
+
+
+def _run_after_commit(callback: Callable[[], None]) -> None:
+    try:
+        callback()
+    except Exception:
+        logger.warning("After-commit callback failed", exc_info=True)
@@ -6,12 +6,12 @@ from fastapi.responses import HTMLResponse
 from fastapi.responses import JSONResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from starlette.responses import RedirectResponse
 
-from datetime import datetime, date
+from datetime import datetime, date, timedelta, timezone
+import asyncio
 from typing import Optional, Dict
-import json
-from json import JSONDecodeError
 from contextlib import asynccontextmanager
 from pathlib import Path
 
@@ -52,20 +52,63 @@ class ForwardedProtoMiddleware:
 
         await self.app(scope, receive, send)
 
+
+class RequestSessionMiddleware:
+    """ASGI middleware giving each HTTP request a single DB unit of work.
+
+    Repositories share one Session (and so one pooled connection) for the whole
+    request; it is committed just before the response headers go out.
+    """
+
+    def __init__(self, app: FastAPI):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope.get("type") != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with request_session_scope() as db_scope:
+            async def send_after_commit(message):
+                if message["type"] == "http.response.start" and db_scope.session is not None:
+                    await run_in_threadpool(db_scope.finish)
+                await send(message)
+
+            await self.app(scope, receive, send_after_commit)
+
 BASE_DIR = Path(__file__).resolve().parents[1]
 load_dotenv(BASE_DIR / ".env", override=False)
 STATIC_DIR = BASE_DIR / "app" / "static"
 TEMPLATE_DIR = BASE_DIR / "app" / "templates"
 
-from app.routers import todos, auth, admin, password_reset_router
-from app.db import init_db
+from app.routers import todos, auth, admin, password_reset_router, internal
+from app.cli import init_database
+from app.db import init_db, request_session_scope
 from app.core.config import settings, logger
-from app.core.jwt import decode_token
+from app.core.jwt import decode_request_token
+from app.core.password_pool import password_pool
+from app.core.http_cache import (
+    PAGE_CACHE_CONTROL,
+    apply_validators,
+    etag_matches,
+    fingerprint_files,
+    make_etag,
+    not_modified,
+)
 from app.services.user_service import service as user_service
 from app.services.todo_service import service as todo_service
 from app.services.reminder_service import reminder_scheduler
-from app.models import TodoCreate, TodoUpdate
-from app.core.exceptions import AppError
+from app.services.event_bus import event_bus
+from app.models import (
+    DEFAULT_CATEGORY,
+    DEFAULT_PRIORITY,
+    DEFAULT_STATUS,
+    VALID_PRIORITIES,
+    VALID_STATUSES,
+    TodoCreate,
+    TodoUpdate,
+)
+from app.core.exceptions import AppError, NotFoundError
 from pydantic import BaseModel, ValidationError as PydanticValidationError
 
 
@@ -76,13 +119,20 @@ from pydantic import BaseModel, ValidationError as PydanticValidationError
 async def lifespan(app: FastAPI):
     logger.info("Application starting")
     try:
-        init_db()
-        logger.info("Database initialized (env=%s)", settings.ENVIRONMENT)
+        # Under gunicorn this already ran once before the workers were forked
+        if settings.DB_INIT_ON_STARTUP:
+            await asyncio.to_thread(init_database)
+        await asyncio.to_thread(init_db)
         reminder_scheduler.start()
+        event_bus.start()
     except Exception:
+        # Fail startup rather than serve requests against a schema we could not verify
         logger.exception("Database initialization failed")
+        raise
     yield
     await reminder_scheduler.stop()
+    await asyncio.to_thread(event_bus.stop)
+    await asyncio.to_thread(password_pool.shutdown)
     logger.info("Application shutdown")
 
 
@@ -98,7 +148,7 @@ async def add_current_user_to_request(request: Request, call_next):
     request.state.current_user = None
     token = request.cookies.get("access_token")
     if token:
-        email = decode_token(token)
+        email = decode_request_token(request, token)
         if email:
             try:
                 request.state.current_user = user_service.get_by_email(email)
@@ -107,6 +157,10 @@ async def add_current_user_to_request(request: Request, call_next):
     response = await call_next(request)
     return response
 
+
+# Registered after the user middleware so the lookup above shares the request session
+app.add_middleware(RequestSessionMiddleware)
+
 # Simple health check before any middleware
 @app.get("/health", response_class=HTMLResponse)
 def health():
@@ -141,22 +195,23 @@ app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(password_reset_router.router, prefix="/api/v1")
 app.include_router(todos.router, prefix="/api/v1/todos", tags=["todos"])
 app.include_router(admin.router, prefix="/admin", tags=["admin"])
+app.include_router(internal.router, prefix="/internal", tags=["internal"])
 
 # =======================
 # Static & Templates
 # =======================
 app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 templates = Jinja2Templates(directory=str(TEMPLATE_DIR))
+# Part of every page ETag so a deploy with new markup is never answered with 304
+TEMPLATE_VERSION = fingerprint_files(TEMPLATE_DIR.glob("*.html"))
 
 
 DEFAULT_TASK_META = {
-    "priority": "medium",
-    "category": "General",
-    "status": "backlog",
+    "priority": DEFAULT_PRIORITY,
+    "category": DEFAULT_CATEGORY,
+    "status": DEFAULT_STATUS,
     "reminder_minutes": settings.REMINDER_LEAD_MINUTES,
 }
-VALID_PRIORITIES = {"low", "medium", "high"}
-VALID_STATUSES = {"backlog", "in_progress", "done"}
 
 
 class StatusUpdatePayload(BaseModel):
@@ -170,7 +225,11 @@ def _resolve_dashboard_user(request: Request):
     token = request.cookies.get("access_token")
     if not token:
         return None
-    email = decode_token(token)
+    # Usually already resolved from the same cookie by add_current_user_to_request
+    user = getattr(request.state, "current_user", None)
+    if user is not None:
+        return user
+    email = decode_request_token(request, token)
     if not email:
         return None
     try:
@@ -181,24 +240,6 @@ def _resolve_dashboard_user(request: Request):
     return user
 
 
-def _merge_task_meta(raw_tags: Optional[str], overrides: Optional[Dict[str, object]] = None) -> Dict[str, object]:
-    meta = DEFAULT_TASK_META.copy()
-    if raw_tags:
-        try:
-            parsed = json.loads(raw_tags)
-        except JSONDecodeError:
-            parsed = {}
-        if isinstance(parsed, dict):
-            for key, value in parsed.items():
-                if value is not None:
-                    meta[key] = value
-    overrides = overrides or {}
-    for key, value in overrides.items():
-        if value:
-            meta[key] = value
-    return meta
-
-
 def _normalize_reminder_minutes(value: Optional[int | str]) -> int:
     if value is None or value == "":
         return settings.REMINDER_LEAD_MINUTES
@@ -245,10 +286,7 @@ def _format_vietnamese_date(target_date: date) -> str:
 
 
 def _build_todo_payload(todo) -> Dict[str, Optional[str]]:
-    meta = _merge_task_meta(todo.tags)
-    status = "done" if todo.is_done else meta.get("status", DEFAULT_TASK_META["status"])
-    if todo.is_done:
-        meta["status"] = "done"
+    status = "done" if todo.is_done else (todo.status or DEFAULT_STATUS)
     return {
         "id": todo.id,
         "title": todo.title,
@@ -256,8 +294,8 @@ def _build_todo_payload(todo) -> Dict[str, Optional[str]]:
         "is_done": todo.is_done,
         "due_date": todo.due_date.isoformat() if todo.due_date else None,
         "due_display": todo.due_date.strftime('%d/%m/%Y %H:%M') if todo.due_date else None,
-        "priority": meta.get("priority", DEFAULT_TASK_META["priority"]),
-        "category": meta.get("category", DEFAULT_TASK_META["category"]),
+        "priority": todo.priority or DEFAULT_PRIORITY,
+        "category": todo.category or DEFAULT_CATEGORY,
         "status": status,
     }
 
@@ -331,6 +369,16 @@ def _render_day_page(
     return templates.TemplateResponse("day_tasks.html", context, status_code=status_code)
 
 
+def _page_etag(request: Request, user, *parts) -> tuple[str, Optional[HTMLResponse]]:
+    """ETag for a dashboard page of ``user`` plus a 304 response if the browser already has it."""
+    etag = make_etag(
+        *parts, TEMPLATE_VERSION, user.id, user.email, user.role, todo_service.change_stamp(user.id)
+    )
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return etag, not_modified(etag, PAGE_CACHE_CONTROL, "Cookie")
+    return etag, None
+
+
 def _handle_dashboard_validation_error(
     request: Request,
     user,
@@ -368,23 +416,44 @@ def dashboard(request: Request):
     if not user:
         return RedirectResponse("/api/v1/auth/login-page", status_code=302)
 
+    # Calendar counts are fetched per month by calendar.js; the page only
+    # needs the summary and the week of upcoming todos used by reminders.js.
+    now = datetime.now(timezone.utc)
+    selected_date = request.query_params.get("date")
     try:
-        todos_list, _ = todo_service.list(user.id, limit=100, offset=0)
+        # The upcoming window slides with time, so the tag also rolls over hourly
+        etag, cached = _page_etag(
+            request, user, "dashboard", selected_date, now.strftime("%Y-%m-%dT%H")
+        )
+        if cached is not None:
+            return cached
+        stats = todo_service.summary(user.id)
+        upcoming, _, _ = todo_service.list(
+            user.id,
+            limit=100,
+            offset=0,
+            count=False,
+            is_done=False,
+            due_from=now,
+            due_to=now + timedelta(days=7),
+            sort="due_date",
+        )
     except AppError as exc:
         logger.error("Dashboard todo list failed", exc_info=True)
         return HTMLResponse("Internal server error", status_code=500)
 
-    selected_date = request.query_params.get("date")
-    return templates.TemplateResponse(
+    response = templates.TemplateResponse(
         "dashboard.html",
         {
             "request": request,
             "user": user,
-            "todos": todos_list,
+            "stats": stats,
+            "upcoming_todos": upcoming,
             "prefill_date": selected_date,
             "today_str": datetime.utcnow().strftime("%Y-%m-%d"),
         }
     )
+    return apply_validators(response, etag, PAGE_CACHE_CONTROL, "Cookie")
 
 
 @app.get("/dashboard/day/{date_str}", response_class=HTMLResponse)
@@ -397,7 +466,17 @@ def dashboard_day_view(date_str: str, request: Request):
         selected_date = datetime.strptime(date_str, "%Y-%m-%d").date()
     except ValueError:
         return HTMLResponse("Ngày không hợp lệ", status_code=400)
-    return _render_day_page(request, user, selected_date)
+    try:
+        etag, cached = _page_etag(request, user, "day", selected_date.isoformat())
+    except AppError:
+        logger.error("Dashboard daily view failed", exc_info=True)
+        return HTMLResponse("Internal server error", status_code=500)
+    if cached is not None:
+        return cached
+    response = _render_day_page(request, user, selected_date)
+    if response.status_code == 200:
+        apply_validators(response, etag, PAGE_CACHE_CONTROL, "Cookie")
+    return response
 
 
 @app.post("/dashboard/todos")
@@ -433,19 +512,16 @@ def dashboard_create_todo(
     if status_value not in VALID_STATUSES:
         status_value = DEFAULT_TASK_META["status"]
     reminder_value = _normalize_reminder_minutes(reminder_minutes)
-    meta = _merge_task_meta(None, {
-        "priority": priority_value,
-        "category": category or DEFAULT_TASK_META["category"],
-        "status": status_value,
-        "reminder_minutes": reminder_value,
-    })
 
     try:
         payload = TodoCreate(
             title=title,
             description=description,
             due_date=due,
-            tags=json.dumps(meta)
+            priority=priority_value,
+            category=category or DEFAULT_CATEGORY,
+            status=status_value,
+            reminder_minutes=reminder_value,
         )
     except PydanticValidationError as exc:
         if expects_json:
@@ -589,36 +665,24 @@ def dashboard_update_status(todo_id: int, request: Request, payload: StatusUpdat
     if not user:
         return JSONResponse({"error": "unauthorized"}, status_code=401)
 
-    try:
-        todo = todo_service.get(todo_id, user.id)
-    except AppError as exc:
-        logger.error("Dashboard status fetch failed", exc_info=True)
-        return JSONResponse({"error": "not_found"}, status_code=404)
-
     requested_status = (payload.status or DEFAULT_TASK_META["status"]).lower()
     if requested_status not in VALID_STATUSES:
         requested_status = DEFAULT_TASK_META["status"]
     requested_priority = (payload.priority or DEFAULT_TASK_META["priority"]).lower()
     if requested_priority not in VALID_PRIORITIES:
         requested_priority = DEFAULT_TASK_META["priority"]
-    overrides = {
-        "status": requested_status,
-        "priority": requested_priority,
-        "category": payload.category or DEFAULT_TASK_META["category"],
-    }
-    reminder_override = _coerce_optional_reminder(payload.reminder_minutes)
-    if reminder_override is not None:
-        overrides["reminder_minutes"] = reminder_override
-    meta = _merge_task_meta(todo.tags, overrides)
-
-    update_payload = TodoUpdate(tags=json.dumps(meta))
-    if requested_status == "done":
-        update_payload.is_done = True
-    else:
-        update_payload.is_done = False
+    update_payload = TodoUpdate(
+        status=requested_status,
+        priority=requested_priority,
+        category=payload.category or DEFAULT_CATEGORY,
+        reminder_minutes=_coerce_optional_reminder(payload.reminder_minutes),
+        is_done=requested_status == "done",
+    )
 
     try:
         updated = todo_service.update(todo_id, user.id, update_payload)
+    except NotFoundError:
+        return JSONResponse({"error": "not_found"}, status_code=404)
     except AppError as exc:
         logger.error("Dashboard status update failed", exc_info=True)
         return JSONResponse({"error": "update_failed"}, status_code=500)
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import List, Literal, Optional
 from datetime import datetime, timezone
 
 from pydantic import EmailStr
-from sqlalchemy import Column, DateTime
+from sqlalchemy import Column, DateTime, Index
 from sqlmodel import SQLModel, Field
 
 
@@ -43,12 +43,26 @@ class UserResponse(UserBase):
     created_at: datetime
 
 
+VALID_PRIORITIES = ("low", "medium", "high")
+VALID_STATUSES = ("backlog", "in_progress", "done")
+DEFAULT_PRIORITY = "medium"
+DEFAULT_CATEGORY = "General"
+DEFAULT_STATUS = "backlog"
+# Sort order of priorities, stored in todo.priority_rank so ORDER BY can use an index
+PRIORITY_RANKS = {"low": 0, "medium": 1, "high": 2}
+
+
 class TodoBase(SQLModel):
     title: str
     description: Optional[str] = None
     is_done: bool = False
     due_date: Optional[datetime] = None
     tags: Optional[str] = None
+    priority: Optional[str] = Field(default=None, max_length=10)
+    category: Optional[str] = Field(default=None, max_length=50)
+    status: Optional[str] = Field(default=None, max_length=20)
+    # Per-task reminder lead time; NULL falls back to REMINDER_LEAD_MINUTES
+    reminder_minutes: Optional[int] = None
 
 
 class Todo(TodoBase, table=True):
@@ -61,6 +75,47 @@ class Todo(TodoBase, table=True):
         default=None,
         sa_column=Column(DateTime(timezone=True))
     )
+    # UTC instant at which the reminder email becomes due (due_date - lead time)
+    reminder_due_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True))
+    )
+    # Lease taken by the scheduler instance that is currently sending the reminder;
+    # scheduler bookkeeping, so it is left out of API responses and events and
+    # claiming does not move updated_at
+    reminder_claim_token: Optional[str] = Field(default=None, max_length=36, exclude=True)
+    reminder_claimed_at: Optional[datetime] = Field(
+        default=None,
+        exclude=True,
+        sa_column=Column(DateTime(timezone=True))
+    )
+    # PRIORITY_RANKS[priority], written alongside priority; a sort key only
+    priority_rank: Optional[int] = Field(default=None, exclude=True)
+
+
+# Every repository query filters on owner_id + deleted_at IS NULL first, so the
+# composite indexes lead with those columns. The partial index keeps the
+# reminder scan proportional to pending reminders rather than to the table.
+Index("ix_todo_owner_deleted_due", Todo.owner_id, Todo.deleted_at, Todo.due_date)
+Index("ix_todo_owner_deleted_created", Todo.owner_id, Todo.deleted_at, Todo.created_at)
+Index("ix_todo_owner_deleted_updated", Todo.owner_id, Todo.deleted_at, Todo.updated_at)
+Index("ix_todo_owner_deleted_priority", Todo.owner_id, Todo.deleted_at, Todo.priority)
+Index("ix_todo_owner_deleted_priority_rank", Todo.owner_id, Todo.deleted_at, Todo.priority_rank)
+Index("ix_todo_owner_deleted_status", Todo.owner_id, Todo.deleted_at, Todo.status)
+Index("ix_todo_owner_deleted_category", Todo.owner_id, Todo.deleted_at, Todo.category)
+# Changes feed: every row of an owner, tombstones included, in (updated_at, id) order
+Index("ix_todo_owner_updated", Todo.owner_id, Todo.updated_at, Todo.id)
+_REMINDER_PENDING = (
+    (Todo.is_done == False)
+    & (Todo.reminder_sent_at == None)
+    & (Todo.deleted_at == None)
+)
+Index(
+    "ix_todo_reminder_pending",
+    Todo.reminder_due_at,
+    sqlite_where=_REMINDER_PENDING,
+    postgresql_where=_REMINDER_PENDING,
+)
 
 
 class TodoCreate(SQLModel):
@@ -68,6 +123,10 @@ class TodoCreate(SQLModel):
     description: Optional[str] = Field(default=None, max_length=1000)
     due_date: Optional[datetime] = None
     tags: Optional[str] = Field(default=None, max_length=255)
+    priority: Optional[str] = Field(default=None, max_length=10)
+    category: Optional[str] = Field(default=None, max_length=50)
+    status: Optional[str] = Field(default=None, max_length=20)
+    reminder_minutes: Optional[int] = Field(default=None, ge=1)
 
 
 class TodoUpdate(SQLModel):
@@ -76,6 +135,22 @@ class TodoUpdate(SQLModel):
     is_done: Optional[bool] = None
     due_date: Optional[datetime] = None
     tags: Optional[str] = Field(default=None, max_length=255)
+    priority: Optional[str] = Field(default=None, max_length=10)
+    category: Optional[str] = Field(default=None, max_length=50)
+    status: Optional[str] = Field(default=None, max_length=20)
+    reminder_minutes: Optional[int] = Field(default=None, ge=1)
+
+
+class TodoBatchOperation(SQLModel):
+    """One entry of ``POST /todos/batch``: ``data`` is a TodoCreate/TodoUpdate body."""
+
+    op: Literal["create", "update", "complete", "delete"]
+    id: Optional[int] = None
+    data: Optional[dict] = None
+
+
+class TodoBatchRequest(SQLModel):
+    operations: List[TodoBatchOperation] = Field(min_length=1)
 
 
 class TodoResponse(TodoBase):
@@ -1,14 +1,17 @@
 from typing import Optional, List, Tuple
-from datetime import datetime, date, timezone
+import base64
+import json
+from datetime import datetime, date, time, timedelta, timezone
 from sqlmodel import select
-from sqlalchemy import func
+from sqlalchemy import case, false, func, update
 from sqlalchemy.exc import SQLAlchemyError
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from app.models import Todo, User
-from app.db import get_session
+from app.db import session_scope, commit, in_unit_of_work, rollback
+from app.repositories.todo_search import fulltext_filter, search_terms
 from app.core.config import logger, settings
-from app.core.exceptions import DatabaseError
+from app.core.exceptions import DatabaseError, ValidationError
 
 try:
     _LOCAL_TIMEZONE = ZoneInfo(settings.APP_TIMEZONE)
@@ -23,24 +26,123 @@ def _normalize(dt: datetime) -> datetime:
     return dt.astimezone(_LOCAL_TIMEZONE).replace(tzinfo=None)
 
 
+def _local_day_bounds(start_day: date, end_day: date) -> Tuple[datetime, datetime]:
+    """``[start_day 00:00, end_day 00:00)`` in APP_TIMEZONE, in stored (naive local) form."""
+    start = datetime.combine(start_day, time.min, tzinfo=_LOCAL_TIMEZONE)
+    end = datetime.combine(end_day, time.min, tzinfo=_LOCAL_TIMEZONE)
+    return _normalize(start), _normalize(end)
+
+
+def encode_cursor(todo: Todo) -> str:
+    """Build an opaque keyset cursor pointing just after ``todo``."""
+    payload = json.dumps({"c": todo.created_at.isoformat(), "i": todo.id})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(data["c"]), int(data["i"])
+    except (ValueError, KeyError, TypeError):
+        raise ValidationError("invalid cursor", field="cursor")
+
+
+def _utc_naive(dt: datetime) -> datetime:
+    if dt.tzinfo is None:
+        return dt
+    return dt.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+# A changes-feed position: the ``(updated_at, id)`` of the last row consumed
+Position = Tuple[datetime, int]
+
+
+def change_position(todo: Todo) -> Position:
+    return _utc_naive(todo.updated_at), todo.id
+
+
+def encode_watermark(resume: Optional[Position], page: Optional[Position] = None) -> Optional[str]:
+    """Opaque changes-feed token.
+
+    ``resume`` is where the next sync starts; ``page`` is where the next page
+    of the current sync starts when it runs ahead of ``resume``.
+    """
+    payload: dict = {}
+    if resume is not None:
+        payload.update(u=resume[0].isoformat(), i=resume[1])
+    if page is not None and page != resume:
+        payload["p"] = [page[0].isoformat(), page[1]]
+    if not payload:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_watermark(watermark: str) -> Tuple[Optional[Position], Optional[Position]]:
+    """``(resume, page)`` positions of a token from ``encode_watermark``."""
+    try:
+        padded = watermark + "=" * (-len(watermark) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        resume = (datetime.fromisoformat(data["u"]), int(data["i"])) if "u" in data else None
+        page = (datetime.fromisoformat(data["p"][0]), int(data["p"][1])) if "p" in data else None
+    except (ValueError, KeyError, TypeError, IndexError):
+        raise ValidationError("invalid watermark", field="since")
+    if resume is None and page is None:
+        raise ValidationError("invalid watermark", field="since")
+    return resume, page
+
+
+# Sortable keys for ``TodoRepository.list``; priority sorts by its stored rank,
+# not by name, so the ``(owner_id, deleted_at, priority_rank)`` index applies.
+SORT_KEYS = {
+    "created_at": Todo.created_at,
+    "due_date": Todo.due_date,
+    "updated_at": Todo.updated_at,
+    "priority": Todo.priority_rank,
+}
+
+
+def parse_sort(sort: Optional[str]) -> List[Tuple[str, bool]]:
+    """Parse ``"due_date,-priority"`` into ``[("due_date", False), ("priority", True)]``."""
+    order: List[Tuple[str, bool]] = []
+    for raw in (sort or "").split(","):
+        key = raw.strip()
+        if not key:
+            continue
+        desc = key.startswith("-")
+        key = key.lstrip("-")
+        if key not in SORT_KEYS:
+            raise ValidationError(
+                f"sort key must be one of: {', '.join(SORT_KEYS)}", field="sort"
+            )
+        if any(existing == key for existing, _ in order):
+            continue
+        order.append((key, desc))
+    return order
+
+
+def _owned_active(todo_id: int, owner_id: int):
+    return (Todo.id == todo_id) & (Todo.owner_id == owner_id) & (Todo.deleted_at == None)
+
+
 class TodoRepository:
     def __init__(self):
         pass
 
     def create(self, todo: Todo) -> Todo:
-        with get_session() as session:
+        with session_scope() as session:
             try:
                 session.add(todo)
-                session.commit()
+                commit(session)
                 session.refresh(todo)
                 return todo
             except SQLAlchemyError as e:
-                session.rollback()
+                rollback(session)
                 logger.error("DB error in create", exc_info=True)
                 raise DatabaseError("Failed to create todo", original=e) from e
 
     def get(self, todo_id: int, owner_id: int) -> Optional[Todo]:
-        with get_session() as session:
+        with session_scope() as session:
             try:
                 stmt = select(Todo).where(
                     (Todo.id == todo_id) & 
@@ -52,47 +154,112 @@ class TodoRepository:
                 logger.error("DB error in get", exc_info=True)
                 raise DatabaseError("Failed to fetch todo", original=e) from e
 
-    def delete(self, todo: Todo) -> None:
-        """Soft delete - set deleted_at timestamp"""
-        with get_session() as session:
+    def delete(self, todo_id: int, owner_id: int) -> bool:
+        """Soft delete - set deleted_at timestamp in a single owner-scoped UPDATE."""
+        now = datetime.now(timezone.utc)
+        # updated_at moves too, so the changes feed picks up the tombstone
+        stmt = (
+            update(Todo)
+            .where(_owned_active(todo_id, owner_id))
+            .values(deleted_at=now, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        with session_scope() as session:
             try:
-                db_todo = session.get(Todo, todo.id)
-                if db_todo:
-                    db_todo.deleted_at = datetime.now(timezone.utc)
-                    session.commit()
+                result = session.execute(stmt)
+                commit(session)
+                return result.rowcount > 0
             except SQLAlchemyError as e:
-                session.rollback()
+                rollback(session)
                 logger.error("DB error in delete", exc_info=True)
                 raise DatabaseError("Failed to delete todo", original=e) from e
 
+    def update(self, todo_id: int, owner_id: int, values: dict) -> Optional[Todo]:
+        """Apply ``values`` to an owned, non-deleted todo and return the new row.
 
-    def update(self, todo: Todo) -> Todo:
-        with get_session() as session:
-            try:
-                db_todo = session.get(Todo, todo.id)
-                if db_todo:
-                    if todo.title is not None:
-                        db_todo.title = todo.title
-                    if todo.description is not None:
-                        db_todo.description = todo.description
-                    if todo.is_done is not None:
-                        db_todo.is_done = todo.is_done
-                    if todo.due_date is not None:
-                        db_todo.due_date = todo.due_date
-                    if todo.tags is not None:
-                        db_todo.tags = todo.tags
-                    if getattr(todo, "_reset_reminder", False):
-                        db_todo.reminder_sent_at = None
-                    db_todo.updated_at = todo.updated_at
-                    session.commit()
-                    session.refresh(db_todo)
-                    return db_todo
-                return None
-            except SQLAlchemyError as e:
-                session.rollback()
+        Ownership check and mutation happen in one ``UPDATE ... RETURNING``
+        round trip on backends that support it (PostgreSQL, SQLite 3.35+).
+        """
+        stmt = update(Todo).where(_owned_active(todo_id, owner_id)).values(**values)
+        with session_scope() as session:
+            try:
+                if session.get_bind().dialect.update_returning:
+                    result = session.execute(
+                        stmt.returning(Todo).execution_options(populate_existing=True)
+                    )
+                    db_todo = result.scalars().first()
+                else:
+                    result = session.execute(stmt.execution_options(synchronize_session=False))
+                    db_todo = None
+                    if result.rowcount:
+                        db_todo = session.get(Todo, todo_id, populate_existing=True)
+                commit(session)
+                return db_todo
+            except SQLAlchemyError as e:
+                rollback(session)
                 logger.error("DB error in update", exc_info=True)
                 raise DatabaseError("Failed to update todo", original=e) from e
 
+    def create_many(self, todos: List[Todo]) -> List[Todo]:
+        """Insert ``todos`` in one flush.
+
+        The ORM sends them through "insertmanyvalues": a multi-row ``INSERT ...
+        RETURNING`` on PostgreSQL; SQLite has no implicit insert sentinel, so
+        it gets one RETURNING statement per row, still in the same transaction.
+        Inside a unit of work the rows keep their loaded state; outside one
+        they are refreshed after the commit, one SELECT each.
+        """
+        if not todos:
+            return []
+        with session_scope() as session:
+            try:
+                session.add_all(todos)
+                session.flush()
+                commit(session)
+                if not in_unit_of_work(session):
+                    for todo in todos:
+                        session.refresh(todo)
+                return todos
+            except SQLAlchemyError as e:
+                rollback(session)
+                logger.error("DB error in create_many", exc_info=True)
+                raise DatabaseError("Failed to create todos", original=e) from e
+
+    def update_many(self, todo_ids: List[int], owner_id: int, values: dict) -> List[Todo]:
+        """Apply the same ``values`` to every owned, non-deleted todo in ``todo_ids``.
+
+        Returns the updated rows; ids that are missing, deleted or owned by
+        someone else are simply absent from the result.
+        """
+        if not todo_ids:
+            return []
+        owned = (Todo.id.in_(todo_ids)) & (Todo.owner_id == owner_id) & (Todo.deleted_at == None)
+        stmt = update(Todo).where(owned).values(**values)
+        with session_scope() as session:
+            try:
+                if session.get_bind().dialect.update_returning:
+                    result = session.execute(
+                        stmt.returning(Todo).execution_options(populate_existing=True)
+                    )
+                    todos = list(result.scalars().all())
+                else:
+                    ids = session.exec(select(Todo.id).where(owned)).all()
+                    session.execute(stmt.execution_options(synchronize_session=False))
+                    todos = []
+                    if ids:
+                        todos = list(
+                            session.exec(
+                                select(Todo).where(Todo.id.in_(ids))
+                                .execution_options(populate_existing=True)
+                            ).all()
+                        )
+                commit(session)
+                return todos
+            except SQLAlchemyError as e:
+                rollback(session)
+                logger.error("DB error in update_many", exc_info=True)
+                raise DatabaseError("Failed to update todos", original=e) from e
+
     def list(
         self,
         owner_id: int,
@@ -101,39 +268,207 @@ class TodoRepository:
         offset: int = 0,
         q: Optional[str] = None,
         is_done: Optional[bool] = None,
-        sort: Optional[str] = None
-    ) -> Tuple[List[Todo], int]:
-        with get_session() as session:
+        sort: Optional[str] = None,
+        count: bool = True,
+        cursor: Optional[str] = None,
+        due_from: Optional[datetime] = None,
+        due_to: Optional[datetime] = None,
+        priority: Optional[str] = None,
+        status: Optional[str] = None,
+        category: Optional[str] = None,
+        search_mode: str = "like",
+    ) -> Tuple[List[Todo], Optional[int], Optional[str]]:
+        """List todos for an owner.
+
+        ``q`` is a substring match on the title in ``"like"`` mode; in
+        ``"fulltext"`` mode it is an accent-insensitive prefix query over title
+        and description, ranked by relevance unless ``sort`` is given.
+
+        ``sort`` is a comma-separated list of keys from ``SORT_KEYS``, each
+        optionally prefixed with ``-`` for descending order; ``id`` breaks ties.
+        Without it rows come in ``(created_at, id)`` order.
+        ``due_from``/``due_to`` select the half-open range ``[due_from, due_to)``.
+        ``total`` is ``None`` when ``count`` is False. When ``cursor`` is given the
+        page is fetched with a keyset predicate on ``(created_at, id)`` instead of
+        OFFSET (only valid with the default or a ``created_at`` sort);
+        ``next_cursor`` is returned whenever more rows are available.
+        """
+        order = parse_sort(sort)
+        fulltext = bool(q) and search_mode == "fulltext"
+        keyed_on_created = (not order and not fulltext) or (
+            len(order) == 1 and order[0][0] == "created_at"
+        )
+        if cursor is not None and not keyed_on_created:
+            raise ValidationError("cursor pagination requires sort=created_at or -created_at", field="cursor")
+        descending = bool(order) and order[0][1]
+        keyset = None
+        if cursor is not None:
+            keyset = decode_cursor(cursor)
+        with session_scope() as session:
             try:
                 base_filter = (Todo.owner_id == owner_id) & (Todo.deleted_at == None)
-                stmt = select(Todo).where(base_filter)
-                count_stmt = select(Todo).where(base_filter)
-
-                if q:
-                    stmt = stmt.where(Todo.title.contains(q))
-                    count_stmt = count_stmt.where(Todo.title.contains(q))
+                hits = rank = None
+                if fulltext:
+                    terms = search_terms(q)
+                    if terms:
+                        hits, match, rank = fulltext_filter(session.get_bind().dialect.name, terms, owner_id)
+                        if match is not None:
+                            base_filter = base_filter & match
+                    else:
+                        base_filter = base_filter & false()
+                elif q:
+                    base_filter = base_filter & Todo.title.contains(q)
                 if is_done is not None:
-                    stmt = stmt.where(Todo.is_done == is_done)
-                    count_stmt = count_stmt.where(Todo.is_done == is_done)
-                if sort:
-                    if sort.startswith("-"):
-                        key = sort[1:]
-                        if key == "created_at":
-                            stmt = stmt.order_by(Todo.created_at.desc())
+                    base_filter = base_filter & (Todo.is_done == is_done)
+                if due_from is not None:
+                    base_filter = base_filter & (Todo.due_date >= _normalize(due_from))
+                if due_to is not None:
+                    base_filter = base_filter & (Todo.due_date < _normalize(due_to))
+                if priority is not None:
+                    base_filter = base_filter & (Todo.priority == priority)
+                if status is not None:
+                    base_filter = base_filter & (Todo.status == status)
+                if category is not None:
+                    base_filter = base_filter & (Todo.category == category)
+
+                stmt = select(Todo)
+                if hits is not None:
+                    stmt = stmt.join(hits, hits.c.id == Todo.id)
+                stmt = stmt.where(base_filter)
+                if keyset is not None:
+                    created_at, last_id = keyset
+                    if descending:
+                        stmt = stmt.where(
+                            (Todo.created_at < created_at)
+                            | ((Todo.created_at == created_at) & (Todo.id < last_id))
+                        )
                     else:
-                        if sort == "created_at":
-                            stmt = stmt.order_by(Todo.created_at)
+                        stmt = stmt.where(
+                            (Todo.created_at > created_at)
+                            | ((Todo.created_at == created_at) & (Todo.id > last_id))
+                        )
+                if order:
+                    for key, desc in order:
+                        column = SORT_KEYS[key]
+                        stmt = stmt.order_by(column.desc() if desc else column)
+                    stmt = stmt.order_by(Todo.id.desc() if order[-1][1] else Todo.id)
+                elif rank is not None:
+                    stmt = stmt.order_by(rank, Todo.id)
+                else:
+                    # The order the cursor continues in, so page 1 and later pages agree
+                    stmt = stmt.order_by(Todo.created_at, Todo.id)
 
-                stmt = stmt.offset(offset).limit(limit)
-                items = session.exec(stmt).all()
-                total = len(session.exec(count_stmt).all())
-                return items, total
+                if keyset is None:
+                    stmt = stmt.offset(offset)
+                # Fetch one extra row so we know whether another page exists.
+                rows = session.exec(stmt.limit(limit + 1)).all()
+                items = rows[:limit]
+                next_cursor = None
+                if len(rows) > limit and keyed_on_created:
+                    next_cursor = encode_cursor(items[-1])
+
+                total = None
+                if count:
+                    count_stmt = select(func.count()).select_from(Todo)
+                    if hits is not None:
+                        count_stmt = count_stmt.join(hits, hits.c.id == Todo.id)
+                    total = session.exec(count_stmt.where(base_filter)).one()
+                return items, total, next_cursor
             except SQLAlchemyError as e:
                 logger.error("DB error in list", exc_info=True)
                 raise DatabaseError("Failed to list todos", original=e) from e
+
+    def count_by_day(
+        self, owner_id: int, start_day: date, end_day: date, now: datetime
+    ) -> List[tuple[date, int, int, int]]:
+        """Per-day ``(day, total, done, overdue)`` for local days ``[start_day, end_day)``.
+
+        The range predicate walks ``ix_todo_owner_deleted_due``; due dates are
+        stored as local wall-clock time, so ``date(due_date)`` is the local day.
+        """
+        start, end = _local_day_bounds(start_day, end_day)
+        day = func.date(Todo.due_date)
+        stmt = (
+            select(
+                day,
+                func.count(),
+                func.sum(case((Todo.is_done == True, 1), else_=0)),
+                func.sum(case(((Todo.is_done == False) & (Todo.due_date < _normalize(now)), 1), else_=0)),
+            )
+            .where(
+                (Todo.owner_id == owner_id)
+                & (Todo.deleted_at == None)
+                & (Todo.due_date >= start)
+                & (Todo.due_date < end)
+            )
+            .group_by(day)
+            .order_by(day)
+        )
+        with session_scope() as session:
+            try:
+                rows = session.exec(stmt).all()
+            except SQLAlchemyError as e:
+                logger.error("DB error in count_by_day", exc_info=True)
+                raise DatabaseError("Failed to aggregate todos by day", original=e) from e
+        return [
+            (day if isinstance(day, date) else date.fromisoformat(str(day)[:10]), total, done or 0, overdue or 0)
+            for day, total, done, overdue in rows
+        ]
+
+    def summary(self, owner_id: int) -> dict:
+        """Total / done / scheduled counts for an owner in one aggregate query."""
+        stmt = select(
+            func.count(),
+            func.sum(case((Todo.is_done == True, 1), else_=0)),
+            func.count(Todo.due_date),
+        ).where((Todo.owner_id == owner_id) & (Todo.deleted_at == None))
+        with session_scope() as session:
+            try:
+                total, done, scheduled = session.exec(stmt).one()
+            except SQLAlchemyError as e:
+                logger.error("DB error in summary", exc_info=True)
+                raise DatabaseError("Failed to summarise todos", original=e) from e
+        return {"total": total, "done": done or 0, "scheduled": scheduled}
+
+    def list_changes(
+        self, owner_id: int, *, after: Optional[Tuple[datetime, int]], limit: int
+    ) -> List[Todo]:
+        """Rows of ``owner_id`` changed after the ``(updated_at, id)`` position ``after``.
+
+        Soft-deleted rows are included so callers can emit tombstones. Walks
+        ``ix_todo_owner_updated`` in order; at most ``limit`` rows are returned.
+        """
+        with session_scope() as session:
+            try:
+                stmt = select(Todo).where(Todo.owner_id == owner_id)
+                if after is not None:
+                    updated_at, last_id = after
+                    stmt = stmt.where(
+                        (Todo.updated_at > updated_at)
+                        | ((Todo.updated_at == updated_at) & (Todo.id > last_id))
+                    )
+                stmt = stmt.order_by(Todo.updated_at, Todo.id).limit(limit)
+                return list(session.exec(stmt).all())
+            except SQLAlchemyError as e:
+                logger.error("DB error in list_changes", exc_info=True)
+                raise DatabaseError("Failed to fetch todo changes", original=e) from e
+
+    def change_stamp(self, owner_id: int) -> Optional[datetime]:
+        """Latest ``updated_at`` among the owner's todos, deleted ones included.
+
+        A single seek on ``ix_todo_owner_updated``; used as an HTTP validator.
+        """
+        with session_scope() as session:
+            try:
+                stmt = select(func.max(Todo.updated_at)).where(Todo.owner_id == owner_id)
+                return session.exec(stmt).one()
+            except SQLAlchemyError as e:
+                logger.error("DB error in change_stamp", exc_info=True)
+                raise DatabaseError("Failed to fetch todo change stamp", original=e) from e
+
     def get_overdue(self, owner_id: int) -> List[Todo]:
         """Get incomplete (non-deleted) todo items with due_date in the past"""
-        with get_session() as session:
+        with session_scope() as session:
             now = datetime.now(timezone.utc)
             try:
                 stmt = select(Todo).where(
@@ -149,7 +484,7 @@ class TodoRepository:
 
     def get_today(self, owner_id: int) -> List[Todo]:
         """Get incomplete (non-deleted) todo items with due_date today"""
-        with get_session() as session:
+        with session_scope() as session:
             today = datetime.now(timezone.utc)
             today_start = datetime.combine(today.date(), datetime.min.time(), tzinfo=timezone.utc)
             today_end = datetime.combine(today.date(), datetime.max.time(), tzinfo=timezone.utc)
@@ -168,60 +503,148 @@ class TodoRepository:
 
     def get_by_date(self, owner_id: int, target_date: date) -> List[Todo]:
         """Get all (non-deleted) todos that belong to the given calendar day."""
-        with get_session() as session:
+        return self.get_by_range(owner_id, target_date, target_date + timedelta(days=1))
+
+    def get_by_range(self, owner_id: int, start_day: date, end_day: date) -> List[Todo]:
+        """Todos due on local days ``start_day`` up to (not including) ``end_day``.
+
+        A half-open range on the bare column keeps ``ix_todo_owner_deleted_due``
+        usable, unlike ``date(due_date) = ?``.
+        """
+        start, end = _local_day_bounds(start_day, end_day)
+        with session_scope() as session:
             try:
                 stmt = select(Todo).where(
                     (Todo.owner_id == owner_id) &
-                    (Todo.due_date != None) &
-                    (func.date(Todo.due_date) == target_date) &
-                    (Todo.deleted_at == None)
+                    (Todo.deleted_at == None) &
+                    (Todo.due_date >= start) &
+                    (Todo.due_date < end)
                 ).order_by(Todo.due_date.asc())
                 return session.exec(stmt).all()
             except SQLAlchemyError as e:
-                logger.error("DB error in get_by_date", exc_info=True)
+                logger.error("DB error in get_by_range", exc_info=True)
                 raise DatabaseError("Failed to fetch todos by date", original=e) from e
 
-    def get_due_soon_without_reminder(
+    def claim_due_reminders(
         self,
         *,
-        window_start: datetime,
-        window_end: datetime,
+        now: datetime,
+        earliest_due: datetime,
+        max_lead_minutes: int,
+        token: str,
+        lease_seconds: int,
+        limit: int,
     ) -> List[tuple[Todo, str]]:
-        normalized_start = _normalize(window_start)
-        normalized_end = _normalize(window_end)
-        with get_session() as session:
+        """Atomically lease due reminders to ``token`` and return them.
+
+        Rows are claimed with one ``UPDATE ... WHERE id IN (SELECT ... FOR UPDATE
+        SKIP LOCKED)``; SQLite has no row locks but serialises writers, and the
+        claim predicate is repeated on the UPDATE so two workers never lease the
+        same row. Leases older than ``lease_seconds`` are treated as abandoned.
+        ``earliest_due`` drops todos that are already too far past their due
+        date; it also bounds the index range scanned on ``reminder_due_at``.
+        """
+        lower_bound = earliest_due - timedelta(minutes=max_lead_minutes)
+        lease_expired = now - timedelta(seconds=lease_seconds)
+        pending = (
+            (Todo.deleted_at == None)
+            & (Todo.is_done == False)
+            & (Todo.reminder_sent_at == None)
+            & (Todo.reminder_due_at >= lower_bound)
+            & (Todo.reminder_due_at <= now)
+        )
+        claimable = (
+            pending
+            & (Todo.due_date >= _normalize(earliest_due))
+            & ((Todo.reminder_claimed_at == None) | (Todo.reminder_claimed_at < lease_expired))
+        )
+        candidates = (
+            select(Todo.id)
+            .join(User, Todo.owner_id == User.id)
+            .where(claimable & (User.deleted_at == None) & (User.is_active == True))
+            .order_by(Todo.reminder_due_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True, of=Todo)
+        )
+        claim = (
+            update(Todo)
+            .where(Todo.id.in_(candidates.scalar_subquery()) & claimable)
+            .values(reminder_claim_token=token, reminder_claimed_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        with session_scope() as session:
             try:
+                session.execute(claim)
+                commit(session)
                 stmt = (
                     select(Todo, User.email)
                     .join(User, Todo.owner_id == User.id)
+                    .where(pending & (Todo.reminder_claim_token == token))
+                    .order_by(Todo.reminder_due_at)
+                )
+                return session.exec(stmt).all()
+            except SQLAlchemyError as e:
+                rollback(session)
+                logger.error("DB error in claim_due_reminders", exc_info=True)
+                raise DatabaseError("Failed to claim reminders", original=e) from e
+
+    def release_reminder_claims(self, todo_ids: List[int], token: str) -> None:
+        if not todo_ids:
+            return
+        stmt = (
+            update(Todo)
+            .where(Todo.id.in_(todo_ids) & (Todo.reminder_claim_token == token))
+            .values(reminder_claim_token=None, reminder_claimed_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        with session_scope() as session:
+            try:
+                session.execute(stmt)
+                commit(session)
+            except SQLAlchemyError as e:
+                rollback(session)
+                logger.error("DB error in release_reminder_claims", exc_info=True)
+                raise DatabaseError("Failed to release reminder claims", original=e) from e
+
+    def list_upcoming_reminders(
+        self, *, start: datetime, until: datetime, limit: int
+    ) -> List[tuple[int, datetime]]:
+        """Return ``(id, reminder_due_at)`` for unsent reminders due in ``[start, until]``."""
+        with session_scope() as session:
+            try:
+                stmt = (
+                    select(Todo.id, Todo.reminder_due_at)
                     .where(
                         (Todo.deleted_at == None)
                         & (Todo.is_done == False)
-                        & (Todo.due_date != None)
-                        & (Todo.due_date >= normalized_start)
-                        & (Todo.due_date <= normalized_end)
                         & (Todo.reminder_sent_at == None)
-                        & (User.deleted_at == None)
-                        & (User.is_active == True)
+                        & (Todo.reminder_due_at >= start)
+                        & (Todo.reminder_due_at <= until)
                     )
+                    .order_by(Todo.reminder_due_at)
+                    .limit(limit)
                 )
                 return session.exec(stmt).all()
             except SQLAlchemyError as e:
-                logger.error("DB error in get_due_soon_without_reminder", exc_info=True)
-                raise DatabaseError("Failed to fetch reminders", original=e) from e
+                logger.error("DB error in list_upcoming_reminders", exc_info=True)
+                raise DatabaseError("Failed to load upcoming reminders", original=e) from e
 
     def mark_reminder_sent(self, todo_ids: List[int], sent_at: datetime) -> None:
         if not todo_ids:
             return
         normalized_sent = _normalize(sent_at)
-        with get_session() as session:
+        # reminder_sent_at is part of the API representation, so updated_at moves
+        # with it and the changes feed and ETags pick it up
+        now = datetime.now(timezone.utc)
+        with session_scope() as session:
             try:
                 stmt = select(Todo).where(Todo.id.in_(todo_ids))
                 todos = session.exec(stmt).all()
                 for todo in todos:
                     todo.reminder_sent_at = normalized_sent
-                session.commit()
+                    todo.updated_at = now
+                commit(session)
             except SQLAlchemyError as e:
-                session.rollback()
+                rollback(session)
                 logger.error("DB error in mark_reminder_sent", exc_info=True)
                 raise DatabaseError("Failed to update reminders", original=e) from e
\ No newline at end of file
@@ -0,0 +1,173 @@
+"""Full-text search over todo titles and descriptions.
+
+SQLite keeps an FTS5 table (``todo_fts``) in sync with ``todo`` through
+triggers; PostgreSQL keeps a weighted ``todo.search_vector`` tsvector behind a
+GIN index. Both index accent-folded text so Vietnamese queries match with or
+without diacritics ("viec" finds "việc"). The schema objects are created by
+the ``0004`` migration (SQLite's table gained ``owner_id`` in ``0008``), and
+with the ``todo`` table whenever ``create_all`` builds it (tests, benchmarks).
+"""
+from __future__ import annotations
+
+from html import escape
+from typing import List, Optional
+import re
+import unicodedata
+
+from sqlalchemy import column, event, func, literal_column, select, table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import logger
+from app.models import Todo
+
+_VIETNAMESE_LETTERS = (
+    "àáảãạăằắẳẵặâầấẩẫậèéẻẽẹêềếểễệìíỉĩịòóỏõọôồốổỗộơờớởỡợùúủũụưừứửữựỳýỷỹỵđ"
+)
+_WORD = re.compile(r"\w+", re.UNICODE)
+_MAX_TERMS = 8
+
+todo_fts = table("todo_fts", column("rowid"), column("owner_id"))
+
+
+def _fold_char(char: str) -> str:
+    if char in "đĐ":
+        return "d"
+    base = unicodedata.normalize("NFD", char)[0].lower()
+    return base[0] if base else char
+
+
+def fold_text(value: str) -> str:
+    """Lower-case and strip diacritics one character at a time.
+
+    The result has the same length as ``value`` so offsets found in the
+    folded text can be mapped straight back onto the original.
+    """
+    return "".join(_fold_char(char) for char in value)
+
+
+def search_terms(q: Optional[str]) -> List[str]:
+    """Folded, de-duplicated words of a user query (at most ``_MAX_TERMS``)."""
+    terms: List[str] = []
+    for word in _WORD.findall(fold_text(q or "")):
+        if word not in terms:
+            terms.append(word)
+    return terms[:_MAX_TERMS]
+
+
+def highlight(value: Optional[str], terms: List[str], *, mark: str = "mark") -> str:
+    """HTML-escape ``value`` and wrap every accent-insensitive prefix match in ``<mark>``."""
+    if not value:
+        return ""
+    folded = fold_text(value)
+    spans: List[tuple[int, int]] = []
+    for match in _WORD.finditer(folded):
+        word = match.group()
+        if any(word.startswith(term) for term in terms):
+            length = max(len(term) for term in terms if word.startswith(term))
+            spans.append((match.start(), match.start() + length))
+    parts: List[str] = []
+    cursor = 0
+    for start, end in spans:
+        parts.append(escape(value[cursor:start]))
+        parts.append(f"<{mark}>{escape(value[start:end])}</{mark}>")
+        cursor = end
+    parts.append(escape(value[cursor:]))
+    return "".join(parts)
+
+
+def fulltext_filter(dialect_name: str, terms: List[str], owner_id: int):
+    """Return ``(hits, where, rank)`` for ``owner_id``'s todos matching a prefix AND-query over ``terms``.
+
+    On SQLite ``hits`` is a CTE of matching ``(id, rank)`` rows to join on
+    ``todo.id``; it is MATERIALIZED so the FTS index is probed once instead
+    of once per candidate todo row, and it is limited to the owner's rows
+    (``todo_fts.owner_id``) so only those are ranked. On PostgreSQL ``hits``
+    is ``None`` and ``where`` filters on the GIN-indexed tsvector. ``rank``
+    orders best matches first when used ascending.
+    """
+    if dialect_name == "postgresql":
+        query = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+        vector = literal_column("todo.search_vector")
+        return None, vector.op("@@")(query), -func.ts_rank(vector, query)
+    match = " ".join(f'"{term}"*' for term in terms)
+    fts = literal_column("todo_fts")
+    hits = (
+        select(todo_fts.c.rowid.label("id"), func.bm25(fts, 10.0, 1.0).label("rank"))
+        .where(fts.op("MATCH")(match) & (todo_fts.c.owner_id == owner_id))
+        .cte("fts_hits")
+        .prefix_with("MATERIALIZED")
+    )
+    return hits, None, hits.c.rank
+
+
+def _sqlite_fold(expr: str) -> str:
+    # unicode61 strips the combining marks; đ is a separate letter and is not
+    return f"replace(replace(coalesce({expr}, ''), 'đ', 'd'), 'Đ', 'D')"
+
+
+# owner_id is stored but not tokenised, so searches filter on it without
+# ranking other users' matches
+_SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS todo_fts USING fts5("
+    "title, description, owner_id UNINDEXED, tokenize = 'unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS todo_fts_ai AFTER INSERT ON todo BEGIN "
+    "INSERT INTO todo_fts(rowid, title, description, owner_id) VALUES "
+    f"(new.id, {_sqlite_fold('new.title')}, {_sqlite_fold('new.description')}, new.owner_id); END",
+    "CREATE TRIGGER IF NOT EXISTS todo_fts_ad AFTER DELETE ON todo BEGIN "
+    "DELETE FROM todo_fts WHERE rowid = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS todo_fts_au AFTER UPDATE OF title, description, owner_id ON todo BEGIN "
+    "DELETE FROM todo_fts WHERE rowid = old.id; "
+    "INSERT INTO todo_fts(rowid, title, description, owner_id) VALUES "
+    f"(new.id, {_sqlite_fold('new.title')}, {_sqlite_fold('new.description')}, new.owner_id); END",
+]
+
+_PG_FOLD_FROM = _VIETNAMESE_LETTERS + _VIETNAMESE_LETTERS.upper()
+_PG_FOLD_TO = fold_text(_VIETNAMESE_LETTERS) * 2
+
+_POSTGRES_DDL = [
+    "ALTER TABLE todo ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    # translate() rather than unaccent: no extension needed and it is IMMUTABLE
+    "CREATE OR REPLACE FUNCTION todo_fold(value text) RETURNS text AS $$ "
+    f"SELECT translate(lower(coalesce(value, '')), '{_PG_FOLD_FROM}', '{_PG_FOLD_TO}') "
+    "$$ LANGUAGE sql IMMUTABLE",
+    "CREATE OR REPLACE FUNCTION todo_search_vector_update() RETURNS trigger AS $$ BEGIN "
+    "NEW.search_vector := "
+    "setweight(to_tsvector('simple', todo_fold(NEW.title)), 'A') || "
+    "setweight(to_tsvector('simple', todo_fold(NEW.description)), 'B'); "
+    "RETURN NEW; END $$ LANGUAGE plpgsql",
+    "DROP TRIGGER IF EXISTS todo_search_vector_trg ON todo",
+    "CREATE TRIGGER todo_search_vector_trg BEFORE INSERT OR UPDATE OF title, description "
+    "ON todo FOR EACH ROW EXECUTE FUNCTION todo_search_vector_update()",
+    "CREATE INDEX IF NOT EXISTS ix_todo_search_vector ON todo USING GIN (search_vector)",
+]
+
+
+def install_todo_search(connection: Connection) -> bool:
+    """Create the search table/column and its triggers; False if unsupported."""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        has_fts5 = connection.execute(text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar()
+        if not has_fts5:
+            logger.warning("SQLite was built without FTS5; full-text search is unavailable")
+            return False
+        for statement in _SQLITE_DDL:
+            connection.execute(text(statement))
+        return True
+    if dialect != "postgresql":
+        return False
+    try:
+        # Savepoint so a missing privilege does not abort the surrounding create_all
+        with connection.begin_nested():
+            for statement in _POSTGRES_DDL:
+                connection.execute(text(statement))
+    except SQLAlchemyError:
+        logger.warning("Full-text search is unavailable on this database", exc_info=True)
+        return False
+    return True
+
+
+@event.listens_for(Todo.__table__, "after_create")
+def _create_todo_search(target, connection, **kw) -> None:
+    install_todo_search(connection)
+
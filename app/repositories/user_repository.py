@@ -2,28 +2,35 @@ from datetime import datetime, timezone
 from typing import Optional, List, Iterable
 from sqlmodel import select
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import func
+from sqlalchemy import func, update
 
 from app.models import User
-from app.db import get_session
+from app.db import session_scope, commit, rollback, on_commit
+from app.core.cache import user_cache, user_cache_keys
 from app.core.config import logger
 from app.core.exceptions import DatabaseError
 
+def _forget(user_id: Optional[int], email: Optional[str]) -> None:
+    """Drop a user from the process cache once the change is committed."""
+    keys = user_cache_keys(user_id, email)
+    on_commit(lambda: user_cache.delete(*keys))
+
+
 class UserRepository:
     def create(self, user: User) -> User:
-        with get_session() as session:
+        with session_scope() as session:
             try:
                 session.add(user)
-                session.commit()
+                commit(session)
                 session.refresh(user)
                 return user
             except SQLAlchemyError as e:
-                session.rollback()
+                rollback(session)
                 logger.error("DB error in user create", exc_info=True)
                 raise DatabaseError("Failed to create user", original=e) from e
 
     def get_by_email(self, email: str, *, include_deleted: bool = False) -> Optional[User]:
-        with get_session() as session:
+        with session_scope() as session:
             try:
                 stmt = select(User).where(User.email == email)
                 if not include_deleted:
@@ -34,7 +41,7 @@ class UserRepository:
                 raise DatabaseError("Failed to fetch user by email", original=e) from e
 
     def get_by_id(self, user_id: int, *, include_deleted: bool = False) -> Optional[User]:
-        with get_session() as session:
+        with session_scope() as session:
             try:
                 user = session.get(User, user_id)
                 if user and not include_deleted and user.deleted_at is not None:
@@ -50,7 +57,7 @@ class UserRepository:
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
     ) -> List[User]:
-        with get_session() as session:
+        with session_scope() as session:
             try:
                 stmt = select(User).where(User.deleted_at.is_(None)).order_by(User.created_at.desc())
                 if search:
@@ -71,7 +78,7 @@ class UserRepository:
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
     ) -> List[User]:
-        with get_session() as session:
+        with session_scope() as session:
             try:
                 stmt = select(User).where(User.deleted_at.is_not(None)).order_by(User.deleted_at.desc())
                 if search:
@@ -87,7 +94,7 @@ class UserRepository:
                 raise DatabaseError("Failed to list deleted users", original=e) from e
 
     def delete(self, user_id: int) -> bool:
-        with get_session() as session:
+        with session_scope() as session:
             try:
                 user = session.get(User, user_id)
                 if not user or user.deleted_at is not None:
@@ -95,15 +102,16 @@ class UserRepository:
                 user.deleted_at = datetime.now(timezone.utc)
                 user.is_active = False
                 session.add(user)
-                session.commit()
+                commit(session)
+                _forget(user.id, user.email)
                 return True
             except SQLAlchemyError as e:
-                session.rollback()
+                rollback(session)
                 logger.error("DB error in delete user", exc_info=True)
                 raise DatabaseError("Failed to delete user", original=e) from e
 
     def restore(self, user_id: int) -> bool:
-        with get_session() as session:
+        with session_scope() as session:
             try:
                 user = session.get(User, user_id)
                 if not user or user.deleted_at is None:
@@ -111,15 +119,41 @@ class UserRepository:
                 user.deleted_at = None
                 user.is_active = True
                 session.add(user)
-                session.commit()
+                commit(session)
+                _forget(user.id, user.email)
                 return True
             except SQLAlchemyError as e:
-                session.rollback()
+                rollback(session)
                 logger.error("DB error in restore user", exc_info=True)
                 raise DatabaseError("Failed to restore user", original=e) from e
 
+    def replace_password_hash(self, user_id: int, email: str, old_hash: str, new_hash: str) -> bool:
+        """Swap in ``new_hash`` only if the stored hash is still ``old_hash``.
+
+        The compare-and-set keeps a background rehash from undoing a password
+        reset that landed in between.
+        """
+        stmt = (
+            update(User)
+            .where((User.id == user_id) & (User.hashed_password == old_hash))
+            .values(hashed_password=new_hash)
+            .execution_options(synchronize_session=False)
+        )
+        with session_scope() as session:
+            try:
+                result = session.execute(stmt)
+                commit(session)
+                if not result.rowcount:
+                    return False
+                _forget(user_id, email)
+                return True
+            except SQLAlchemyError as e:
+                rollback(session)
+                logger.error("DB error in replace_password_hash", exc_info=True)
+                raise DatabaseError("Failed to update password hash", original=e) from e
+
     def reactivate_deleted_user(self, user: User, hashed_password: str) -> User:
-        with get_session() as session:
+        with session_scope() as session:
             try:
                 db_user = session.get(User, user.id)
                 if not db_user or db_user.deleted_at is None:
@@ -132,11 +166,12 @@ class UserRepository:
                 db_user.otp_expire = None
                 db_user.otp_used = False
                 session.add(db_user)
-                session.commit()
+                commit(session)
                 session.refresh(db_user)
+                _forget(db_user.id, db_user.email)
                 return db_user
             except SQLAlchemyError as e:
-                session.rollback()
+                rollback(session)
                 logger.error("DB error in reactivate_deleted_user", exc_info=True)
                 raise DatabaseError("Failed to reactivate deleted user", original=e) from e
 
@@ -146,7 +181,7 @@ class UserRepository:
         end_date: Optional[datetime],
         exclude_ids: Optional[Iterable[int]] = None,
     ) -> int:
-        with get_session() as session:
+        with session_scope() as session:
             exclude_ids = set(exclude_ids or [])
             try:
                 stmt = select(User).where(User.deleted_at.is_(None))
@@ -164,11 +199,10 @@ class UserRepository:
                     session.add(user)
                     deleted += 1
                 if deleted:
-                    session.commit()
-                else:
-                    session.rollback()
+                    commit(session)
+                    on_commit(user_cache.clear)
                 return deleted
             except SQLAlchemyError as e:
-                session.rollback()
+                rollback(session)
                 logger.error("DB error in delete_by_date_range", exc_info=True)
                 raise DatabaseError("Failed to delete users by date", original=e) from e
@@ -5,7 +5,7 @@ from fastapi import APIRouter, Request, Form
 from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 
-from app.core.jwt import decode_token
+from app.core.jwt import decode_request_token
 from app.core.config import logger
 from app.core.exceptions import AppError, ValidationError
 from app.services.user_service import service as user_service
@@ -23,7 +23,7 @@ def _require_admin_user(request: Request):
     if not token:
         return None, RedirectResponse("/api/v1/auth/login-page", status_code=302)
 
-    email = decode_token(token)
+    email = decode_request_token(request, token)
     if not email:
         return None, RedirectResponse("/api/v1/auth/login-page", status_code=302)
 
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends, Header, Request, Form, status, Body
+from fastapi import APIRouter, HTTPException, Depends, Header, Cookie, Request, Form, status, Body
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 from typing import Optional
@@ -9,7 +9,7 @@ from pydantic import BaseModel, EmailStr, TypeAdapter, ValidationError as Pydant
 from app.services.user_service import service as user_service
 from app.services import registration_otp_service
 from app.models import UserCreate, UserLogin, UserResponse, Token
-from app.core.jwt import decode_token
+from app.core.jwt import decode_request_token, decode_token
 from app.core.exceptions import (
     AppError,
     ValidationError,
@@ -18,6 +18,7 @@ from app.core.exceptions import (
     DatabaseError,
     AuthenticationError,
     EmailError,
+    ServiceBusyError,
 )
 from app.core.config import logger
 
@@ -36,6 +37,9 @@ def _map_app_error(exc: AppError) -> HTTPException:
         return HTTPException(status_code=404, detail=str(exc))
     if isinstance(exc, ConflictError):
         return HTTPException(status_code=409, detail=str(exc))
+    if isinstance(exc, ServiceBusyError):
+        headers = {"Retry-After": str(exc.retry_after)} if exc.retry_after else None
+        return HTTPException(status_code=503, detail=str(exc), headers=headers)
     if isinstance(exc, DatabaseError):
         return HTTPException(status_code=500, detail="internal server error")
     return HTTPException(status_code=500, detail="internal server error")
@@ -76,11 +80,32 @@ def me(authorization: Optional[str] = Header(None)):
         raise HTTPException(status_code=404, detail="user not found")
     return user
 
-def get_current_user(authorization: Optional[str] = Header(None)):
+def get_current_user(request: Request, authorization: Optional[str] = Header(None)):
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="missing or invalid token")
-    token = authorization[7:]
-    email = decode_token(token)
+    return _user_from_token(authorization[7:], request)
+
+
+def get_current_user_or_cookie(
+    request: Request,
+    authorization: Optional[str] = Header(None),
+    access_token: Optional[str] = Cookie(None),
+):
+    """Like ``get_current_user`` but also accepts the dashboard session cookie.
+
+    Only for read-only endpoints fetched by the dashboard scripts; mutating
+    endpoints keep requiring the bearer header so the cookie cannot be used
+    for cross-site requests.
+    """
+    if authorization and authorization.startswith("Bearer "):
+        return _user_from_token(authorization[7:], request)
+    if not access_token:
+        raise HTTPException(status_code=401, detail="missing or invalid token")
+    return _user_from_token(access_token, request)
+
+
+def _user_from_token(token: str, request: Optional[Request] = None):
+    email = decode_request_token(request, token) if request is not None else decode_token(token)
     if not email:
         raise HTTPException(status_code=401, detail="invalid token")
     try:
@@ -162,6 +187,12 @@ def register_page_post(
             "register.html",
             {"request": request, "error": "Email đã tồn tại", "prefill_email": normalized_email},
         )
+    except ServiceBusyError:
+        return templates.TemplateResponse(
+            "register.html",
+            {"request": request, "error": "Hệ thống đang bận, vui lòng thử lại sau giây lát", "prefill_email": normalized_email},
+            status_code=503,
+        )
     except AppError:
         logger.error("Register page error", exc_info=True)
         return templates.TemplateResponse(
@@ -191,6 +222,12 @@ def login_page_post(request: Request, email: str = Form(...), password: str = Fo
             "login.html",
             {"request": request, "error": "Email hoặc mật khẩu không đúng", "prefill_email": email.lower()},
         )
+    except ServiceBusyError:
+        return templates.TemplateResponse(
+            "login.html",
+            {"request": request, "error": "Hệ thống đang bận, vui lòng thử lại sau giây lát", "prefill_email": email.lower()},
+            status_code=503,
+        )
     except AppError as exc:
         logger.error("Login page error", exc_info=True)
         return templates.TemplateResponse(
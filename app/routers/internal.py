@@ -0,0 +1,47 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+import hmac
+
+from app.core.cache import token_cache, user_cache
+from app.core.config import settings
+from app.core.password_pool import password_pool
+from app.db import pool_status
+from app.services.event_bus import event_bus
+
+router = APIRouter()
+
+
+def require_metrics_token(authorization: Optional[str] = Header(None)) -> None:
+    """Bearer-token guard for every /internal route; closed unless a token is configured."""
+    expected = settings.INTERNAL_METRICS_TOKEN
+    if not expected:
+        raise HTTPException(status_code=403, detail="internal metrics are disabled (INTERNAL_METRICS_TOKEN not set)")
+    supplied = authorization[7:] if authorization and authorization.startswith("Bearer ") else ""
+    if not hmac.compare_digest(supplied, expected):
+        raise HTTPException(status_code=401, detail="invalid metrics token")
+
+
+@router.get("/user-cache", dependencies=[Depends(require_metrics_token)])
+def user_cache_stats():
+    return user_cache.stats()
+
+
+@router.get("/token-cache", dependencies=[Depends(require_metrics_token)])
+def token_cache_stats():
+    return token_cache.stats()
+
+
+@router.get("/password-hashing", dependencies=[Depends(require_metrics_token)])
+def password_hashing_stats():
+    return password_pool.stats()
+
+
+@router.get("/db-pool", dependencies=[Depends(require_metrics_token)])
+def db_pool_stats():
+    return pool_status()
+
+
+@router.get("/event-streams", dependencies=[Depends(require_metrics_token)])
+def event_stream_stats():
+    return event_bus.stats()
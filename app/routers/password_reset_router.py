@@ -11,8 +11,8 @@ from pydantic import (
 from sqlmodel import Session
 
 from app.core.config import logger
-from app.core.exceptions import AppError, ValidationError, DatabaseError, EmailError
-from app.db import get_session
+from app.core.exceptions import AppError, ValidationError, DatabaseError, EmailError, ServiceBusyError
+from app.db import session_scope
 from app.services.password_reset_service import (
     PasswordResetService,
     GENERIC_MESSAGE,
@@ -39,11 +39,8 @@ class ResetPasswordRequest(BaseModel):
 
 
 def _get_db_session():
-    session = get_session()
-    try:
+    with session_scope() as session:
         yield session
-    finally:
-        session.close()
 
 
 def _map_error(exc: AppError) -> HTTPException:
@@ -57,6 +54,9 @@ def _map_error(exc: AppError) -> HTTPException:
     elif isinstance(exc, EmailError):
         message = "email error"
         status = 500
+    elif isinstance(exc, ServiceBusyError):
+        headers = {"Retry-After": str(exc.retry_after)} if exc.retry_after else None
+        return HTTPException(status_code=503, detail={"message": message, "code": code}, headers=headers)
     return HTTPException(status_code=status, detail={"message": message, "code": code})
 
 
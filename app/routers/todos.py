@@ -1,11 +1,23 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Literal, Optional
+from datetime import datetime
 import math
 
-from app.services.todo_service import service
-from app.models import TodoCreate, TodoUpdate, Todo
-from app.routers.auth import get_current_user
-from app.core.exceptions import AppError, ValidationError, ConflictError, NotFoundError, DatabaseError
+from app.services.todo_service import service, with_highlights
+from app.services.event_bus import event_bus
+from app.models import TodoBatchRequest, TodoCreate, TodoUpdate, Todo
+from app.routers.auth import get_current_user, get_current_user_or_cookie
+from app.core.config import settings
+from app.core.exceptions import (
+    AppError,
+    ValidationError,
+    ConflictError,
+    NotFoundError,
+    DatabaseError,
+    ServiceBusyError,
+)
+from app.core.http_cache import API_CACHE_CONTROL, apply_validators, etag_matches, make_etag, not_modified
 
 router = APIRouter()
 
@@ -17,10 +29,21 @@ def _map_app_error(exc: AppError) -> HTTPException:
         return HTTPException(status_code=404, detail=str(exc))
     if isinstance(exc, ConflictError):
         return HTTPException(status_code=409, detail=str(exc))
+    if isinstance(exc, ServiceBusyError):
+        headers = {"Retry-After": str(exc.retry_after)} if exc.retry_after else None
+        return HTTPException(status_code=503, detail=str(exc), headers=headers)
     if isinstance(exc, DatabaseError):
         return HTTPException(status_code=500, detail="internal server error")
     return HTTPException(status_code=500, detail="internal server error")
 
+
+def _check_etag(request: Request, owner_id: int, *parts) -> tuple[str, Optional[Response]]:
+    """ETag for a response of ``owner_id``'s todos, plus a 304 if the client already has it."""
+    etag = make_etag(*parts, owner_id, service.change_stamp(owner_id))
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return etag, not_modified(etag, API_CACHE_CONTROL, "Authorization")
+    return etag, None
+
 @router.get("/overdue", tags=["todos"])
 def get_overdue(current_user = Depends(get_current_user)):
     try:
@@ -37,8 +60,63 @@ def get_today(current_user = Depends(get_current_user)):
     except AppError as exc:
         raise _map_app_error(exc)
 
+@router.get("/calendar", tags=["todos"])
+def get_calendar(
+    month: str = Query(..., pattern=r"^\d{4}-\d{2}$"),
+    current_user = Depends(get_current_user_or_cookie)
+):
+    try:
+        year, month_number = (int(part) for part in month.split("-"))
+        return service.calendar_month(current_user.id, year, month_number)
+    except AppError as exc:
+        raise _map_app_error(exc)
+
+@router.get("/changes", tags=["todos"])
+def get_changes(
+    since: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    current_user = Depends(get_current_user)
+):
+    try:
+        return service.changes(current_user.id, since=since, limit=limit)
+    except AppError as exc:
+        raise _map_app_error(exc)
+
+class _EventStreamResponse(StreamingResponse):
+    """Gives the stream's slot back to the event bus however the response ends.
+
+    ``event_bus.stream`` disconnects in its own ``finally``, but that never runs
+    when the body is not started (client gone, or sending the headers failed).
+    """
+
+    def __init__(self, subscription, content, **kwargs):
+        super().__init__(content, **kwargs)
+        self.subscription = subscription
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            event_bus.disconnect(self.subscription)
+
+@router.get("/stream", tags=["todos"])
+async def stream_todos(request: Request, current_user = Depends(get_current_user_or_cookie)):
+    """Server-Sent Events: created/updated/deleted events for the user's todos."""
+    try:
+        subscription = event_bus.connect(current_user.id)
+    except AppError as exc:
+        raise _map_app_error(exc)
+    return _EventStreamResponse(
+        subscription,
+        event_bus.stream(subscription, request.is_disconnected, settings.SSE_HEARTBEAT_SECONDS),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.get("/", tags=["todos"])
 def list_todos(
+    request: Request,
+    response: Response,
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
     page: Optional[int] = Query(None, ge=1),
@@ -46,21 +124,51 @@ def list_todos(
     q: Optional[str] = None,
     is_done: Optional[bool] = None,
     sort: Optional[str] = None,
+    count: bool = True,
+    cursor: Optional[str] = None,
+    due_from: Optional[datetime] = None,
+    due_to: Optional[datetime] = None,
+    priority: Optional[str] = None,
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    search_mode: Literal["like", "fulltext"] = "like",
     current_user = Depends(get_current_user)
 ):
     try:
+        etag, cached = _check_etag(
+            request, current_user.id, "todos", sorted(request.query_params.multi_items())
+        )
+        if cached is not None:
+            return cached
+        apply_validators(response, etag, API_CACHE_CONTROL, "Authorization")
         effective_limit = page_size or limit
-        effective_page = page or (offset // effective_limit + 1)
-        effective_offset = (effective_page - 1) * effective_limit
-        items, total = service.list(
+        if cursor:
+            effective_page = None
+            effective_offset = 0
+        else:
+            effective_page = page or (offset // effective_limit + 1)
+            effective_offset = (effective_page - 1) * effective_limit
+        items, total, next_cursor = service.list(
             current_user.id,
             limit=effective_limit,
             offset=effective_offset,
             q=q,
             is_done=is_done,
-            sort=sort
+            sort=sort,
+            count=count,
+            cursor=cursor,
+            due_from=due_from,
+            due_to=due_to,
+            priority=priority,
+            status=status,
+            category=category,
+            search_mode=search_mode
         )
-        total_pages = math.ceil(total / effective_limit) if effective_limit else 1
+        if search_mode == "fulltext" and q:
+            items = with_highlights(items, q)
+        total_pages = None
+        if total is not None:
+            total_pages = math.ceil(total / effective_limit) if effective_limit else 1
         return {
             "items": items,
             "total": total,
@@ -68,7 +176,8 @@ def list_todos(
             "offset": effective_offset,
             "page": effective_page,
             "page_size": effective_limit,
-            "total_pages": total_pages
+            "total_pages": total_pages,
+            "next_cursor": next_cursor
         }
     except AppError as exc:
         raise _map_app_error(exc)
@@ -83,10 +192,24 @@ def create_todo(payload: TodoCreate, current_user = Depends(get_current_user)):
     except AppError as exc:
         raise _map_app_error(exc)
 
+@router.post("/batch", tags=["todos"])
+def batch_todos(payload: TodoBatchRequest, current_user = Depends(get_current_user)):
+    try:
+        results = service.batch(current_user.id, payload.operations)
+    except AppError as exc:
+        raise _map_app_error(exc)
+    succeeded = sum(1 for result in results if result["ok"])
+    return {"results": results, "succeeded": succeeded, "failed": len(results) - succeeded}
+
 @router.get("/{todo_id}")
-def get_todo(todo_id: int, current_user = Depends(get_current_user)):
+def get_todo(todo_id: int, request: Request, response: Response, current_user = Depends(get_current_user)):
     try:
-        return service.get(todo_id, current_user.id)
+        etag, cached = _check_etag(request, current_user.id, "todo", todo_id)
+        if cached is not None:
+            return cached
+        todo = service.get(todo_id, current_user.id)
+        apply_validators(response, etag, API_CACHE_CONTROL, "Authorization")
+        return todo
     except AppError as exc:
         raise _map_app_error(exc)
 
@@ -95,16 +218,7 @@ def put_todo(todo_id: int, payload: TodoCreate, current_user = Depends(get_curre
     try:
         if not (3 <= len(payload.title) <= 100):
             raise ValidationError("title length must be 3-100", field="title")
-        updated = service.update(
-            todo_id,
-            current_user.id,
-            TodoUpdate(
-                title=payload.title,
-                description=payload.description,
-                due_date=payload.due_date,
-                tags=payload.tags
-            )
-        )
+        updated = service.update(todo_id, current_user.id, TodoUpdate(**payload.model_dump()))
         return updated
     except AppError as exc:
         raise _map_app_error(exc)
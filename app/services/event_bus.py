@@ -0,0 +1,310 @@
+"""Fan-out of committed todo changes to live ``/todos/stream`` connections.
+
+``TodoService`` hands over the ``TodoEvent``s of each committed unit of work;
+the bus forwards them to a backend in one call, and the backend hands each
+back to ``deliver`` in every worker that should see it. ``LocalBackend`` stays inside this process;
+``PostgresNotifyBackend`` goes through ``NOTIFY``/``LISTEN`` so a change made
+on one gunicorn worker reaches streams held open by the others.
+"""
+from __future__ import annotations
+
+from threading import Event, Lock, Thread
+from typing import AsyncIterator, Awaitable, Callable, Optional
+import asyncio
+import json
+import select
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+
+from app.core.config import logger, settings
+from app.core.exceptions import ServiceBusyError
+from app.db import engine
+from app.services.todo_service import TodoEvent, service as todo_service
+
+Deliver = Callable[[dict], None]
+
+
+class LocalBackend:
+    """Deliver events to subscribers of this worker only."""
+
+    name = "local"
+
+    def __init__(self) -> None:
+        self._deliver: Optional[Deliver] = None
+
+    def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    def stop(self) -> None:
+        self._deliver = None
+
+    def publish(self, messages: list[dict]) -> None:
+        if self._deliver is not None:
+            for message in messages:
+                self._deliver(message)
+
+
+class PostgresNotifyBackend:
+    """Broadcast events to every worker through PostgreSQL ``LISTEN``/``NOTIFY``.
+
+    Each unit of work's events go out in one transaction on the shared pool,
+    packed into as few ``pg_notify`` JSON arrays as NOTIFY's 8000-byte limit
+    allows; an event too large on its own is sent without the row snapshot.
+    Each worker keeps one dedicated autocommit connection (outside the pool)
+    listening on a thread.
+    """
+
+    name = "postgres"
+    CHANNEL = "todo_events"
+    MAX_PAYLOAD = 7900
+
+    def __init__(self, database_url: str) -> None:
+        self._database_url = database_url
+        self._deliver: Optional[Deliver] = None
+        self._stopping = Event()
+        self._thread: Optional[Thread] = None
+
+    def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+        self._stopping.clear()
+        self._thread = Thread(target=self._listen, name="todo-events-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._thread = None
+        self._deliver = None
+
+    def publish(self, messages: list[dict]) -> None:
+        payloads = self._pack(messages)
+        with engine.begin() as conn:
+            conn.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                [{"channel": self.CHANNEL, "payload": payload} for payload in payloads],
+            )
+
+    def _pack(self, messages: list[dict]) -> list[str]:
+        payloads: list[str] = []
+        batch: list[str] = []
+        size = 2
+        for message in messages:
+            encoded = json.dumps(message, separators=(",", ":"))
+            if len(encoded.encode()) + 2 > self.MAX_PAYLOAD:
+                encoded = json.dumps({**message, "data": {}}, separators=(",", ":"))
+            length = len(encoded.encode()) + 1
+            if batch and size + length > self.MAX_PAYLOAD:
+                payloads.append(f"[{','.join(batch)}]")
+                batch, size = [], 2
+            batch.append(encoded)
+            size += length
+        if batch:
+            payloads.append(f"[{','.join(batch)}]")
+        return payloads
+
+    def _listen(self) -> None:
+        listen_engine = create_engine(self._database_url, poolclass=NullPool)
+        backoff = 1.0
+        while not self._stopping.is_set():
+            raw = None
+            try:
+                raw = listen_engine.raw_connection()
+                connection = raw.driver_connection
+                connection.autocommit = True
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.CHANNEL}")
+                logger.info("Listening for todo events on channel %s", self.CHANNEL)
+                backoff = 1.0
+                while not self._stopping.is_set():
+                    if select.select([connection], [], [], 1.0) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notify = connection.notifies.pop(0)
+                        if self._deliver is not None:
+                            for message in json.loads(notify.payload):
+                                self._deliver(message)
+            except Exception:
+                logger.warning("Todo event listener failed; reconnecting in %.0fs", backoff, exc_info=True)
+                self._stopping.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if raw is not None:
+                    try:
+                        raw.close()
+                    except Exception:
+                        pass
+        listen_engine.dispose()
+
+
+def _make_backend():
+    if settings.TODO_EVENTS_BACKEND == "postgres":
+        if make_url(settings.DATABASE_URL).get_backend_name() == "postgresql":
+            return PostgresNotifyBackend(settings.DATABASE_URL)
+        logger.warning("TODO_EVENTS_BACKEND=postgres needs a PostgreSQL DATABASE_URL; using local events")
+    elif settings.TODO_EVENTS_BACKEND != "local":
+        logger.warning("Unknown TODO_EVENTS_BACKEND '%s'; using local events", settings.TODO_EVENTS_BACKEND)
+    return LocalBackend()
+
+
+class Subscription:
+    """One open stream: a bounded queue owned by the event loop serving it."""
+
+    def __init__(self, owner_id: int, loop: asyncio.AbstractEventLoop, maxsize: int) -> None:
+        self.owner_id = owner_id
+        self.loop = loop
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def offer(self, message: dict) -> None:
+        """Enqueue on the loop thread; a slow client loses events and is told to resync."""
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def next(self, timeout: float) -> Optional[dict]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+def format_sse(event: str, data: Optional[dict] = None) -> str:
+    payload = json.dumps(data if data is not None else {}, ensure_ascii=False, separators=(",", ":"))
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+class TodoEventBus:
+    def __init__(self, max_connections: int, queue_size: int) -> None:
+        self.max_connections = max_connections
+        self.queue_size = queue_size
+        self._subscriptions: dict[int, set[Subscription]] = {}
+        self._count = 0
+        self._lock = Lock()
+        self._backend = None
+        self.published = 0
+        self.delivered = 0
+        self.rejected = 0
+
+    def start(self) -> None:
+        with self._lock:
+            if self._backend is not None:
+                return
+            self._backend = _make_backend()
+        self._backend.start(self.deliver)
+        todo_service.subscribe(self._on_todo_event)
+        logger.info("Todo event bus started (backend=%s)", self._backend.name)
+
+    def stop(self) -> None:
+        todo_service.unsubscribe(self._on_todo_event)
+        with self._lock:
+            backend, self._backend = self._backend, None
+        if backend is not None:
+            backend.stop()
+
+    def _on_todo_event(self, events: list[TodoEvent]) -> None:
+        """Todo service hook, run after commit on the request's thread."""
+        backend = self._backend
+        if backend is None:
+            return
+        messages = [
+            {
+                "kind": event.kind,
+                "todo_id": event.todo_id,
+                "owner_id": event.owner_id,
+                "data": jsonable_encoder(event.data),
+            }
+            for event in events
+        ]
+        try:
+            backend.publish(messages)
+        except Exception:
+            logger.warning("Failed to publish %s todo event(s)", len(messages), exc_info=True)
+            return
+        with self._lock:
+            self.published += len(messages)
+
+    def deliver(self, message: dict) -> None:
+        """Hand ``message`` to the owner's open streams; safe to call from any thread."""
+        with self._lock:
+            targets = list(self._subscriptions.get(message.get("owner_id"), ()))
+        delivered = 0
+        for subscription in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, message)
+                delivered += 1
+            except RuntimeError:
+                # Loop closed under a stream that has not unregistered yet
+                pass
+        if delivered:
+            with self._lock:
+                self.delivered += delivered
+
+    def connect(self, owner_id: int) -> Subscription:
+        """Register a stream for ``owner_id``; must run on the event loop that will read it."""
+        self.start()
+        with self._lock:
+            if self._count >= self.max_connections:
+                self.rejected += 1
+                raise ServiceBusyError("too many open event streams", retry_after=5)
+            subscription = Subscription(owner_id, asyncio.get_running_loop(), self.queue_size)
+            self._subscriptions.setdefault(owner_id, set()).add(subscription)
+            self._count += 1
+        return subscription
+
+    def disconnect(self, subscription: Subscription) -> None:
+        with self._lock:
+            owned = self._subscriptions.get(subscription.owner_id)
+            if owned is None or subscription not in owned:
+                return
+            owned.discard(subscription)
+            if not owned:
+                del self._subscriptions[subscription.owner_id]
+            self._count -= 1
+
+    async def stream(
+        self,
+        subscription: Subscription,
+        is_disconnected: Callable[[], Awaitable[bool]],
+        heartbeat: float,
+    ) -> AsyncIterator[str]:
+        """SSE body for ``subscription``: change events, ``resync`` after overflow, heartbeats."""
+        try:
+            yield "retry: 5000\n\n"
+            yield format_sse("ready")
+            while not await is_disconnected():
+                message = await subscription.next(heartbeat)
+                if subscription.overflowed:
+                    while not subscription.queue.empty():
+                        subscription.queue.get_nowait()
+                    subscription.overflowed = False
+                    yield format_sse("resync")
+                    continue
+                if message is None:
+                    yield ": ping\n\n"
+                    continue
+                yield format_sse(
+                    message["kind"], {"id": message["todo_id"], "todo": message.get("data") or None}
+                )
+        finally:
+            self.disconnect(subscription)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": self._backend.name if self._backend is not None else None,
+                "connections": self._count,
+                "max_connections": self.max_connections,
+                "users": len(self._subscriptions),
+                "published": self.published,
+                "delivered": self.delivered,
+                "rejected": self.rejected,
+            }
+
+
+event_bus = TodoEventBus(settings.SSE_MAX_CONNECTIONS, settings.SSE_QUEUE_SIZE)
@@ -6,16 +6,16 @@ import os
 import secrets
 import hmac
 
-import resend
-
 from threading import Lock
 
 from sqlalchemy.exc import SQLAlchemyError
 from sqlmodel import Session, select
 
+from app.core.cache import user_cache, user_cache_keys
 from app.core.config import settings, logger
 from app.core.exceptions import DatabaseError, ValidationError, EmailError
 from app.core.jwt import hash_password
+from app.core.password_pool import password_pool
 from app.models import User
 
 
@@ -151,7 +151,7 @@ class PasswordResetService:
                     code="invalid_otp",
                 )
 
-            user.hashed_password = hash_password(new_password)
+            user.hashed_password = password_pool.run("reset_password", hash_password, new_password)
             user.otp_code = None
             user.otp_expire = None
             user.otp_used = False
@@ -174,6 +174,7 @@ class PasswordResetService:
             self.session.add(user)
             self.session.commit()
             self.session.refresh(user)
+            user_cache.delete(*user_cache_keys(user.id, user.email))
         except SQLAlchemyError as exc:
             self.session.rollback()
             logger.error("DB error while processing %s", action, exc_info=True)
@@ -182,13 +183,22 @@ class PasswordResetService:
 VERIFIED_SENDER = "no-reply@todulist.online"
 
 
+def _resend(api_key: str):
+    # Imported on first send: the SDK pulls in requests and httpx, which
+    # would otherwise add ~0.3 s to every worker's boot
+    import resend
+
+    resend.api_key = api_key
+    return resend
+
+
 def send_email(to_email: str, subject: str, html_content: str):
     api_key = os.getenv("RESEND_API_KEY")
 
     if not api_key:
         raise EmailError("RESEND_API_KEY not configured")
 
-    resend.api_key = api_key
+    resend = _resend(api_key)
 
     normalized_html = html_content.replace("\n", "<br>")
 
@@ -206,3 +216,48 @@ def send_email(to_email: str, subject: str, html_content: str):
     except Exception as exc:
         logger.error("Resend API request failed: %s", exc, exc_info=True)
         raise EmailError(f"Resend failed: {exc}") from exc
+
+
+def send_batch_emails(messages: list[dict], *, idempotency_key: str | None = None):
+    """Send several ``{"to_email", "subject", "html_content"}`` messages in one Resend call.
+
+    Resend accepts a repeated ``idempotency_key`` only once (for 24 hours), so a
+    retry after a timeout cannot deliver the batch twice.
+    """
+    api_key = os.getenv("RESEND_API_KEY")
+
+    if not api_key:
+        raise EmailError("RESEND_API_KEY not configured")
+
+    resend = _resend(api_key)
+
+    payload = [
+        {
+            "from": VERIFIED_SENDER,
+            "to": [message["to_email"]],
+            "subject": message["subject"],
+            "html": message["html_content"].replace("\n", "<br>"),
+        }
+        for message in messages
+    ]
+
+    options = {"idempotency_key": idempotency_key} if idempotency_key else None
+
+    try:
+        response = resend.Batch.send(payload, options)
+        logger.info("Batch of %s email(s) sent via Resend", len(payload))
+        return response
+    except Exception as exc:
+        logger.error("Resend batch request failed: %s", exc, exc_info=True)
+        raise EmailError(f"Resend batch failed: {exc}", rejected=_rejected(exc)) from exc
+
+
+def _rejected(exc: Exception) -> bool:
+    """True if Resend answered with a 4xx, so the request was not accepted.
+
+    409 is excluded: it reports a clash with an earlier request under the same
+    idempotency key, which may already have been delivered. Transport failures
+    surface from the SDK as code 500 and count as unknown.
+    """
+    code = str(getattr(exc, "code", ""))
+    return code.startswith("4") and code != "409"
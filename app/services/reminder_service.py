@@ -1,16 +1,24 @@
 from __future__ import annotations
 
 import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
 from typing import Optional
-import json
+import hashlib
+import heapq
 import os
+import time
+import uuid
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from app.core.config import logger, settings
 from app.core.exceptions import EmailError
-from app.services.todo_service import service as todo_service
-from app.services.password_reset_service import send_email
+from app.services.todo_service import (
+    TodoEvent,
+    reminder_lead_minutes,
+    service as todo_service,
+)
+from app.services.password_reset_service import send_email, send_batch_emails
 
 try:
     _LOCAL_TIMEZONE = ZoneInfo(settings.APP_TIMEZONE)
@@ -27,6 +35,20 @@ class ReminderScheduler:
         self._lead_minutes = max(1, settings.REMINDER_LEAD_MINUTES)
         self._grace_minutes = max(0, settings.REMINDER_GRACE_PERIOD_MINUTES)
         self._max_lead_minutes = max(self._lead_minutes, settings.REMINDER_MAX_LEAD_MINUTES)
+        self._concurrency = max(1, settings.REMINDER_SEND_CONCURRENCY)
+        self._batch_size = min(100, max(1, settings.REMINDER_BATCH_SIZE))
+        self._max_retries = max(0, settings.REMINDER_SEND_MAX_RETRIES)
+        self._backoff_seconds = max(0.0, settings.REMINDER_RETRY_BACKOFF_SECONDS)
+        self._lease_seconds = max(60, settings.REMINDER_CLAIM_LEASE_SECONDS)
+        self._claim_limit = max(1, settings.REMINDER_CLAIM_LIMIT)
+        self._sleep = time.sleep
+        # Min-heap of (reminder_due_at, todo_id) for deadlines inside the
+        # horizon; only the event loop thread touches it.
+        self._deadlines: list[tuple[datetime, int]] = []
+        self._horizon = timedelta(seconds=self._interval * 2)
+        self._reconcile_at: Optional[datetime] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
 
     def start(self) -> None:
         if not settings.REMINDER_ENABLED:
@@ -39,15 +61,19 @@ class ReminderScheduler:
             return
         self._running = True
         loop = asyncio.get_event_loop()
+        self._loop = loop
+        todo_service.subscribe(self._on_todo_event)
         self._task = loop.create_task(self._run_loop())
         logger.info(
-            "Reminder scheduler started (lead=%s min, interval=%s s)",
+            "Reminder scheduler started (lead=%s min, reconcile interval=%s s)",
             self._lead_minutes,
             self._interval,
         )
 
     async def stop(self) -> None:
         self._running = False
+        todo_service.unsubscribe(self._on_todo_event)
+        self._loop = None
         if not self._task:
             return
         self._task.cancel()
@@ -60,57 +86,184 @@ class ReminderScheduler:
             logger.info("Reminder scheduler stopped")
 
     async def _run_loop(self) -> None:
+        """Sleep until the earliest known deadline, then claim and send.
+
+        Deadlines come from a startup/reconcile load plus create/update hooks.
+        Every ``REMINDER_CHECK_INTERVAL_SECONDS`` a full sweep and reload runs
+        as a safety net for changes made by other workers or missed events.
+        """
+        self._wakeup = asyncio.Event()
+        self._reconcile_at = None
         while self._running:
+            self._wakeup.clear()
+            now = datetime.now(timezone.utc)
             try:
-                await asyncio.to_thread(self._process_once)
+                if self._reconcile_at is None or now >= self._reconcile_at:
+                    await asyncio.to_thread(self._process_once)
+                    await self._reload_deadlines()
+                elif self._pop_due(now):
+                    await asyncio.to_thread(self._process_once)
             except asyncio.CancelledError:
                 raise
             except Exception:
                 logger.exception("Reminder scheduler tick failed")
-            await asyncio.sleep(self._interval)
+                self._reconcile_at = datetime.now(timezone.utc) + timedelta(seconds=self._interval)
+            await self._wait_for_next_deadline()
 
-    def _process_once(self) -> None:
+    async def _reload_deadlines(self) -> None:
         now = datetime.now(timezone.utc)
-        window_start = now - timedelta(minutes=self._grace_minutes)
-        window_end = now + timedelta(minutes=self._max_lead_minutes)
-        rows = todo_service.get_due_soon_without_reminder(window_start, window_end)
-        logger.debug(
-            "Reminder scan window %s - %s, matches=%s",
-            window_start.isoformat(),
-            window_end.isoformat(),
-            len(rows),
+        until = now + self._horizon
+        rows = await asyncio.to_thread(
+            todo_service.list_upcoming_reminders, now, until, self._claim_limit
         )
-        pending: list[tuple] = []
-        for todo, email in rows:
-            due_dt = self._coerce_utc(todo.due_date)
-            if not due_dt:
-                continue
-            lead_minutes = self._lead_minutes
-            if todo.tags:
-                lead_minutes = self._extract_lead_override(todo.tags, default=lead_minutes)
-            delta_minutes = (due_dt - now).total_seconds() / 60
-            if delta_minutes < -self._grace_minutes:
+        entries = {(self._as_utc(due), todo_id) for todo_id, due in rows}
+        # Keep hook-pushed deadlines that arrived while the query was running
+        entries.update(entry for entry in self._deadlines if entry[0] > now)
+        self._deadlines = list(entries)
+        heapq.heapify(self._deadlines)
+        self._reconcile_at = now + timedelta(seconds=self._interval)
+        if len(rows) >= self._claim_limit:
+            # Truncated load: reconcile again once the last loaded deadline passes
+            self._reconcile_at = min(self._reconcile_at, self._as_utc(rows[-1][1]))
+        logger.debug("Loaded %s upcoming reminder deadline(s)", len(rows))
+
+    def _pop_due(self, now: datetime) -> bool:
+        due = False
+        while self._deadlines and self._deadlines[0][0] <= now:
+            heapq.heappop(self._deadlines)
+            due = True
+        return due
+
+    async def _wait_for_next_deadline(self) -> None:
+        wake_at = self._reconcile_at or datetime.now(timezone.utc)
+        if self._deadlines:
+            wake_at = min(wake_at, self._deadlines[0][0])
+        timeout = max(0.0, (wake_at - datetime.now(timezone.utc)).total_seconds())
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def _on_todo_event(self, events: list[TodoEvent]) -> None:
+        """Todo service hook; may run on any thread."""
+        loop = self._loop
+        if loop is None:
+            return
+        for event in events:
+            if event.kind == "deleted":
+                # Deleted rows leave a stale deadline behind; it wakes the loop once
+                # and the claim query simply finds nothing.
                 continue
-            if delta_minutes > lead_minutes:
+            data = event.data
+            due = data.get("reminder_due_at")
+            if due is None or data.get("is_done") or data.get("reminder_sent_at"):
                 continue
-            pending.append((todo, email, lead_minutes))
-        if not pending:
+            try:
+                loop.call_soon_threadsafe(self._schedule, self._as_utc(due), event.todo_id)
+            except RuntimeError:
+                # Event loop already closed during shutdown
+                return
+
+    def _schedule(self, due: datetime, todo_id: int) -> None:
+        if due > datetime.now(timezone.utc) + self._horizon:
+            # Picked up by a later reconcile load instead
+            return
+        heapq.heappush(self._deadlines, (due, todo_id))
+        if self._deadlines[0] == (due, todo_id) and self._wakeup is not None:
+            self._wakeup.set()
+
+    def _process_once(self) -> None:
+        now = datetime.now(timezone.utc)
+        earliest_due = now - timedelta(minutes=self._grace_minutes)
+        token = uuid.uuid4().hex
+        rows = todo_service.claim_due_reminders(
+            now,
+            earliest_due,
+            self._max_lead_minutes,
+            token,
+            self._lease_seconds,
+            self._claim_limit,
+        )
+        logger.debug("Reminder scan at %s, claimed=%s", now.isoformat(), len(rows))
+        if not rows:
             return
-        logger.info("Sending %s reminder email(s)", len(pending))
+        logger.info("Sending %s reminder email(s)", len(rows))
+        chunks = [rows[start:start + self._batch_size] for start in range(0, len(rows), self._batch_size)]
+        workers = min(self._concurrency, len(chunks))
+        delivered: set[int] = set()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="reminder-send") as pool:
+            futures = [pool.submit(self._deliver_chunk, chunk) for chunk in chunks]
+            # Flush each chunk as soon as it is delivered so a crash mid-run
+            # neither re-sends finished chunks nor loses their sent markers.
+            for future in as_completed(futures):
+                try:
+                    sent_ids = future.result()
+                except Exception:
+                    logger.exception("Reminder delivery chunk failed")
+                    continue
+                if sent_ids:
+                    todo_service.mark_reminders_sent(sent_ids, datetime.now(timezone.utc))
+                    delivered.update(sent_ids)
+        # Hand failed rows back right away instead of waiting for the lease to lapse
+        failed_ids = [todo.id for todo, _ in rows if todo.id not in delivered]
+        if failed_ids:
+            todo_service.release_reminder_claims(failed_ids, token)
+
+    def _deliver_chunk(self, chunk: list) -> list[int]:
+        messages = [
+            (
+                todo.id,
+                {
+                    "to_email": email,
+                    "subject": f"{settings.APP_NAME} - Nhắc nhở công việc sắp đến hạn",
+                    "html_content": self._build_email_body(todo, self._lead_minutes_for(todo)),
+                },
+            )
+            for todo, email in chunk
+        ]
+        if len(messages) > 1:
+            batch = [message for _, message in messages]
+            key = self._batch_key(chunk)
+            error = self._with_retry(
+                lambda: send_batch_emails(batch, idempotency_key=key), label=f"batch of {len(batch)}"
+            )
+            if error is None:
+                return [todo_id for todo_id, _ in messages]
+            if not error.rejected:
+                # The batch may have gone out; sending each message again could
+                # double-deliver. The claims are released and the next pass
+                # retries under the same key.
+                return []
+            logger.warning("Falling back to individual reminder sends for %s message(s)", len(batch))
         sent_ids: list[int] = []
-        for todo, email, lead_minutes in pending:
+        for todo_id, message in messages:
+            if self._with_retry(lambda: send_email(**message), label=f"todo {todo_id}") is None:
+                sent_ids.append(todo_id)
+        return sent_ids
+
+    @staticmethod
+    def _batch_key(chunk: list) -> str:
+        """Idempotency key that is the same whenever the same reminders are batched together."""
+        digest = hashlib.sha256(
+            ",".join(f"{todo.id}@{todo.reminder_due_at.isoformat()}" for todo, _ in chunk).encode()
+        ).hexdigest()
+        return f"todo-reminders/{digest}"
+
+    def _with_retry(self, action, *, label: str) -> Optional[EmailError]:
+        """Run ``action`` with backoff; None once it succeeds, else the last error."""
+        for attempt in range(self._max_retries + 1):
             try:
-                send_email(
-                    to_email=email,
-                    subject=f"{settings.APP_NAME} - Nhắc nhở công việc sắp đến hạn",
-                    html_content=self._build_email_body(todo, lead_minutes),
-                )
-            except EmailError:
-                logger.warning("Failed to send reminder email for todo %s", todo.id, exc_info=True)
-                continue
-            sent_ids.append(todo.id)
-        if sent_ids:
-            todo_service.mark_reminders_sent(sent_ids, datetime.now(timezone.utc))
+                action()
+                return None
+            except EmailError as exc:
+                if attempt == self._max_retries:
+                    logger.warning("Failed to send reminder email for %s", label, exc_info=True)
+                    return exc
+                self._sleep(self._backoff_seconds * (2 ** attempt))
+        return EmailError()
+
+    def _lead_minutes_for(self, todo) -> int:
+        return reminder_lead_minutes(todo.reminder_minutes)
 
     def _build_email_body(self, todo, lead_minutes: int) -> str:
         due_display = self._format_due(todo.due_date)
@@ -142,18 +295,11 @@ class ReminderScheduler:
     def _resend_ready(self) -> bool:
         return bool(os.environ.get("RESEND_API_KEY"))
 
-    def _extract_lead_override(self, raw_tags: str, default: int) -> int:
-        try:
-            data = json.loads(raw_tags)
-        except json.JSONDecodeError:
-            return default
-        value = data.get("reminder_minutes") if isinstance(data, dict) else None
-        if isinstance(value, (int, float)) and value > 0:
-            minutes = int(value)
-            minutes = max(1, minutes)
-            minutes = min(minutes, settings.REMINDER_MAX_LEAD_MINUTES)
-            return minutes
-        return default
+    def _as_utc(self, value: datetime) -> datetime:
+        if value.tzinfo is None:
+            # SQLite hands back reminder_due_at without its (UTC) offset
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
 
     def _coerce_utc(self, value: Optional[datetime]) -> Optional[datetime]:
         if value is None:
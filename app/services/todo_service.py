@@ -1,29 +1,224 @@
 from __future__ import annotations
 
-from typing import Optional, Tuple
-from datetime import datetime, timezone, date
+from dataclasses import dataclass, field
+from itertools import groupby
+from typing import Callable, Optional, Tuple
+from datetime import datetime, timedelta, timezone, date
+import json
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from app.repositories.todo_repository import TodoRepository
-from app.models import Todo, TodoCreate, TodoUpdate
-from app.core.config import logger
-from app.core.exceptions import DatabaseError, NotFoundError
+from app.repositories.todo_repository import (
+    TodoRepository,
+    change_position,
+    decode_watermark,
+    encode_watermark,
+)
+from app.repositories.todo_search import highlight, search_terms
+from pydantic import ValidationError as SchemaError
+from app.models import (
+    DEFAULT_CATEGORY,
+    DEFAULT_PRIORITY,
+    DEFAULT_STATUS,
+    PRIORITY_RANKS,
+    VALID_PRIORITIES,
+    VALID_STATUSES,
+    Todo,
+    TodoBatchOperation,
+    TodoCreate,
+    TodoUpdate,
+)
+from app.core.config import logger, settings
+from app.core.exceptions import DatabaseError, NotFoundError, ValidationError
+from app.db import collect_on_commit, unit_of_work
 
 repo = TodoRepository()
 
+try:
+    _LOCAL_TIMEZONE = ZoneInfo(settings.APP_TIMEZONE)
+except ZoneInfoNotFoundError:
+    _LOCAL_TIMEZONE = timezone.utc
+
+
+def reminder_lead_minutes(value: Optional[int]) -> int:
+    """Effective lead time for a ``reminder_minutes`` value, clamped to the configured bounds."""
+    if value is None or value <= 0:
+        return max(1, settings.REMINDER_LEAD_MINUTES)
+    return min(max(1, int(value)), settings.REMINDER_MAX_LEAD_MINUTES)
+
+
+def task_meta_from_tags(raw_tags: Optional[str]) -> dict:
+    """Typed metadata found in a ``tags`` JSON blob; unknown or invalid values are dropped."""
+    if not raw_tags:
+        return {}
+    try:
+        data = json.loads(raw_tags)
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    meta: dict = {}
+    priority = data.get("priority")
+    if isinstance(priority, str) and priority.lower() in VALID_PRIORITIES:
+        meta["priority"] = priority.lower()
+    status = data.get("status")
+    if isinstance(status, str) and status.lower() in VALID_STATUSES:
+        meta["status"] = status.lower()
+    category = data.get("category")
+    if isinstance(category, str) and category.strip():
+        meta["category"] = category.strip()[:50]
+    minutes = data.get("reminder_minutes")
+    if isinstance(minutes, (int, float)) and not isinstance(minutes, bool) and minutes > 0:
+        meta["reminder_minutes"] = reminder_lead_minutes(int(minutes))
+    return meta
+
+
+def _task_meta(data: TodoCreate | TodoUpdate) -> dict:
+    """Metadata column values for a write: the ``tags`` JSON first, explicit fields win."""
+    meta = task_meta_from_tags(data.tags)
+    if data.priority is not None:
+        priority = data.priority.lower()
+        if priority not in VALID_PRIORITIES:
+            raise ValidationError(
+                f"priority must be one of: {', '.join(VALID_PRIORITIES)}", field="priority"
+            )
+        meta["priority"] = priority
+    if data.status is not None:
+        status = data.status.lower()
+        if status not in VALID_STATUSES:
+            raise ValidationError(
+                f"status must be one of: {', '.join(VALID_STATUSES)}", field="status"
+            )
+        meta["status"] = status
+    if data.category is not None:
+        meta["category"] = data.category.strip() or DEFAULT_CATEGORY
+    if data.reminder_minutes is not None:
+        meta["reminder_minutes"] = reminder_lead_minutes(data.reminder_minutes)
+    if "priority" in meta:
+        meta["priority_rank"] = PRIORITY_RANKS[meta["priority"]]
+    return meta
+
+
+def compute_reminder_due_at(due_date: Optional[datetime], reminder_minutes: int) -> Optional[datetime]:
+    """UTC instant a reminder should go out; naive due dates are in APP_TIMEZONE."""
+    if due_date is None:
+        return None
+    if due_date.tzinfo is None:
+        due_date = due_date.replace(tzinfo=_LOCAL_TIMEZONE)
+    return due_date.astimezone(timezone.utc) - timedelta(minutes=reminder_minutes)
+
+
+def _new_todo(data: TodoCreate, owner_id: int) -> Todo:
+    meta = _task_meta(data)
+    return Todo(
+        title=data.title,
+        description=data.description,
+        due_date=data.due_date,
+        tags=data.tags,
+        owner_id=owner_id,
+        priority=meta.get("priority", DEFAULT_PRIORITY),
+        priority_rank=meta.get("priority_rank", PRIORITY_RANKS[DEFAULT_PRIORITY]),
+        category=meta.get("category", DEFAULT_CATEGORY),
+        status=meta.get("status", DEFAULT_STATUS),
+        reminder_minutes=meta.get("reminder_minutes"),
+        reminder_due_at=compute_reminder_due_at(
+            data.due_date, reminder_lead_minutes(meta.get("reminder_minutes"))
+        ),
+    )
+
+
+def _schema_error_message(exc: SchemaError) -> str:
+    error = exc.errors()[0]
+    location = ".".join(str(part) for part in error.get("loc", ()))
+    return f"{location}: {error['msg']}" if location else error["msg"]
+
+
+def _batch_result(index: int, op: str, status: int, *, item=None, todo_id=None, error=None) -> dict:
+    return {
+        "index": index,
+        "op": op,
+        "ok": error is None,
+        "status": status,
+        "id": item.id if item is not None else todo_id,
+        "item": item,
+        "error": error,
+    }
+
+SEARCH_MODES = ("like", "fulltext")
+
+_REMINDER_RESET = {
+    "reminder_sent_at": None,
+    "reminder_claim_token": None,
+    "reminder_claimed_at": None,
+}
+
+
+@dataclass(frozen=True)
+class TodoEvent:
+    """A committed todo mutation, as delivered to ``TodoService.subscribe`` listeners.
+
+    ``data`` is a snapshot of the row taken when the change was made (empty for
+    deletes), so listeners never touch a session that has since been closed.
+    """
+
+    kind: str
+    todo_id: int
+    owner_id: int
+    data: dict = field(default_factory=dict)
+
+
+# Receives the events of one committed unit of work, in the order they happened
+TodoListener = Callable[[list[TodoEvent]], None]
+
+
+def with_highlights(items: list[Todo], q: Optional[str]) -> list[dict]:
+    """Serialise ``items`` with HTML ``<mark>`` highlights for the words of ``q``."""
+    terms = search_terms(q)
+    return [
+        {
+            **todo.model_dump(),
+            "highlight": {
+                "title": highlight(todo.title, terms),
+                "description": highlight(todo.description, terms),
+            },
+        }
+        for todo in items
+    ]
+
+
 class TodoService:
+    def __init__(self) -> None:
+        self._listeners: list[TodoListener] = []
+
+    def subscribe(self, listener: TodoListener) -> None:
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener: TodoListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _publish(self, kind: str, todo_id: int, owner_id: int, todo: Optional[Todo] = None) -> None:
+        if not self._listeners:
+            return
+        event = TodoEvent(kind, todo_id, owner_id, todo.model_dump() if todo is not None else {})
+        collect_on_commit(self._dispatch, event)
+
+    def _dispatch(self, events: list[TodoEvent]) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener(events)
+            except Exception:
+                logger.warning("Todo listener failed for %s event(s)", len(events), exc_info=True)
+
     def create(self, data: TodoCreate, owner_id: int) -> Todo:
-        todo = Todo(
-            title=data.title,
-            description=data.description,
-            due_date=data.due_date,
-            tags=data.tags,
-            owner_id=owner_id
-        )
+        todo = _new_todo(data, owner_id)
         try:
-            return repo.create(todo)
+            created = repo.create(todo)
         except DatabaseError as e:
             logger.error("Service error in create", exc_info=True)
             raise e
+        self._publish("created", created.id, owner_id, created)
+        return created
 
     def get(self, todo_id: int, owner_id: int) -> Todo:
         try:
@@ -37,66 +232,281 @@ class TodoService:
 
     def delete(self, todo_id: int, owner_id: int) -> bool:
         try:
-            todo = repo.get(todo_id, owner_id)
-            if not todo:
+            if not repo.delete(todo_id, owner_id):
                 raise NotFoundError("todo")
-            repo.delete(todo)
-            return True
         except DatabaseError as e:
             logger.error("Service error in delete", exc_info=True)
             raise e
+        self._publish("deleted", todo_id, owner_id)
+        return True
 
     def update(self, todo_id: int, owner_id: int, data: TodoUpdate) -> Todo:
+        values = {}
+        if data.title is not None:
+            values["title"] = data.title
+        if data.description is not None:
+            values["description"] = data.description
+        if data.is_done is not None:
+            values["is_done"] = data.is_done
+            if data.is_done is False:
+                values.update(_REMINDER_RESET)
+        if data.due_date is not None:
+            values["due_date"] = data.due_date
+            values.update(_REMINDER_RESET)
+        if data.tags is not None:
+            values["tags"] = data.tags
+        meta = _task_meta(data)
+        values.update(meta)
+        values["updated_at"] = datetime.now(timezone.utc)
         try:
-            todo = repo.get(todo_id, owner_id)
-            if not todo:
-                raise NotFoundError("todo")
-            reset_reminder = False
-            if data.title is not None:
-                todo.title = data.title
-            if data.description is not None:
-                todo.description = data.description
-            if data.is_done is not None:
-                todo.is_done = data.is_done
-                if data.is_done is False:
-                    reset_reminder = True
-            if data.due_date is not None:
-                todo.due_date = data.due_date
-                reset_reminder = True
-            if data.tags is not None:
-                todo.tags = data.tags
-            todo.updated_at = datetime.now(timezone.utc)
-            if reset_reminder:
-                setattr(todo, "_reset_reminder", True)
-            updated = repo.update(todo)
-            if not updated:
-                raise NotFoundError("todo")
-            return updated
+            if data.due_date is not None or "reminder_minutes" in meta:
+                due_date = data.due_date
+                minutes = meta.get("reminder_minutes")
+                if due_date is None or "reminder_minutes" not in meta:
+                    current = repo.get(todo_id, owner_id)
+                    if not current:
+                        raise NotFoundError("todo")
+                    due_date = due_date if due_date is not None else current.due_date
+                    if "reminder_minutes" not in meta:
+                        minutes = current.reminder_minutes
+                values["reminder_due_at"] = compute_reminder_due_at(
+                    due_date, reminder_lead_minutes(minutes)
+                )
+            updated = repo.update(todo_id, owner_id, values)
         except DatabaseError as e:
             logger.error("Service error in update", exc_info=True)
             raise e
+        if not updated:
+            raise NotFoundError("todo")
+        self._publish("updated", todo_id, owner_id, updated)
+        return updated
+
+    def batch(self, owner_id: int, operations: list[TodoBatchOperation]) -> list[dict]:
+        """Run mixed create/update/complete/delete operations in one unit of work.
+
+        Consecutive operations of the same kind are executed together: creates
+        as one multi-row INSERT, completes and deletes as one ``UPDATE ... WHERE
+        id IN (...)``; updates carry per-item values and stay one statement each.
+        Invalid or missing items are reported in their result and do not stop
+        the rest of the batch; a database error rolls the whole batch back.
+        """
+        if len(operations) > settings.TODO_BATCH_MAX_ITEMS:
+            raise ValidationError(
+                f"a batch accepts at most {settings.TODO_BATCH_MAX_ITEMS} operations",
+                field="operations",
+            )
+        results: list[Optional[dict]] = [None] * len(operations)
+        try:
+            with unit_of_work():
+                for op, run in groupby(enumerate(operations), key=lambda pair: pair[1].op):
+                    handler = getattr(self, f"_batch_{op}")
+                    handler(owner_id, list(run), results)
+        except DatabaseError as e:
+            logger.error("Service error in batch", exc_info=True)
+            raise e
+        return results
 
-    def list(self, owner_id: int, limit: int = 10, offset: int = 0, q: Optional[str] = None, is_done: Optional[bool] = None, sort: Optional[str] = None) -> Tuple[list, int]:
+    def _batch_create(self, owner_id: int, run: list, results: list) -> None:
+        pending: list[tuple[int, Todo]] = []
+        for index, operation in run:
+            try:
+                data = TodoCreate.model_validate(operation.data or {})
+                pending.append((index, _new_todo(data, owner_id)))
+            except SchemaError as e:
+                results[index] = _batch_result(index, "create", 400, error=_schema_error_message(e))
+            except ValidationError as e:
+                results[index] = _batch_result(index, "create", 400, error=str(e))
+        created = repo.create_many([todo for _, todo in pending])
+        for (index, _), todo in zip(pending, created):
+            results[index] = _batch_result(index, "create", 201, item=todo)
+            self._publish("created", todo.id, owner_id, todo)
+
+    def _batch_update(self, owner_id: int, run: list, results: list) -> None:
+        for index, operation in run:
+            if operation.id is None:
+                results[index] = _batch_result(index, "update", 400, error="id is required")
+                continue
+            try:
+                data = TodoUpdate.model_validate(operation.data or {})
+                results[index] = _batch_result(
+                    index, "update", 200, item=self.update(operation.id, owner_id, data)
+                )
+            except SchemaError as e:
+                results[index] = _batch_result(
+                    index, "update", 400, todo_id=operation.id, error=_schema_error_message(e)
+                )
+            except ValidationError as e:
+                results[index] = _batch_result(index, "update", 400, todo_id=operation.id, error=str(e))
+            except NotFoundError as e:
+                results[index] = _batch_result(index, "update", 404, todo_id=operation.id, error=str(e))
+
+    def _batch_complete(self, owner_id: int, run: list, results: list) -> None:
+        self._batch_bulk(
+            owner_id, run, results, "complete",
+            {"is_done": True, "updated_at": datetime.now(timezone.utc)},
+        )
+
+    def _batch_delete(self, owner_id: int, run: list, results: list) -> None:
+        now = datetime.now(timezone.utc)
+        self._batch_bulk(owner_id, run, results, "delete", {"deleted_at": now, "updated_at": now})
+
+    def _batch_bulk(self, owner_id: int, run: list, results: list, op: str, values: dict) -> None:
+        ids = []
+        for index, operation in run:
+            if operation.id is None:
+                results[index] = _batch_result(index, op, 400, error="id is required")
+            elif operation.id not in ids:
+                ids.append(operation.id)
+        changed = {todo.id: todo for todo in repo.update_many(ids, owner_id, values)}
+        for todo in changed.values():
+            if op == "delete":
+                self._publish("deleted", todo.id, owner_id)
+            else:
+                self._publish("updated", todo.id, owner_id, todo)
+        for index, operation in run:
+            if operation.id is None:
+                continue
+            todo = changed.get(operation.id)
+            if todo is None:
+                results[index] = _batch_result(
+                    index, op, 404, todo_id=operation.id, error=str(NotFoundError("todo"))
+                )
+            elif op == "delete":
+                results[index] = _batch_result(index, op, 204, todo_id=todo.id)
+            else:
+                results[index] = _batch_result(index, op, 200, item=todo)
+
+    def list(
+        self,
+        owner_id: int,
+        limit: int = 10,
+        offset: int = 0,
+        q: Optional[str] = None,
+        is_done: Optional[bool] = None,
+        sort: Optional[str] = None,
+        count: bool = True,
+        cursor: Optional[str] = None,
+        due_from: Optional[datetime] = None,
+        due_to: Optional[datetime] = None,
+        priority: Optional[str] = None,
+        status: Optional[str] = None,
+        category: Optional[str] = None,
+        search_mode: str = "like",
+    ) -> Tuple[list, Optional[int], Optional[str]]:
+        if search_mode not in SEARCH_MODES:
+            raise ValidationError(
+                f"search_mode must be one of: {', '.join(SEARCH_MODES)}", field="search_mode"
+            )
+        if priority is not None:
+            priority = priority.lower()
+            if priority not in VALID_PRIORITIES:
+                raise ValidationError(
+                    f"priority must be one of: {', '.join(VALID_PRIORITIES)}", field="priority"
+                )
+        if status is not None:
+            status = status.lower()
+            if status not in VALID_STATUSES:
+                raise ValidationError(
+                    f"status must be one of: {', '.join(VALID_STATUSES)}", field="status"
+                )
         try:
-            return repo.list(owner_id, limit=limit, offset=offset, q=q, is_done=is_done, sort=sort)
+            return repo.list(
+                owner_id,
+                limit=limit,
+                offset=offset,
+                q=q,
+                is_done=is_done,
+                sort=sort,
+                count=count,
+                cursor=cursor,
+                due_from=due_from,
+                due_to=due_to,
+                priority=priority,
+                status=status,
+                category=category,
+                search_mode=search_mode,
+            )
         except DatabaseError as e:
             logger.error("Service error in list", exc_info=True)
             raise e
 
+    def changes(self, owner_id: int, since: Optional[str] = None, limit: int = 100) -> dict:
+        """Todos changed after the ``since`` watermark, deletions as tombstones.
+
+        Pass the returned ``watermark`` as the next ``since``; keep paging while
+        ``has_more`` is true. Without ``since`` the feed starts from the beginning.
+
+        ``updated_at`` is stamped before commit, so a row can become visible
+        after a younger one. The watermark therefore only resumes past rows
+        older than ``CHANGES_SAFETY_LAG_SECONDS``; rows inside that window are
+        sent again by the next sync, and clients apply them idempotently.
+        """
+        resume, page = decode_watermark(since) if since else (None, None)
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(
+            seconds=settings.CHANGES_SAFETY_LAG_SECONDS
+        )
+        try:
+            rows = repo.list_changes(owner_id, after=page or resume, limit=limit + 1)
+        except DatabaseError as e:
+            logger.error("Service error in changes", exc_info=True)
+            raise e
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        for todo in rows:
+            position = change_position(todo)
+            if position[0] > cutoff:
+                break
+            resume = position
+        # Mid-sync the next page continues after this one; once caught up the
+        # next sync restarts from the settled position
+        page = change_position(rows[-1]) if has_more else None
+        return {
+            "items": [todo for todo in rows if todo.deleted_at is None],
+            "tombstones": [
+                {"id": todo.id, "deleted_at": todo.deleted_at, "updated_at": todo.updated_at}
+                for todo in rows
+                if todo.deleted_at is not None
+            ],
+            "watermark": encode_watermark(resume, page),
+            "has_more": has_more,
+        }
+
+    def change_stamp(self, owner_id: int) -> Optional[datetime]:
+        """Validator input for the owner's todos.
+
+        ``max(updated_at)`` alone misses a write that commits after a younger
+        one, as in ``changes``. While the newest change is inside
+        ``CHANGES_SAFETY_LAG_SECONDS`` the stamp is the current instant, so no
+        cached copy revalidates until the owner's writes have settled.
+        """
+        try:
+            stamp = repo.change_stamp(owner_id)
+        except DatabaseError as e:
+            logger.error("Service error in change_stamp", exc_info=True)
+            raise e
+        if stamp is None:
+            return None
+        if stamp.tzinfo is None:
+            stamp = stamp.replace(tzinfo=timezone.utc)
+        now = datetime.now(timezone.utc)
+        if stamp > now - timedelta(seconds=settings.CHANGES_SAFETY_LAG_SECONDS):
+            return now
+        return stamp
+
     def mark_complete(self, todo_id: int, owner_id: int) -> Todo:
         try:
-            todo = repo.get(todo_id, owner_id)
-            if not todo:
-                raise NotFoundError("todo")
-            todo.is_done = True
-            todo.updated_at = datetime.now(timezone.utc)
-            updated = repo.update(todo)
-            if not updated:
-                raise NotFoundError("todo")
-            return updated
+            updated = repo.update(
+                todo_id,
+                owner_id,
+                {"is_done": True, "updated_at": datetime.now(timezone.utc)},
+            )
         except DatabaseError as e:
             logger.error("Service error in mark_complete", exc_info=True)
             raise e
+        if not updated:
+            raise NotFoundError("todo")
+        self._publish("updated", todo_id, owner_id, updated)
+        return updated
 
     def get_overdue(self, owner_id: int):
         try:
@@ -119,11 +529,76 @@ class TodoService:
             logger.error("Service error in get_by_date", exc_info=True)
             raise e
 
-    def get_due_soon_without_reminder(self, window_start: datetime, window_end: datetime):
+    def get_by_range(self, owner_id: int, start_day: date, end_day: date):
+        """Todos due on local days ``[start_day, end_day)``, e.g. a week view."""
+        if end_day <= start_day:
+            raise ValidationError("end_day must be after start_day", field="end_day")
+        try:
+            return repo.get_by_range(owner_id, start_day, end_day)
+        except DatabaseError as e:
+            logger.error("Service error in get_by_range", exc_info=True)
+            raise e
+
+    def calendar_month(self, owner_id: int, year: int, month: int) -> dict:
+        """Per-day total/done/overdue counts for one month in APP_TIMEZONE."""
+        if not (1 <= month <= 12 and 1 <= year < 9999):
+            raise ValidationError("month must be YYYY-MM", field="month")
+        start = date(year, month, 1)
+        end = date(year + month // 12, month % 12 + 1, 1)
+        try:
+            rows = repo.count_by_day(owner_id, start, end, datetime.now(timezone.utc))
+        except DatabaseError as e:
+            logger.error("Service error in calendar_month", exc_info=True)
+            raise e
+        return {
+            "month": f"{year:04d}-{month:02d}",
+            "days": [
+                {"date": day.isoformat(), "total": total, "done": done, "overdue": overdue}
+                for day, total, done, overdue in rows
+            ],
+        }
+
+    def summary(self, owner_id: int) -> dict:
+        try:
+            return repo.summary(owner_id)
+        except DatabaseError as e:
+            logger.error("Service error in summary", exc_info=True)
+            raise e
+
+    def claim_due_reminders(
+        self,
+        now: datetime,
+        earliest_due: datetime,
+        max_lead_minutes: int,
+        token: str,
+        lease_seconds: int,
+        limit: int,
+    ):
+        try:
+            return repo.claim_due_reminders(
+                now=now,
+                earliest_due=earliest_due,
+                max_lead_minutes=max_lead_minutes,
+                token=token,
+                lease_seconds=lease_seconds,
+                limit=limit,
+            )
+        except DatabaseError as e:
+            logger.error("Service error in claim_due_reminders", exc_info=True)
+            raise e
+
+    def list_upcoming_reminders(self, start: datetime, until: datetime, limit: int):
+        try:
+            return repo.list_upcoming_reminders(start=start, until=until, limit=limit)
+        except DatabaseError as e:
+            logger.error("Service error in list_upcoming_reminders", exc_info=True)
+            raise e
+
+    def release_reminder_claims(self, todo_ids: list[int], token: str) -> None:
         try:
-            return repo.get_due_soon_without_reminder(window_start=window_start, window_end=window_end)
+            repo.release_reminder_claims(todo_ids, token)
         except DatabaseError as e:
-            logger.error("Service error in get_due_soon_without_reminder", exc_info=True)
+            logger.error("Service error in release_reminder_claims", exc_info=True)
             raise e
 
     def mark_reminders_sent(self, todo_ids: list[int], sent_at: datetime) -> None:
@@ -1,19 +1,65 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from threading import Lock
 from typing import Optional, List
 
 from app.repositories.user_repository import UserRepository
 from app.models import User, UserCreate, UserLogin
-from app.core.jwt import hash_password, verify_password, create_access_token
-from app.core.config import logger
-from app.core.exceptions import DatabaseError, ConflictError, ValidationError, AuthenticationError
+from app.core.jwt import hash_password, password_needs_rehash, verify_password, create_access_token
+from app.core.cache import user_cache, user_cache_keys
+from app.core.password_pool import password_pool
+from app.core.config import logger, settings
+from app.core.exceptions import (
+    AppError,
+    AuthenticationError,
+    ConflictError,
+    DatabaseError,
+    ValidationError,
+)
 
 repo = UserRepository()
 
+# Upgrades of outdated password hashes are written after the login has answered.
+# At most one job per user is queued, and at most PASSWORD_HASH_MAX_PENDING in
+# total; anything beyond that is dropped and retried on a later login.
+_rehash_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="password-rehash")
+_rehash_lock = Lock()
+_rehash_pending: set[int] = set()
+
+
+def _schedule_rehash(user: User, password: str) -> None:
+    with _rehash_lock:
+        if user.id in _rehash_pending:
+            return
+        if len(_rehash_pending) >= max(1, settings.PASSWORD_HASH_MAX_PENDING):
+            logger.debug("Rehash queue full; skipping user %s", user.id)
+            return
+        _rehash_pending.add(user.id)
+    try:
+        _rehash_executor.submit(_rehash_password, user.id, user.email, user.hashed_password, password)
+    except RuntimeError:
+        # Executor shut down with the process
+        with _rehash_lock:
+            _rehash_pending.discard(user.id)
+
+
+def _rehash_password(user_id: int, email: str, old_hash: str, password: str) -> None:
+    try:
+        new_hash = password_pool.run("rehash", hash_password, password)
+        if repo.replace_password_hash(user_id, email, old_hash, new_hash):
+            logger.info("Upgraded password hash for user %s", user_id)
+    except AppError:
+        # Busy pool or DB error: the hash stays as is and is retried on the next login
+        logger.warning("Password rehash skipped for user %s", user_id, exc_info=True)
+    finally:
+        with _rehash_lock:
+            _rehash_pending.discard(user_id)
+
 class UserService:
     def register(self, data: UserCreate) -> User:
         try:
             existing = repo.get_by_email(data.email, include_deleted=True)
-            hashed = hash_password(data.password)
+            hashed = password_pool.run("register", hash_password, data.password)
             if existing:
                 if existing.deleted_at is None:
                     raise ConflictError("email already exists")
@@ -27,8 +73,12 @@ class UserService:
     def login(self, data: UserLogin) -> str:
         try:
             user = repo.get_by_email(data.email)
-            if not user or not verify_password(data.password, user.hashed_password):
+            if not user or not password_pool.run(
+                "login", verify_password, data.password, user.hashed_password
+            ):
                 raise AuthenticationError("invalid email or password")
+            if password_needs_rehash(user.hashed_password):
+                _schedule_rehash(user, data.password)
             token = create_access_token({"sub": user.email})
             return token
         except DatabaseError as e:
@@ -36,15 +86,21 @@ class UserService:
             raise e
 
     def get_by_email(self, email: str) -> Optional[User]:
+        cached = user_cache.get(("email", email))
+        if cached is not None:
+            return cached.model_copy()
         try:
-            return repo.get_by_email(email)
+            return _remember(repo.get_by_email(email))
         except DatabaseError as e:
             logger.error("Service error in get_by_email", exc_info=True)
             raise e
 
     def get_by_id(self, user_id: int) -> Optional[User]:
+        cached = user_cache.get(("id", user_id))
+        if cached is not None:
+            return cached.model_copy()
         try:
-            return repo.get_by_id(user_id)
+            return _remember(repo.get_by_id(user_id))
         except DatabaseError as e:
             logger.error("Service error in get_by_id", exc_info=True)
             raise e
@@ -99,4 +155,19 @@ class UserService:
             logger.error("Service error in delete_users_by_date_range", exc_info=True)
             raise e
 
+def _remember(user: Optional[User]) -> Optional[User]:
+    """Cache a detached snapshot of ``user`` under both its id and email.
+
+    The snapshot itself never leaves the cache: callers, here and on a hit,
+    get their own copy, so one request mutating its user cannot change what
+    other requests see.
+    """
+    if user is None:
+        return None
+    snapshot = User(**user.model_dump())
+    for key in user_cache_keys(snapshot.id, snapshot.email):
+        user_cache.set(key, snapshot)
+    return snapshot.model_copy()
+
+
 service = UserService()
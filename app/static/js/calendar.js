@@ -5,6 +5,34 @@
 
 let calendarYear = new Date().getFullYear();
 let calendarMonth = new Date().getMonth();
+// 'YYYY-MM' -> { 'YYYY-MM-DD': { total, done, overdue } }, filled lazily per month
+const monthCounts = new Map();
+
+function monthKey(year, month) {
+  return `${year}-${(month+1).toString().padStart(2,'0')}`;
+}
+
+/**
+ * Fetch per-day counts for a month (cached until todos change)
+ */
+async function loadMonthCounts(year, month) {
+  const key = monthKey(year, month);
+  if (monthCounts.has(key)) {
+    return monthCounts.get(key);
+  }
+  const counts = {};
+  try {
+    const response = await fetch(`/api/v1/todos/calendar?month=${key}`, { credentials: 'same-origin' });
+    if (response.ok) {
+      const data = await response.json();
+      data.days.forEach(day => { counts[day.date] = day; });
+      monthCounts.set(key, counts);
+    }
+  } catch (err) {
+    console.error('Không tải được dữ liệu lịch', err);
+  }
+  return counts;
+}
 
 /**
  * Update month/year display text
@@ -25,7 +53,11 @@ function updateMonthYearDisplay() {
 /**
  * Render calendar with task counts
  */
-function renderCalendar(year, month) {
+async function renderCalendar(year, month) {
+  const counts = await loadMonthCounts(year, month);
+  if (year !== calendarYear || month !== calendarMonth) {
+    return; // user already navigated to another month
+  }
   const cal = document.getElementById('calendar');
   cal.innerHTML = '';
   const first = new Date(year, month, 1);
@@ -90,8 +122,9 @@ function renderCalendar(year, month) {
       cell.appendChild(todayChip);
     }
 
-    const items = todos.filter(t => t.due_date && t.due_date.startsWith(dateStr));
-    if (items.length) {
+    const dayCounts = counts[dateStr];
+    const total = dayCounts ? dayCounts.total : 0;
+    if (total) {
       cell.classList.add('calendar-day-has-tasks');
     }
 
@@ -100,9 +133,10 @@ function renderCalendar(year, month) {
 
     const count = document.createElement('div');
     count.className = 'calendar-day-count';
-    count.innerText = items.length ? items.length.toString() : '0';
-    if (items.length) {
+    count.innerText = total.toString();
+    if (total) {
       count.classList.add('calendar-day-count-active');
+      count.title = `${dayCounts.done} đã xong, ${dayCounts.overdue} quá hạn`;
     }
     body.appendChild(count);
 
@@ -235,6 +269,7 @@ if (document.readyState === 'loading') {
 }
 
 window.addEventListener('todos:changed', () => {
+  monthCounts.clear();
   renderCalendar(calendarYear, calendarMonth);
   updateMonthYearDisplay();
 });
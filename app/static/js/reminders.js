@@ -1,23 +1,73 @@
 /**
  * reminders.js - Setup client-side reminders for tasks
  * Nhắc nhở người dùng về các công việc sắp tới
+ *
+ * Starts from the upcoming todos rendered into the page, then follows
+ * /api/v1/todos/stream (Server-Sent Events) so changes made in another tab or
+ * device reschedule or cancel reminders without reloading the dashboard.
  */
 
+const REMINDER_WINDOW_MS = 1000 * 60 * 60 * 24 * 7; // only set reminders within next 7 days
+const reminderTimers = new Map();
+let changeNotifyTimer = null;
+
+function clearReminder(todoId) {
+  const timer = reminderTimers.get(todoId);
+  if (timer) {
+    clearTimeout(timer);
+    reminderTimers.delete(todoId);
+  }
+}
+
+/**
+ * (Re)schedule the alert for one todo; done or undated todos just cancel it
+ */
+function scheduleReminder(t) {
+  clearReminder(t.id);
+  if (!t.due_date || t.is_done) return;
+  const ms = new Date(t.due_date) - new Date();
+  if (ms > 0 && ms < REMINDER_WINDOW_MS) {
+    reminderTimers.set(t.id, setTimeout(() => {
+      reminderTimers.delete(t.id);
+      alert('Nhắc: ' + t.title + '\n' + (t.description || ''));
+    }, ms));
+  }
+}
+
+/**
+ * Let other widgets (calendar counts) refresh once per burst of changes
+ */
+function notifyTodosChanged() {
+  clearTimeout(changeNotifyTimer);
+  changeNotifyTimer = setTimeout(() => {
+    window.dispatchEvent(new CustomEvent('todos:changed'));
+  }, 300);
+}
+
+function subscribeToTodoChanges() {
+  if (!window.EventSource) return;
+  // Same-origin EventSource sends the access_token cookie
+  const source = new EventSource('/api/v1/todos/stream');
+  const onChange = (event) => {
+    const payload = JSON.parse(event.data);
+    if (event.type === 'deleted') {
+      clearReminder(payload.id);
+    } else if (payload.todo) {
+      scheduleReminder(payload.todo);
+    }
+    notifyTodosChanged();
+  };
+  ['created', 'updated', 'deleted'].forEach(type => source.addEventListener(type, onChange));
+  // Events were dropped (slow connection or reconnect): counts may be stale
+  source.addEventListener('resync', notifyTodosChanged);
+}
+
 /**
  * Setup reminders for todos with due dates
  */
 function setupReminders() {
-  todos.forEach(t => {
-    if (!t.due_date) return;
-    const due = new Date(t.due_date);
-    const now = new Date();
-    const ms = due - now;
-    if (ms > 0 && ms < 1000*60*60*24*7) { // only set reminders within next 7 days
-      setTimeout(()=>{
-        alert('Nhắc: ' + t.title + '\n' + (t.description||''));
-      }, ms);
-    }
-  });
+  upcomingTodos.forEach(scheduleReminder);
+  subscribeToTodoChanges();
 }
 
 // Initialize when DOM is ready
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+Batch todo API benchmark: POST /todos/batch vs one request per todo.
+
+Drives the real FastAPI app in-process (TestClient) against a SQLite file,
+creating --items todos one request at a time and then the same number through
+the batch endpoint in chunks of --batch-size, followed by the same comparison
+for completes. Each single-item request is its own transaction; a batch is one.
+
+Usage: python benchmarks/batch_api.py [--items 2000] [--batch-size 200]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.core.jwt import create_access_token
+from app.db import _engine_options, install_sqlite_pragmas, set_session_override
+from app.main import app
+from app.models import User
+
+
+def _rate(count: int, seconds: float) -> str:
+    return f"{count / seconds:9.0f} ops/s ({seconds * 1000:8.1f} ms)"
+
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def run(items: int, batch_size: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        engine = create_engine(url, **_engine_options(url))
+        install_sqlite_pragmas(engine)
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            session.add(User(email="bench@example.com", hashed_password="x"))
+            session.commit()
+        set_session_override(lambda: Session(engine))
+        client = TestClient(app)
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': 'bench@example.com'})}"}
+
+        started = time.perf_counter()
+        single_ids = [
+            client.post("/api/v1/todos/", json={"title": f"single {index}"}, headers=headers).json()["id"]
+            for index in range(items)
+        ]
+        single_create = time.perf_counter() - started
+
+        started = time.perf_counter()
+        batch_ids = []
+        for chunk in _chunks(list(range(items)), batch_size):
+            operations = [{"op": "create", "data": {"title": f"batch {index}"}} for index in chunk]
+            response = client.post("/api/v1/todos/batch", json={"operations": operations}, headers=headers)
+            batch_ids.extend(result["id"] for result in response.json()["results"])
+        batch_create = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for todo_id in single_ids:
+            client.post(f"/api/v1/todos/{todo_id}/complete", headers=headers)
+        single_complete = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for chunk in _chunks(batch_ids, batch_size):
+            operations = [{"op": "complete", "id": todo_id} for todo_id in chunk]
+            client.post("/api/v1/todos/batch", json={"operations": operations}, headers=headers)
+        batch_complete = time.perf_counter() - started
+
+        set_session_override(None)
+        engine.dispose()
+
+    print(f"create   single: {_rate(items, single_create)}   batch/{batch_size}: {_rate(items, batch_create)}")
+    print(f"complete single: {_rate(items, single_complete)}   batch/{batch_size}: {_rate(items, batch_complete)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+    run(args.items, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
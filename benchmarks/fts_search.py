@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""
+Todo search benchmark: LIKE vs full-text.
+
+Builds a SQLite corpus of synthetic Vietnamese todos (1M rows by default, spread
+over --users owners), then times TodoRepository.list for a few queries in
+``like`` and ``fulltext`` search mode. Index maintenance cost shows up in the
+load time, which is reported with and without the FTS triggers.
+
+Usage: python benchmarks/fts_search.py [--rows 1000000] [--users 1] [--repeat 5]
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.db import install_sqlite_pragmas, set_session_override
+from app.repositories.todo_repository import TodoRepository
+
+WORDS = (
+    "báo cáo họp nhóm đi chợ mua rau thanh toán hóa đơn điện nước gọi điện khách hàng "
+    "viết tài liệu kiểm tra mã nguồn sửa lỗi triển khai máy chủ đặt vé máy bay học tiếng "
+    "anh tập thể dục dọn dẹp nhà cửa nấu ăn đón con gửi thư chuẩn bị thuyết trình "
+    "đánh giá hiệu suất lên kế hoạch tuần sinh nhật bạn bè khám sức khỏe"
+).split()
+QUERIES = ("báo cáo", "hóa đơn điện", "thuyết", "bao cao")
+BATCH = 50_000
+
+
+def _sentence(rng: random.Random, low: int, high: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+
+def build(url: str, rows: int, users: int, with_search: bool) -> float:
+    engine = create_engine(url)
+    install_sqlite_pragmas(engine)
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        if not with_search:
+            for trigger in ("todo_fts_ai", "todo_fts_ad", "todo_fts_au"):
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+        for index in range(users):
+            conn.execute(
+                text("INSERT INTO user (email, hashed_password, is_active, role, created_at, otp_used) "
+                     "VALUES (:email, 'x', 1, 'user', CURRENT_TIMESTAMP, 0)"),
+                {"email": f"bench{index}@example.com"},
+            )
+    rng = random.Random(42)
+    started = time.perf_counter()
+    for offset in range(0, rows, BATCH):
+        batch = [
+            {
+                "title": _sentence(rng, 2, 6),
+                "description": _sentence(rng, 0, 15) or None,
+                "owner_id": rng.randint(1, users),
+            }
+            for _ in range(min(BATCH, rows - offset))
+        ]
+        with engine.begin() as conn:
+            conn.execute(
+                text("INSERT INTO todo (title, description, owner_id, is_done, created_at, updated_at) "
+                     "VALUES (:title, :description, :owner_id, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"),
+                batch,
+            )
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+    return elapsed
+
+
+def time_queries(url: str, repeat: int) -> None:
+    engine = create_engine(url)
+    install_sqlite_pragmas(engine)
+    repo = TodoRepository()
+    with Session(engine) as session:
+        set_session_override(lambda: session)
+        owner_id = session.exec(text("SELECT id FROM user ORDER BY id LIMIT 1")).scalar()
+        for q in QUERIES:
+            for mode in ("like", "fulltext"):
+                samples = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    items, total, _ = repo.list(owner_id, q=q, limit=20, search_mode=mode)
+                    samples.append((time.perf_counter() - started) * 1000)
+                print(
+                    f"q={q!r:20s} mode={mode:8s} matches={total:8d} "
+                    f"median={statistics.median(samples):9.2f} ms"
+                )
+        set_session_override(None)
+    engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        plain = build(f"sqlite:///{Path(tmp) / 'plain.db'}", args.rows, args.users, with_search=False)
+        url = f"sqlite:///{Path(tmp) / 'search.db'}"
+        indexed = build(url, args.rows, args.users, with_search=True)
+        print(f"load {args.rows} rows: {plain:.1f}s without FTS triggers, {indexed:.1f}s with")
+        time_queries(url, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+Concurrent SQLite writer benchmark.
+
+Spawns several processes (standing in for gunicorn workers) that each insert
+todos in small transactions against one SQLite file, once with the driver
+defaults and once with the pragmas from app.db.install_sqlite_pragmas.
+
+Usage: python benchmarks/sqlite_writers.py [--workers 4] [--seconds 5]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.db import _engine_options, install_sqlite_pragmas
+from app.models import Todo, User
+
+
+def _make_engine(url: str, tuned: bool):
+    engine = create_engine(url, **_engine_options(url))
+    if tuned:
+        install_sqlite_pragmas(engine)
+    return engine
+
+
+def _writer(url: str, tuned: bool, seconds: float, owner_id: int, results) -> None:
+    engine = _make_engine(url, tuned)
+    written = locked = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        try:
+            with Session(engine) as session:
+                session.add(Todo(title=f"bench {os.getpid()} {written}", owner_id=owner_id))
+                session.commit()
+            written += 1
+        except OperationalError as exc:
+            if "locked" not in str(exc):
+                raise
+            locked += 1
+    results.put((written, locked))
+
+
+def run(tuned: bool, workers: int, seconds: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        engine = _make_engine(url, tuned)
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            user = User(email="bench@example.com", hashed_password="x")
+            session.add(user)
+            session.commit()
+            owner_id = user.id
+        engine.dispose()
+
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=_writer, args=(url, tuned, seconds, owner_id, results))
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        totals = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+    written = sum(item[0] for item in totals)
+    locked = sum(item[1] for item in totals)
+    return {"writes": written, "locked_errors": locked, "writes_per_sec": written / seconds}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+    for label, tuned in (("default", False), ("tuned", True)):
+        result = run(tuned, args.workers, args.seconds)
+        print(
+            f"{label:8s} writes={result['writes']:6d} "
+            f"writes/s={result['writes_per_sec']:8.1f} locked_errors={result['locked_errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""
+Worker startup benchmark.
+
+Boots gunicorn (uvicorn workers) against a throwaway SQLite file that already
+holds the schema and reports how long each worker takes from its fork to the
+end of its lifespan startup, the time spent before the first fork, and the
+time until the first request is answered. Two layouts are compared:
+
+  per-worker  every worker migrates and ensures the admin in its lifespan
+  pre-fork    gunicorn.conf.py does that once in on_starting; workers only
+              check the schema revision
+
+Also reports the cost of ``import app.main`` in a fresh interpreter.
+
+Usage: python benchmarks/startup_time.py [--workers 4] [--rounds 3]
+"""
+import argparse
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+# "[2026-01-01 00:00:00 +0000] [1234] [INFO] ..." as written by gunicorn's error log
+LOG_PID = re.compile(r"\[[^\]]+\] \[(\d+)\]")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _env(database_url: str) -> dict:
+    env = dict(os.environ)
+    env.update(
+        DATABASE_URL=database_url,
+        DEFAULT_ADMIN_EMAIL="bench-admin@example.com",
+        DEFAULT_ADMIN_PASSWORD="bench-admin-password",
+        REMINDER_ENABLED="false",
+        PYTHONDONTWRITEBYTECODE="1",
+    )
+    env.pop("DB_INIT_ON_STARTUP", None)
+    return env
+
+
+def import_time(env: dict) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import app.main"], cwd=ROOT, env=env, check=True)
+    return time.perf_counter() - started
+
+
+def boot(config: str, workers: int, env: dict) -> dict:
+    """Launch gunicorn and time the pre-fork phase, each worker and the first 200."""
+    port = _free_port()
+    forked: dict[str, float] = {}
+    ready: dict[str, float] = {}
+    cmd = [
+        sys.executable, "-m", "gunicorn", "--config", config, "--workers", str(workers),
+        "--bind", f"127.0.0.1:{port}", "app.main:app",
+    ]
+    started = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stderr=subprocess.PIPE, text=True)
+
+    def watch() -> None:
+        for line in proc.stderr:
+            match = LOG_PID.match(line)
+            if match is None:
+                continue
+            if "Booting worker" in line:
+                forked[match.group(1)] = time.perf_counter() - started
+            elif "Application startup complete" in line:
+                ready[match.group(1)] = time.perf_counter() - started
+
+    watcher = threading.Thread(target=watch, daemon=True)
+    watcher.start()
+    first_response = None
+    try:
+        deadline = started + 60
+        while time.perf_counter() < deadline:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        first_response = time.perf_counter() - started
+                        break
+            except OSError:
+                time.sleep(0.01)
+        while len(ready) < workers and time.perf_counter() < deadline:
+            time.sleep(0.01)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+        watcher.join(timeout=5)
+    if first_response is None or len(ready) < workers:
+        raise RuntimeError(f"gunicorn ({config}) did not start {workers} workers")
+    return {
+        "pre_fork": min(forked.values()),
+        "worker_boot": sorted(ready[pid] - forked[pid] for pid in ready),
+        "first_request": first_response,
+        "all_ready": max(ready.values()),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = _env(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        # Existing database, as on every deploy after the first
+        subprocess.run([sys.executable, "-m", "app.cli", "init-db"], cwd=ROOT, env=env, check=True,
+                       stderr=subprocess.DEVNULL)
+        legacy_config = Path(tmp) / "per_worker.conf.py"
+        legacy_config.write_text('worker_class = "uvicorn.workers.UvicornWorker"\n')
+
+        imports = [import_time(env) for _ in range(args.rounds)]
+        print(f"import app.main: {statistics.median(imports) * 1000:.0f} ms (median of {args.rounds})")
+
+        for label, config in (("per-worker", str(legacy_config)), ("pre-fork", "gunicorn.conf.py")):
+            runs = [boot(config, args.workers, env) for _ in range(args.rounds)]
+
+            def median_ms(key: str) -> float:
+                return statistics.median(run[key] for run in runs) * 1000
+
+            per_worker = [statistics.median(times) * 1000 for times in zip(*(run["worker_boot"] for run in runs))]
+            print(
+                f"{label:>10}: before fork {median_ms('pre_fork'):5.0f} ms | "
+                f"worker fork-to-ready [{', '.join(f'{ms:.0f}' for ms in per_worker)}] ms | "
+                f"first request {median_ms('first_request'):5.0f} ms | "
+                f"all ready {median_ms('all_ready'):5.0f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
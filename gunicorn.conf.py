@@ -0,0 +1,27 @@
+"""
+Gunicorn settings, loaded automatically from the working directory.
+
+The database is migrated (and the default admin ensured) once in
+``on_starting``, before any worker is forked, instead of by every worker's
+lifespan. It runs in a child process so the master never imports the app or
+opens a connection that workers would inherit across fork(). Command-line
+flags (see run.py) override these values.
+"""
+import os
+import subprocess
+import sys
+
+worker_class = "uvicorn.workers.UvicornWorker"
+
+
+def on_starting(server):
+    if os.getenv("DB_INIT_ON_STARTUP", "true").strip().lower() not in {"1", "true", "yes", "on"}:
+        server.log.info("DB_INIT_ON_STARTUP is off; skipping database initialization")
+        return
+    result = subprocess.run([sys.executable, "-m", "app.cli", "init-db"])
+    if result.returncode != 0:
+        # Leave it to the workers, which retry during their own startup and fail to boot if that fails too
+        server.log.warning("Pre-fork database initialization failed; workers will initialize instead")
+        return
+    # Inherited by every worker forked from here on, including replacements
+    os.environ["DB_INIT_ON_STARTUP"] = "false"
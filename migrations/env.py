@@ -0,0 +1,64 @@
+"""Alembic environment.
+
+Runs against ``app.db.engine`` (``DATABASE_URL``) unless a connection is
+handed in through ``config.attributes["connection"]``, as ``app.db.migrate``
+and the tests do. Each revision commits on its own so a long data migration
+never holds back the schema changes before it.
+"""
+from alembic import context
+from sqlmodel import SQLModel
+
+from app.core.config import settings
+import app.models  # noqa: F401  registers the tables on SQLModel.metadata
+
+config = context.config
+target_metadata = SQLModel.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    # Full-text search objects are managed by hand in the todo_search revision
+    if type_ == "table" and name.startswith("todo_fts"):
+        return False
+    if type_ == "column" and name == "search_vector":
+        return False
+    if type_ == "index" and name == "ix_todo_search_vector":
+        return False
+    return True
+
+
+def _configure(**kwargs) -> None:
+    context.configure(
+        target_metadata=target_metadata,
+        include_object=include_object,
+        transaction_per_migration=True,
+        **kwargs,
+    )
+
+
+def run_migrations_offline() -> None:
+    _configure(url=config.get_main_option("sqlalchemy.url") or settings.DATABASE_URL, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def _run(connection) -> None:
+    _configure(connection=connection, render_as_batch=connection.dialect.name == "sqlite")
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run(connection)
+        return
+    from app.db import engine
+
+    with engine.connect() as connection:
+        _run(connection)
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,56 @@
+"""Shared building blocks for revisions.
+
+Revisions up to ``0006`` also adopt databases created by the old
+``create_all`` + ``ALTER TABLE`` startup code, which have no
+``alembic_version`` row; that is why they check before creating anything.
+Data migrations work in short keyset-paginated batches, each committed on its
+own (``autocommit_block``), so no lock on ``todo`` outlives one batch.
+"""
+from __future__ import annotations
+
+from typing import Iterator, Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+
+
+def existing_columns(table_name: str) -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table_name):
+        return set()
+    return {column["name"] for column in inspector.get_columns(table_name)}
+
+
+def add_missing_columns(table_name: str, *columns: sa.Column) -> None:
+    present = existing_columns(table_name)
+    for column in columns:
+        if column.name not in present:
+            op.add_column(table_name, column)
+
+
+def create_index_online(name: str, table_name: str, columns: Sequence[str], **kw) -> None:
+    """``CREATE INDEX [CONCURRENTLY] IF NOT EXISTS``; PostgreSQL keeps writes flowing meanwhile."""
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index(name, table_name, columns, if_not_exists=True, postgresql_concurrently=True, **kw)
+    else:
+        op.create_index(name, table_name, columns, if_not_exists=True, **kw)
+
+
+def iter_batches(query: sa.Select, id_column: sa.ColumnElement, batch_size: int | None = None) -> Iterator[list]:
+    """Yield rows of ``query`` in ``id`` order, ``batch_size`` at a time, outside any transaction.
+
+    Whatever the caller writes between two batches is committed right away.
+    """
+    connection = op.get_bind()
+    size = batch_size or settings.DB_MIGRATION_BATCH_SIZE
+    last_id = 0
+    with op.get_context().autocommit_block():
+        while True:
+            rows = connection.execute(query.where(id_column > last_id).order_by(id_column).limit(size)).all()
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1].id
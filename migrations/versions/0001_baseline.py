@@ -0,0 +1,77 @@
+"""Baseline: user and todo tables as the app first shipped them
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+Existing databases keep their tables; columns the old startup code added
+with ALTER TABLE are added here if they are still missing.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import add_missing_columns, existing_columns
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not existing_columns("user"):
+        op.create_table(
+            "user",
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("is_active", sa.Boolean(), nullable=False),
+            sa.Column("role", sa.String(length=20), nullable=False),
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("hashed_password", sa.String(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("otp_code", sa.String(length=6), nullable=True),
+            sa.Column("otp_expire", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("otp_used", sa.Boolean(), nullable=False),
+            sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_user_email", "user", ["email"], unique=True)
+    else:
+        add_missing_columns(
+            "user",
+            sa.Column("role", sa.String(length=20), nullable=False, server_default="user"),
+            sa.Column("otp_code", sa.String(length=6), nullable=True),
+            sa.Column("otp_expire", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("otp_used", sa.Boolean(), nullable=False, server_default=sa.false()),
+            sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True),
+        )
+
+    if not existing_columns("todo"):
+        op.create_table(
+            "todo",
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("description", sa.String(), nullable=True),
+            sa.Column("is_done", sa.Boolean(), nullable=False),
+            sa.Column("due_date", sa.DateTime(), nullable=True),
+            sa.Column("tags", sa.String(), nullable=True),
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("owner_id", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+            sa.Column("deleted_at", sa.DateTime(), nullable=True),
+            sa.Column("reminder_sent_at", sa.DateTime(timezone=True), nullable=True),
+            sa.ForeignKeyConstraint(["owner_id"], ["user.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    else:
+        add_missing_columns("todo", sa.Column("reminder_sent_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("todo")
+    op.drop_index("ix_user_email", table_name="user")
+    op.drop_table("user")
@@ -0,0 +1,43 @@
+"""Typed task metadata and reminder scheduling columns on todo
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:05:00.000000
+
+All nullable and without defaults, so PostgreSQL adds them as a catalog-only
+change. Rows written before them are filled by 0005 and 0006.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import add_missing_columns
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = (
+    ("priority", sa.String(length=10)),
+    ("category", sa.String(length=50)),
+    ("status", sa.String(length=20)),
+    ("reminder_minutes", sa.Integer()),
+    ("reminder_due_at", sa.DateTime(timezone=True)),
+    ("reminder_claim_token", sa.String(length=36)),
+    ("reminder_claimed_at", sa.DateTime(timezone=True)),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    add_missing_columns("todo", *(sa.Column(name, type_, nullable=True) for name, type_ in COLUMNS))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("todo") as batch_op:
+        for name, _ in reversed(COLUMNS):
+            batch_op.drop_column(name)
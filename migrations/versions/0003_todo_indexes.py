@@ -0,0 +1,52 @@
+"""Composite owner indexes, changes-feed index and the pending-reminder partial index
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 09:10:00.000000
+
+Built with CREATE INDEX CONCURRENTLY on PostgreSQL, so todo stays writable
+while they build.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import create_index_online
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OWNER_INDEXES = {
+    "ix_todo_owner_deleted_due": ["owner_id", "deleted_at", "due_date"],
+    "ix_todo_owner_deleted_created": ["owner_id", "deleted_at", "created_at"],
+    "ix_todo_owner_deleted_updated": ["owner_id", "deleted_at", "updated_at"],
+    "ix_todo_owner_deleted_priority": ["owner_id", "deleted_at", "priority"],
+    "ix_todo_owner_deleted_status": ["owner_id", "deleted_at", "status"],
+    "ix_todo_owner_deleted_category": ["owner_id", "deleted_at", "category"],
+    "ix_todo_owner_updated": ["owner_id", "updated_at", "id"],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, columns in OWNER_INDEXES.items():
+        create_index_online(name, "todo", columns)
+    pending = sa.and_(
+        sa.column("is_done") == sa.false(),
+        sa.column("reminder_sent_at").is_(None),
+        sa.column("deleted_at").is_(None),
+    )
+    create_index_online(
+        "ix_todo_reminder_pending", "todo", ["reminder_due_at"], sqlite_where=pending, postgresql_where=pending
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_todo_reminder_pending", table_name="todo")
+    for name in reversed(OWNER_INDEXES):
+        op.drop_index(name, table_name="todo")
@@ -0,0 +1,127 @@
+"""Full-text search: SQLite FTS5 table or PostgreSQL tsvector, plus indexing of existing rows
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 09:15:00.000000
+
+The triggers go in first, so rows written while the backfill runs are
+indexed by them; the backfill then commits one batch at a time. The DDL is a
+frozen copy of what ``app.repositories.todo_search`` installed at the time,
+so later changes there do not rewrite this revision.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import logger, settings
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_LETTERS = "àáảãạăằắẳẵặâầấẩẫậèéẻẽẹêềếểễệìíỉĩịòóỏõọôồốổỗộơờớởỡợùúủũụưừứửữựỳýỷỹỵđ"
+_FOLDED = "aaaaaaaaaaaaaaaaaeeeeeeeeeeeiiiiiooooooooooooooooouuuuuuuuuuuyyyyyd"
+
+
+def _sqlite_fold(expr: str) -> str:
+    return f"replace(replace(coalesce({expr}, ''), 'đ', 'd'), 'Đ', 'D')"
+
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS todo_fts USING fts5("
+    "title, description, tokenize = 'unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS todo_fts_ai AFTER INSERT ON todo BEGIN "
+    "INSERT INTO todo_fts(rowid, title, description) VALUES "
+    f"(new.id, {_sqlite_fold('new.title')}, {_sqlite_fold('new.description')}); END",
+    "CREATE TRIGGER IF NOT EXISTS todo_fts_ad AFTER DELETE ON todo BEGIN "
+    "DELETE FROM todo_fts WHERE rowid = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS todo_fts_au AFTER UPDATE OF title, description ON todo BEGIN "
+    "DELETE FROM todo_fts WHERE rowid = old.id; "
+    "INSERT INTO todo_fts(rowid, title, description) VALUES "
+    f"(new.id, {_sqlite_fold('new.title')}, {_sqlite_fold('new.description')}); END",
+]
+
+POSTGRES_DDL = [
+    "ALTER TABLE todo ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    "CREATE OR REPLACE FUNCTION todo_fold(value text) RETURNS text AS $$ "
+    f"SELECT translate(lower(coalesce(value, '')), '{_LETTERS + _LETTERS.upper()}', '{_FOLDED * 2}') "
+    "$$ LANGUAGE sql IMMUTABLE",
+    "CREATE OR REPLACE FUNCTION todo_search_vector_update() RETURNS trigger AS $$ BEGIN "
+    "NEW.search_vector := "
+    "setweight(to_tsvector('simple', todo_fold(NEW.title)), 'A') || "
+    "setweight(to_tsvector('simple', todo_fold(NEW.description)), 'B'); "
+    "RETURN NEW; END $$ LANGUAGE plpgsql",
+    "DROP TRIGGER IF EXISTS todo_search_vector_trg ON todo",
+    "CREATE TRIGGER todo_search_vector_trg BEFORE INSERT OR UPDATE OF title, description "
+    "ON todo FOR EACH ROW EXECUTE FUNCTION todo_search_vector_update()",
+    "CREATE INDEX IF NOT EXISTS ix_todo_search_vector ON todo USING GIN (search_vector)",
+]
+
+SQLITE_BACKFILL = sa.text(
+    "INSERT INTO todo_fts(rowid, title, description) "
+    f"SELECT id, {_sqlite_fold('title')}, {_sqlite_fold('description')} FROM todo "
+    "WHERE id NOT IN (SELECT rowid FROM todo_fts) ORDER BY id LIMIT :limit"
+)
+
+POSTGRES_BACKFILL = sa.text(
+    "UPDATE todo SET search_vector = "
+    "setweight(to_tsvector('simple', todo_fold(title)), 'A') || "
+    "setweight(to_tsvector('simple', todo_fold(description)), 'B') "
+    "WHERE id IN (SELECT id FROM todo WHERE search_vector IS NULL LIMIT :limit)"
+)
+
+
+def _installed(bind) -> bool:
+    inspector = sa.inspect(bind)
+    if bind.dialect.name == "sqlite":
+        return inspector.has_table("todo_fts")
+    return any(col["name"] == "search_vector" for col in inspector.get_columns("todo"))
+
+
+def _install(bind) -> bool:
+    if bind.dialect.name == "sqlite":
+        if not bind.execute(sa.text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar():
+            logger.warning("SQLite was built without FTS5; full-text search is unavailable")
+            return False
+        for statement in SQLITE_DDL:
+            op.execute(statement)
+        return True
+    try:
+        # Savepoint so a missing privilege leaves the rest of the migration intact
+        with bind.begin_nested():
+            for statement in POSTGRES_DDL:
+                bind.execute(sa.text(statement))
+    except sa.exc.SQLAlchemyError:
+        logger.warning("Full-text search is unavailable on this database", exc_info=True)
+        return False
+    return True
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name not in ("sqlite", "postgresql") or _installed(bind):
+        return
+    if not _install(bind):
+        return
+    backfill = SQLITE_BACKFILL if bind.dialect.name == "sqlite" else POSTGRES_BACKFILL
+    with op.get_context().autocommit_block():
+        while bind.execute(backfill, {"limit": settings.DB_MIGRATION_BATCH_SIZE}).rowcount:
+            pass
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        for trigger in ("todo_fts_ai", "todo_fts_ad", "todo_fts_au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS todo_fts")
+    elif op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS todo_search_vector_trg ON todo")
+        op.execute("DROP FUNCTION IF EXISTS todo_search_vector_update()")
+        op.execute("DROP FUNCTION IF EXISTS todo_fold(text)")
+        op.execute("DROP INDEX IF EXISTS ix_todo_search_vector")
+        op.execute("ALTER TABLE todo DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,105 @@
+"""Data: fill priority/category/status/reminder_minutes from the legacy tags JSON
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 09:20:00.000000
+
+Online and batched: rows are read by primary key in pages and each page is
+updated and committed on its own. The tags parsing and the defaults are a
+frozen copy of the application's rules when this revision was written.
+"""
+import json
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+from migrations.helpers import iter_batches
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VALID_PRIORITIES = ("low", "medium", "high")
+VALID_STATUSES = ("backlog", "in_progress", "done")
+DEFAULT_PRIORITY = "medium"
+DEFAULT_CATEGORY = "General"
+DEFAULT_STATUS = "backlog"
+
+todo = sa.table(
+    "todo",
+    sa.column("id", sa.Integer),
+    sa.column("tags", sa.String),
+    sa.column("priority", sa.String),
+    sa.column("category", sa.String),
+    sa.column("status", sa.String),
+    sa.column("reminder_minutes", sa.Integer),
+)
+
+
+def _lead_minutes(value: int) -> int:
+    return min(max(1, value), settings.REMINDER_MAX_LEAD_MINUTES)
+
+
+def task_meta_from_tags(raw_tags: Optional[str]) -> dict:
+    if not raw_tags:
+        return {}
+    try:
+        data = json.loads(raw_tags)
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    meta: dict = {}
+    priority = data.get("priority")
+    if isinstance(priority, str) and priority.lower() in VALID_PRIORITIES:
+        meta["priority"] = priority.lower()
+    status = data.get("status")
+    if isinstance(status, str) and status.lower() in VALID_STATUSES:
+        meta["status"] = status.lower()
+    category = data.get("category")
+    if isinstance(category, str) and category.strip():
+        meta["category"] = category.strip()[:50]
+    minutes = data.get("reminder_minutes")
+    if isinstance(minutes, (int, float)) and not isinstance(minutes, bool) and minutes > 0:
+        meta["reminder_minutes"] = _lead_minutes(int(minutes))
+    return meta
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    fill = (
+        sa.update(todo)
+        .where(todo.c.id == sa.bindparam("row_id"))
+        .values(
+            priority=sa.bindparam("new_priority"),
+            category=sa.bindparam("new_category"),
+            status=sa.bindparam("new_status"),
+            reminder_minutes=sa.bindparam("new_reminder_minutes"),
+        )
+    )
+    pending = sa.select(todo.c.id, todo.c.tags).where(todo.c.priority.is_(None))
+    for rows in iter_batches(pending, todo.c.id):
+        values = []
+        for row in rows:
+            meta = task_meta_from_tags(row.tags)
+            values.append(
+                {
+                    "row_id": row.id,
+                    "new_priority": meta.get("priority", DEFAULT_PRIORITY),
+                    "new_category": meta.get("category", DEFAULT_CATEGORY),
+                    "new_status": meta.get("status", DEFAULT_STATUS),
+                    "new_reminder_minutes": meta.get("reminder_minutes"),
+                }
+            )
+        bind.execute(fill, values)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The tags JSON is left untouched, so there is nothing to undo
+    pass
@@ -0,0 +1,85 @@
+"""Data: compute reminder_due_at for open todos written before the column existed
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 09:25:00.000000
+
+Online and batched like 0005, which it follows so per-task reminder_minutes
+are already in place. The due-time rule is a frozen copy of the application's
+when this revision was written; lead-time bounds and the timezone still come
+from the deployment's settings.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Sequence, Union
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+from migrations.helpers import iter_batches
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+todo = sa.table(
+    "todo",
+    sa.column("id", sa.Integer),
+    sa.column("due_date", sa.DateTime),
+    sa.column("deleted_at", sa.DateTime),
+    sa.column("reminder_minutes", sa.Integer),
+    sa.column("reminder_due_at", sa.DateTime(timezone=True)),
+)
+
+
+def reminder_lead_minutes(value: Optional[int]) -> int:
+    if value is None or value <= 0:
+        return max(1, settings.REMINDER_LEAD_MINUTES)
+    return min(max(1, int(value)), settings.REMINDER_MAX_LEAD_MINUTES)
+
+
+def compute_reminder_due_at(due_date: datetime, reminder_minutes: int, local_tz) -> datetime:
+    if due_date.tzinfo is None:
+        due_date = due_date.replace(tzinfo=local_tz)
+    return due_date.astimezone(timezone.utc) - timedelta(minutes=reminder_minutes)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    try:
+        local_tz = ZoneInfo(settings.APP_TIMEZONE)
+    except ZoneInfoNotFoundError:
+        local_tz = timezone.utc
+    fill = (
+        sa.update(todo)
+        .where(todo.c.id == sa.bindparam("row_id"))
+        .values(reminder_due_at=sa.bindparam("new_reminder_due_at"))
+    )
+    pending = sa.select(todo.c.id, todo.c.due_date, todo.c.reminder_minutes).where(
+        todo.c.deleted_at.is_(None),
+        todo.c.due_date.is_not(None),
+        todo.c.reminder_due_at.is_(None),
+    )
+    for rows in iter_batches(pending, todo.c.id):
+        bind.execute(
+            fill,
+            [
+                {
+                    "row_id": row.id,
+                    "new_reminder_due_at": compute_reminder_due_at(
+                        row.due_date, reminder_lead_minutes(row.reminder_minutes), local_tz
+                    ),
+                }
+                for row in rows
+            ],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Derived data only; 0002's downgrade drops the column itself
+    pass
@@ -0,0 +1,50 @@
+"""Numeric priority_rank on todo so sorting by priority can use an index
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 10:30:00.000000
+
+The column is nullable, so PostgreSQL adds it without a rewrite. Existing rows
+are ranked in committed batches, then the index is built concurrently.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import add_missing_columns, create_index_online, iter_batches
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+todo = sa.table("todo", sa.column("id", sa.Integer), sa.column("priority_rank", sa.Integer))
+
+# low < medium < high; anything else (or NULL) ranks as medium. One id window
+# per batch, so no batch rescans rows an earlier one already ranked.
+BACKFILL = sa.text(
+    "UPDATE todo SET priority_rank = CASE coalesce(priority, 'medium') "
+    "WHEN 'low' THEN 0 WHEN 'high' THEN 2 ELSE 1 END "
+    "WHERE id BETWEEN :first AND :last AND priority_rank IS NULL"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    add_missing_columns("todo", sa.Column("priority_rank", sa.Integer(), nullable=True))
+    bind = op.get_bind()
+    pending = sa.select(todo.c.id).where(todo.c.priority_rank.is_(None))
+    for rows in iter_batches(pending, todo.c.id):
+        bind.execute(BACKFILL, {"first": rows[0].id, "last": rows[-1].id})
+    create_index_online(
+        "ix_todo_owner_deleted_priority_rank", "todo", ["owner_id", "deleted_at", "priority_rank"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_todo_owner_deleted_priority_rank", table_name="todo")
+    with op.batch_alter_table("todo") as batch_op:
+        batch_op.drop_column("priority_rank")
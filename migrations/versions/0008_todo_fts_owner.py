@@ -0,0 +1,83 @@
+"""SQLite: rebuild todo_fts with an owner_id column so searches rank only the owner's rows
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 11:00:00.000000
+
+FTS5 tables cannot gain columns, so the table and its triggers are recreated
+and existing rows re-indexed one committed batch at a time, like 0004; search
+results are partial until the backfill finishes. PostgreSQL's tsvector lives
+on todo itself and is not touched.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import iter_batches
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, Sequence[str], None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGGERS = ("todo_fts_ai", "todo_fts_ad", "todo_fts_au")
+
+todo = sa.table("todo", sa.column("id", sa.Integer))
+
+
+def _fold(expr: str) -> str:
+    return f"replace(replace(coalesce({expr}, ''), 'đ', 'd'), 'Đ', 'D')"
+
+
+def _ddl(with_owner: bool) -> list[str]:
+    owner_column = ", owner_id UNINDEXED" if with_owner else ""
+    columns = "rowid, title, description" + (", owner_id" if with_owner else "")
+    values = f"new.id, {_fold('new.title')}, {_fold('new.description')}" + (", new.owner_id" if with_owner else "")
+    watched = "title, description" + (", owner_id" if with_owner else "")
+    return [
+        "CREATE VIRTUAL TABLE todo_fts USING fts5("
+        f"title, description{owner_column}, tokenize = 'unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER todo_fts_ai AFTER INSERT ON todo BEGIN INSERT INTO todo_fts({columns}) VALUES ({values}); END",
+        "CREATE TRIGGER todo_fts_ad AFTER DELETE ON todo BEGIN DELETE FROM todo_fts WHERE rowid = old.id; END",
+        f"CREATE TRIGGER todo_fts_au AFTER UPDATE OF {watched} ON todo BEGIN "
+        "DELETE FROM todo_fts WHERE rowid = old.id; "
+        f"INSERT INTO todo_fts({columns}) VALUES ({values}); END",
+    ]
+
+
+def _backfill(with_owner: bool) -> sa.TextClause:
+    """Index one id window of todo; rows the triggers already indexed meanwhile are skipped."""
+    columns = "rowid, title, description" + (", owner_id" if with_owner else "")
+    values = f"id, {_fold('title')}, {_fold('description')}" + (", owner_id" if with_owner else "")
+    return sa.text(
+        f"INSERT INTO todo_fts({columns}) SELECT {values} FROM todo "
+        "WHERE id BETWEEN :first AND :last "
+        "AND id NOT IN (SELECT rowid FROM todo_fts WHERE rowid BETWEEN :first AND :last)"
+    )
+
+
+def _rebuild(with_owner: bool) -> None:
+    bind = op.get_bind()
+    # Absent when SQLite lacks FTS5 (0004 skipped it); nothing to rebuild
+    if bind.dialect.name != "sqlite" or not sa.inspect(bind).has_table("todo_fts"):
+        return
+    for trigger in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE todo_fts")
+    for statement in _ddl(with_owner):
+        op.execute(statement)
+    backfill = _backfill(with_owner)
+    for rows in iter_batches(sa.select(todo.c.id), todo.c.id):
+        bind.execute(backfill, {"first": rows[0].id, "last": rows[-1].id})
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _rebuild(with_owner=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _rebuild(with_owner=False)
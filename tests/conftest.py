@@ -4,6 +4,8 @@ from sqlmodel import Session, create_engine, SQLModel
 from sqlmodel.pool import StaticPool
 
 from app.main import app
+from app.core.cache import token_cache, user_cache
+from app.core.config import settings
 from app.db import get_session, set_session_override
 
 
@@ -18,6 +20,8 @@ def session():
     )
     # Create all tables fresh for each test
     SQLModel.metadata.create_all(engine)
+    user_cache.clear()
+    token_cache.clear()
     
     with Session(engine) as session_instance:
         set_session_override(lambda: session_instance)
@@ -47,3 +51,10 @@ def client(session: Session):
 
 
 
+
+
+@pytest.fixture
+def metrics_headers(monkeypatch) -> dict:
+    """Configure INTERNAL_METRICS_TOKEN and return headers that pass it"""
+    monkeypatch.setattr(settings, "INTERNAL_METRICS_TOKEN", "test-metrics-token")
+    return {"Authorization": "Bearer test-metrics-token"}
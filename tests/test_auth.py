@@ -1,6 +1,22 @@
+import hashlib
+import threading
+import uuid
+from concurrent.futures import Future
+from datetime import timedelta
+from types import SimpleNamespace
+
 import pytest
 from fastapi.testclient import TestClient
-import uuid
+from sqlmodel import select
+
+from app import db
+from app.core import jwt as jwt_module
+from app.core.cache import user_cache
+from app.core.config import settings
+from app.core.exceptions import ServiceBusyError
+from app.core.password_pool import PasswordHashPool, password_pool
+from app.models import User
+from app.services import user_service
 
 
 def test_register_user(client: TestClient):
@@ -102,3 +118,166 @@ def test_get_current_user_invalid_token(client: TestClient):
     """Test accessing protected endpoint with invalid token"""
     response = client.get("/api/v1/auth/me", headers={"Authorization": "Bearer invalid"})
     assert response.status_code == 401
+
+
+def test_current_user_lookup_is_cached(client: TestClient, metrics_headers: dict):
+    """Repeated authenticated requests reuse the cached user"""
+    email = f"test-{uuid.uuid4()}@example.com"
+    client.post("/api/v1/auth/register", json={"email": email, "password": "pass123"})
+    token = client.post(
+        "/api/v1/auth/login", json={"email": email, "password": "pass123"}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    client.get("/api/v1/auth/me", headers=headers)
+    hits_before = user_cache.hits
+    response = client.get("/api/v1/auth/me", headers=headers)
+    assert response.status_code == 200
+    assert user_cache.hits == hits_before + 1
+
+    stats = client.get("/internal/user-cache", headers=metrics_headers).json()
+    assert stats["hits"] >= 1
+
+
+def test_cached_users_are_copies(client: TestClient):
+    """Mutating a user returned from the cache does not change what later lookups see"""
+    email = f"test-{uuid.uuid4()}@example.com"
+    user_id = client.post("/api/v1/auth/register", json={"email": email, "password": "pass123"}).json()["id"]
+    first = user_service.service.get_by_email(email)
+    first.is_active = False
+    first.hashed_password = "changed"
+    for cached in (user_service.service.get_by_email(email), user_service.service.get_by_id(user_id)):
+        assert cached is not first
+        assert cached.is_active is True and cached.hashed_password != "changed"
+    user_service.service.get_by_id(user_id).is_active = False
+    assert user_service.service.get_by_email(email).is_active is True
+
+
+def test_deleted_user_is_evicted_from_cache(client: TestClient):
+    """Soft-deleting a user invalidates the cached entry"""
+    email = f"test-{uuid.uuid4()}@example.com"
+    user_id = client.post(
+        "/api/v1/auth/register", json={"email": email, "password": "pass123"}
+    ).json()["id"]
+    assert user_service.service.get_by_email(email) is not None
+    assert user_service.service.delete_user(user_id) is True
+    assert user_service.service.get_by_email(email) is None
+
+
+def test_internal_metrics_token(client: TestClient, monkeypatch):
+    """Internal metrics are closed without a configured token and require it once set"""
+    monkeypatch.setattr(settings, "INTERNAL_METRICS_TOKEN", None)
+    for path in ("/internal/db-pool", "/internal/event-streams", "/internal/token-cache", "/internal/password-hashing"):
+        assert client.get(path).status_code == 403
+    monkeypatch.setattr(settings, "INTERNAL_METRICS_TOKEN", "scrape-me")
+    assert client.get("/internal/db-pool").status_code == 401
+    response = client.get("/internal/db-pool", headers={"Authorization": "Bearer scrape-me"})
+    assert response.status_code == 200
+    assert {"pool_class", "checkedout", "overflow", "wait_ms_avg"} <= set(response.json())
+
+
+def test_decoded_tokens_are_cached_until_expiry(monkeypatch, client: TestClient):
+    """A verified token is decoded once, and the cache never outlives its exp"""
+    token = jwt_module.create_access_token({"sub": "cached@example.com"}, timedelta(minutes=5))
+    calls = []
+    real_decode = jwt_module.jwt.decode
+    monkeypatch.setattr(
+        jwt_module.jwt, "decode", lambda *args, **kwargs: calls.append(1) or real_decode(*args, **kwargs)
+    )
+
+    assert jwt_module.decode_token(token) == "cached@example.com"
+    assert jwt_module.decode_token(token) == "cached@example.com"
+    assert jwt_module.decode_token("not-a-token") is None
+    assert jwt_module.decode_token("not-a-token") is None
+    assert len(calls) == 3
+
+    request = SimpleNamespace(state=SimpleNamespace())
+    jwt_module.token_cache.clear()
+    assert jwt_module.decode_request_token(request, token) == "cached@example.com"
+    assert jwt_module.decode_request_token(request, token) == "cached@example.com"
+    assert len(calls) == 4
+
+    later = jwt_module._now() + 301
+    monkeypatch.setattr(jwt_module, "_now", lambda: later)
+    assert jwt_module.decode_token(token) is None
+
+
+def test_password_hashing_pool_admission(monkeypatch, client: TestClient, metrics_headers: dict):
+    """Hashing runs on the bounded pool; a saturated pool answers 503 instead of queueing"""
+    pool = PasswordHashPool(workers=1, max_pending=2, endpoint_limit=1)
+    release = threading.Event()
+    blocker = threading.Thread(target=pool.run, args=("login", release.wait))
+    blocker.start()
+    try:
+        while pool.stats()["running"] != 1:
+            threading.Event().wait(0.01)
+        with pytest.raises(ServiceBusyError):
+            pool.run("login", len, "x")
+        assert pool.stats()["in_flight_by_endpoint"] == {"login": 1}
+    finally:
+        release.set()
+        blocker.join()
+        pool.shutdown()
+    stats = pool.stats()
+    assert stats["rejected"] == {"login": 1} and stats["pending"] == 0
+
+    email = f"busy-{uuid.uuid4()}@example.com"
+    assert client.post("/api/v1/auth/register", json={"email": email, "password": "pass123"}).status_code == 200
+    monkeypatch.setattr(password_pool, "max_pending", 0)
+    response = client.post("/api/v1/auth/login", json={"email": email, "password": "pass123"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert client.get("/internal/password-hashing", headers=metrics_headers).json()["rejected"]["login"] >= 1
+
+
+def test_outdated_password_hashes_are_upgraded(monkeypatch, session, client: TestClient):
+    """Login rehashes legacy or low-round hashes; the admin bootstrap skips hashing a valid one"""
+    def run_now(fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+    monkeypatch.setattr(user_service._rehash_executor, "submit", run_now)
+    salt = "legacysalt"
+    legacy = f"{salt}${hashlib.pbkdf2_hmac('sha256', b'pass123', salt.encode(), 100000).hex()}"
+    email = f"legacy-{uuid.uuid4()}@example.com"
+    session.add(User(email=email, hashed_password=legacy))
+    session.commit()
+
+    assert client.post("/api/v1/auth/login", json={"email": email, "password": "pass123"}).status_code == 200
+    session.expire_all()
+    upgraded = session.exec(select(User).where(User.email == email)).one().hashed_password
+    assert upgraded.startswith("$pbkdf2-sha256$") and not jwt_module.password_needs_rehash(upgraded)
+    assert client.post("/api/v1/auth/login", json={"email": email, "password": "pass123"}).status_code == 200
+
+    admin_email = f"admin-{uuid.uuid4()}@example.com"
+    session.add(User(email=admin_email, hashed_password=jwt_module.hash_password("secret"), role="admin"))
+    session.commit()
+    monkeypatch.setattr(settings, "DEFAULT_ADMIN_EMAIL", admin_email)
+    monkeypatch.setattr(settings, "DEFAULT_ADMIN_PASSWORD", "secret")
+    monkeypatch.setattr(db, "engine", session.get_bind())
+    hashed = []
+    monkeypatch.setattr(db, "hash_password", lambda password: hashed.append(password) or "unused")
+    db.ensure_default_admin()
+    assert hashed == []
+
+
+def test_password_rehash_queue_is_deduplicated_and_bounded(monkeypatch):
+    """One queued rehash per user, and jobs beyond the cap are dropped"""
+    queued = []
+    monkeypatch.setattr(user_service._rehash_executor, "submit", lambda fn, *args: queued.append(args))
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_PENDING", 2)
+    monkeypatch.setattr(user_service, "_rehash_pending", set())
+    users = [User(id=index, email=f"user{index}@example.com", hashed_password="old") for index in (1, 2, 3)]
+
+    user_service._schedule_rehash(users[0], "pass123")
+    user_service._schedule_rehash(users[0], "pass123")
+    user_service._schedule_rehash(users[1], "pass123")
+    user_service._schedule_rehash(users[2], "pass123")
+    assert [args[0] for args in queued] == [1, 2]
+
+    # A finished job frees its slot
+    monkeypatch.setattr(user_service.password_pool, "run", lambda *args: "new")
+    monkeypatch.setattr(user_service.repo, "replace_password_hash", lambda *args: False)
+    user_service._rehash_password(*queued[0])
+    user_service._schedule_rehash(users[2], "pass123")
+    assert [args[0] for args in queued] == [1, 2, 3]
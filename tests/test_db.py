@@ -0,0 +1,138 @@
+import fcntl
+from datetime import datetime
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.runtime.migration import MigrationContext
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlmodel import SQLModel, create_engine
+
+from app import cli, db, main
+from app.core.config import settings
+from app.core.exceptions import DatabaseError
+from app.db import install_sqlite_pragmas
+from app.services.todo_service import compute_reminder_due_at
+
+
+def test_sqlite_pragmas_applied_on_connect(tmp_path):
+    """File-backed SQLite connections get WAL and busy_timeout on connect"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'pragmas.db'}")
+    install_sqlite_pragmas(engine)
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar().lower() == "wal"
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+    engine.dispose()
+
+
+def test_migrations_build_the_model_schema(tmp_path, monkeypatch):
+    """Alembic head matches the models, and init_db only accepts a database at head"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    monkeypatch.setattr(db, "engine", engine)
+    db.migrate("0003")
+    with pytest.raises(DatabaseError):
+        db.init_db()
+    db.migrate()
+    db.init_db()
+
+    def include_object(obj, name, type_, reflected, compare_to):
+        return not (type_ == "table" and name.startswith("todo_fts"))
+
+    with engine.connect() as conn:
+        context = MigrationContext.configure(conn, opts={"include_object": include_object})
+        assert compare_metadata(context, SQLModel.metadata) == []
+    engine.dispose()
+
+
+def test_migrations_adopt_a_legacy_database(tmp_path, monkeypatch):
+    """A pre-Alembic database gets the new columns, indexes, search and batched backfills"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE "user" (id INTEGER PRIMARY KEY, email VARCHAR NOT NULL, hashed_password VARCHAR NOT NULL, is_active BOOLEAN NOT NULL, created_at DATETIME NOT NULL)'))
+        conn.execute(text("CREATE TABLE todo (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL, description VARCHAR, is_done BOOLEAN NOT NULL, due_date DATETIME, tags VARCHAR, owner_id INTEGER NOT NULL REFERENCES user (id), created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL, deleted_at DATETIME)"))
+        conn.execute(text("INSERT INTO user (email, hashed_password, is_active, created_at) VALUES ('a@b.c', 'x', 1, '2026-01-01')"))
+        conn.execute(text("""INSERT INTO todo (title, is_done, due_date, tags, owner_id, created_at, updated_at) VALUES ('Nộp báo cáo', 0, '2026-11-01 09:00:00.000000', '{"priority": "high", "reminder_minutes": 30}', 1, '2026-01-01', '2026-01-01')"""))
+        conn.execute(text("INSERT INTO todo (title, is_done, owner_id, created_at, updated_at) VALUES ('Đi chợ', 0, 1, '2026-01-01', '2026-01-01')"))
+    monkeypatch.setattr(db, "engine", engine)
+    monkeypatch.setattr(settings, "DB_MIGRATION_BATCH_SIZE", 1)
+    db.migrate()
+    db.init_db()
+
+    with engine.connect() as conn:
+        assert conn.execute(text('SELECT role, otp_used FROM "user"')).one() == ("user", 0)
+        rows = conn.execute(text("SELECT priority, category, status, reminder_minutes, reminder_due_at, priority_rank FROM todo ORDER BY id")).all()
+        assert [row[:4] for row in rows] == [("high", "General", "backlog", 30), ("medium", "General", "backlog", None)]
+        assert [row[5] for row in rows] == [2, 1]
+        expected_due = compute_reminder_due_at(datetime(2026, 11, 1, 9, 0), 30)
+        assert datetime.fromisoformat(rows[0][4]) == expected_due.replace(tzinfo=None) and rows[1][4] is None
+        assert conn.execute(text("SELECT rowid, owner_id FROM todo_fts WHERE todo_fts MATCH '\"bao\"'")).all() == [(1, 1)]
+        indexes = {row[0] for row in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'todo'"))}
+        assert {"ix_todo_owner_updated", "ix_todo_reminder_pending", "ix_todo_owner_deleted_priority_rank"} <= indexes
+    engine.dispose()
+
+
+def test_startup_fails_when_the_schema_check_fails(monkeypatch):
+    """A DatabaseError from init_db aborts the lifespan instead of serving requests"""
+    def behind_head():
+        raise DatabaseError("Database schema is at 0003, expected 0008")
+
+    monkeypatch.setattr(settings, "DB_INIT_ON_STARTUP", False)
+    monkeypatch.setattr(main, "init_db", behind_head)
+    with pytest.raises(DatabaseError):
+        with TestClient(main.app):
+            pass
+
+
+def test_cli_init_db_migrates_and_ensures_the_admin(tmp_path, monkeypatch):
+    """``python -m app.cli init-db`` brings a new database to head with the default admin"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'cli.db'}")
+    monkeypatch.setattr(db, "engine", engine)
+    monkeypatch.setattr(settings, "DEFAULT_ADMIN_EMAIL", "cli-admin@example.com")
+    monkeypatch.setattr(settings, "DEFAULT_ADMIN_PASSWORD", "cli-secret")
+
+    assert cli.main(["init-db"]) == 0
+    assert db.current_revisions() == db.expected_revisions()
+    with engine.connect() as conn:
+        assert conn.execute(text('SELECT role FROM "user" WHERE email = :email'), {"email": "cli-admin@example.com"}).all() == [("admin",)]
+    assert cli.main(["migrate", "no-such-revision"]) == 1
+    engine.dispose()
+
+
+def test_init_lock_holds_a_file_lock_on_sqlite(tmp_path, monkeypatch):
+    """Other processes block on ``<db>.init.lock`` while init runs, and not afterwards"""
+    database = tmp_path / "locked.db"
+    engine = create_engine(f"sqlite:///{database}")
+    monkeypatch.setattr(db, "engine", engine)
+
+    def try_lock() -> bool:
+        with open(f"{database}.init.lock", "a") as other:
+            try:
+                fcntl.flock(other, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            fcntl.flock(other, fcntl.LOCK_UN)
+            return True
+
+    with db.init_lock():
+        assert not try_lock()
+    assert try_lock()
+    engine.dispose()
+
+
+def test_lifespan_initializes_only_when_enabled(monkeypatch):
+    """DB_INIT_ON_STARTUP=false (set by gunicorn after its pre-fork run) skips migrations in workers"""
+    calls = []
+    monkeypatch.setattr(main, "init_database", lambda: calls.append("init_database"))
+    monkeypatch.setattr(main, "init_db", lambda: calls.append("init_db"))
+
+    monkeypatch.setattr(settings, "DB_INIT_ON_STARTUP", False)
+    with TestClient(main.app):
+        pass
+    assert calls == ["init_db"]
+
+    calls.clear()
+    monkeypatch.setattr(settings, "DB_INIT_ON_STARTUP", True)
+    with TestClient(main.app):
+        pass
+    assert calls == ["init_database", "init_db"]
@@ -0,0 +1,92 @@
+import re
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.models import Todo, User
+from app.repositories.todo_repository import TodoRepository
+
+FULL_SCAN = re.compile(r"\bSCAN (todo|user)\b")
+
+
+@pytest.fixture
+def captured_queries(session: Session):
+    """Record every SELECT/UPDATE issued against the test engine."""
+    engine = session.get_bind()
+    statements: list[tuple[str, object]] = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE")) and not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    yield statements
+    event.remove(engine, "before_cursor_execute", _capture)
+
+
+def _seed(session: Session) -> tuple[User, Todo]:
+    user = User(email="plans@example.com", hashed_password="x")
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+    now = datetime.now(timezone.utc)
+    todos = [
+        Todo(
+            title=f"Task {index}",
+            owner_id=user.id,
+            due_date=now + timedelta(minutes=index),
+            reminder_due_at=now + timedelta(minutes=index - 30),
+        )
+        for index in range(5)
+    ]
+    session.add_all(todos)
+    session.commit()
+    session.refresh(todos[0])
+    return user, todos[0]
+
+
+def test_repository_queries_use_indexes(session: Session, captured_queries):
+    """Fail if any TodoRepository query falls back to a full table scan"""
+    user, todo = _seed(session)
+    captured_queries.clear()
+    repo = TodoRepository()
+    now = datetime.now(timezone.utc)
+
+    repo.get(todo.id, user.id)
+    repo.list(user.id, q="Task", is_done=False, sort="-created_at")
+    repo.list(user.id, cursor=None, sort="created_at", count=False)
+    repo.list(user.id, due_from=now, due_to=now + timedelta(days=1), sort="due_date")
+    repo.list(user.id, priority="high", sort="-priority,due_date")
+    repo.list(user.id, status="backlog", sort="-updated_at", count=False)
+    repo.list(user.id, category="General")
+    repo.list(user.id, q="task", search_mode="fulltext")
+    repo.get_overdue(user.id)
+    repo.get_today(user.id)
+    repo.get_by_date(user.id, now.date())
+    repo.get_by_range(user.id, now.date(), now.date() + timedelta(days=7))
+    repo.count_by_day(user.id, now.date(), now.date() + timedelta(days=30), now)
+    repo.summary(user.id)
+    repo.list_changes(user.id, after=None, limit=100)
+    repo.change_stamp(user.id)
+    repo.list_changes(user.id, after=(now.replace(tzinfo=None), todo.id), limit=100)
+    repo.claim_due_reminders(
+        now=now,
+        earliest_due=now - timedelta(minutes=5),
+        max_lead_minutes=240,
+        token="plan-check",
+        lease_seconds=600,
+        limit=100,
+    )
+    repo.release_reminder_claims([todo.id], "plan-check")
+    repo.list_upcoming_reminders(start=now - timedelta(hours=1), until=now + timedelta(hours=1), limit=100)
+    repo.mark_reminder_sent([todo.id], now)
+
+    assert captured_queries
+    engine = session.get_bind()
+    with engine.connect() as conn:
+        for statement, parameters in captured_queries:
+            plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            details = " | ".join(row[-1] for row in plan)
+            assert not FULL_SCAN.search(details), f"full scan in plan: {details}\n{statement}"
@@ -1,12 +1,24 @@
+import asyncio
 import json
 import uuid
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 
 import pytest
+from fastapi import Request
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session
 from zoneinfo import ZoneInfo
 
 from app.core.config import settings
+from app.core.exceptions import EmailError
+from app.db import set_session_override
+from app.models import Todo
+from app.routers.auth import _user_from_token
+from app.routers.todos import stream_todos
+from app.services import reminder_service
+from app.services.event_bus import PostgresNotifyBackend, event_bus
+from app.services.todo_service import service as todo_service
 
 
 @pytest.fixture
@@ -214,8 +226,6 @@ def test_todo_with_due_date(client: TestClient, user_a_token: str):
 
 def test_reminder_scheduler_honors_local_timezone(monkeypatch, client: TestClient, user_a_token: str):
     """Ensure reminders trigger when due times are provided without timezone info"""
-    from app.services import reminder_service
-
     due_local = datetime.now(ZoneInfo(settings.APP_TIMEZONE)).replace(second=0, microsecond=0) + timedelta(minutes=9)
     due_str = due_local.strftime("%Y-%m-%dT%H:%M:%S")
 
@@ -244,10 +254,8 @@ def test_reminder_scheduler_honors_local_timezone(monkeypatch, client: TestClien
 
 
 def test_reminder_scheduler_checks_resend_api_key(monkeypatch):
-    from app.services.reminder_service import ReminderScheduler
-
     monkeypatch.delenv("RESEND_API_KEY", raising=False)
-    scheduler = ReminderScheduler()
+    scheduler = reminder_service.ReminderScheduler()
     assert scheduler._resend_ready() is False
 
     monkeypatch.setenv("RESEND_API_KEY", "re_test-key")
@@ -493,3 +501,687 @@ def test_today_endpoint(client: TestClient, user_a_token: str):
     assert response.status_code == 200
     data = response.json()
     assert data["total"] >= 1
+
+
+def test_list_todos_cursor_pagination(client: TestClient, user_a_token: str):
+    """Test keyset pagination via next_cursor"""
+    headers = {"Authorization": f"Bearer {user_a_token}"}
+    for index in range(5):
+        client.post("/api/v1/todos/", json={"title": f"Paged {index}"}, headers=headers)
+    first = client.get("/api/v1/todos/?limit=2&sort=created_at", headers=headers).json()
+    assert first["total"] == 5
+    assert first["next_cursor"]
+    seen = [item["title"] for item in first["items"]]
+    cursor = first["next_cursor"]
+    while cursor:
+        page = client.get(
+            f"/api/v1/todos/?limit=2&sort=created_at&count=false&cursor={cursor}",
+            headers=headers,
+        ).json()
+        assert page["total"] is None
+        seen.extend(item["title"] for item in page["items"])
+        cursor = page["next_cursor"]
+    assert seen == [f"Paged {index}" for index in range(5)]
+
+
+def test_default_order_matches_cursor_order(session, client: TestClient, user_a_token: str):
+    """Without sort, page 1 and cursor pages share (created_at, id) order even when ids disagree"""
+    headers = {"Authorization": f"Bearer {user_a_token}"}
+    ids = [client.post("/api/v1/todos/", json={"title": f"Backdated {index}"}, headers=headers).json()["id"] for index in range(4)]
+    # Later ids with earlier creation times, as after an import
+    for offset, todo_id in enumerate(ids):
+        session.get(Todo, todo_id).created_at = datetime(2026, 1, 10) - timedelta(days=offset)
+    session.commit()
+
+    first = client.get("/api/v1/todos/?limit=2", headers=headers).json()
+    seen = [item["id"] for item in first["items"]]
+    second = client.get(f"/api/v1/todos/?limit=2&cursor={first['next_cursor']}", headers=headers).json()
+    seen.extend(item["id"] for item in second["items"])
+    assert seen == list(reversed(ids))
+
+
+def test_list_todos_invalid_cursor(client: TestClient, user_a_token: str):
+    """Test that a malformed cursor is rejected"""
+    response = client.get(
+        "/api/v1/todos/?cursor=not-a-cursor",
+        headers={"Authorization": f"Bearer {user_a_token}"},
+    )
+    assert response.status_code == 400
+
+
+def test_request_uses_single_session(client: TestClient, session, user_a_token: str):
+    """All repository calls in one request share the request-scoped session"""
+    headers = {"Authorization": f"Bearer {user_a_token}"}
+    todo_id = client.post("/api/v1/todos/", json={"title": "Scoped"}, headers=headers).json()["id"]
+    opened: list[object] = []
+
+    def counting_factory():
+        opened.append(session)
+        return session
+
+    set_session_override(counting_factory)
+    response = client.post(f"/api/v1/todos/{todo_id}/complete", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["is_done"] is True
+    assert len(opened) == 1
+
+
+def test_mutations_are_single_statement(client: TestClient, session, user_a_token: str, user_b_token: str):
+    """complete/patch/delete issue one owner-scoped UPDATE and reject other owners"""
+    headers = {"Authorization": f"Bearer {user_a_token}"}
+    todo_id = client.post("/api/v1/todos/", json={"title": "One trip"}, headers=headers).json()["id"]
+    other = {"Authorization": f"Bearer {user_b_token}"}
+    assert client.patch(f"/api/v1/todos/{todo_id}", json={"title": "Stolen"}, headers=other).status_code == 404
+    assert client.delete(f"/api/v1/todos/{todo_id}", headers=other).status_code == 404
+
+    statements: list[str] = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if "todo" in statement:
+            statements.append(statement)
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        client.post(f"/api/v1/todos/{todo_id}/complete", headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+    assert len(statements) == 1
+    assert statements[0].lstrip().upper().startswith("UPDATE")
+
+
+def test_reminder_scan_skips_todos_not_yet_due(monkeypatch, client: TestClient, user_a_token: str):
+    """Only todos whose reminder_due_at has passed are returned by the scan"""
+    due_local = datetime.now(ZoneInfo(settings.APP_TIMEZONE)).replace(microsecond=0) + timedelta(minutes=90)
+    response = client.post(
+        "/api/v1/todos/",
+        json={
+            "title": "Later task",
+            "due_date": due_local.strftime("%Y-%m-%dT%H:%M:%S"),
+            "tags": json.dumps({"reminder_minutes": 30}),
+        },
+        headers={"Authorization": f"Bearer {user_a_token}"},
+    )
+    assert response.status_code == 200
+
+    sent_messages: list[dict] = []
+    monkeypatch.setattr(reminder_service, "send_email", lambda **kwargs: sent_messages.append(kwargs))
+    reminder_service.reminder_scheduler._process_once()
+    assert sent_messages == []
+
+    client.patch(
+        f"/api/v1/todos/{response.json()['id']}",
+        json={"tags": json.dumps({"reminder_minutes": 120})},
+        headers={"Authorization": f"Bearer {user_a_token}"},
+    )
+    reminder_service.reminder_scheduler._process_once()
+    assert len(sent_messages) == 1
+    assert "nhắc trước 120 phút" in sent_messages[0]["html_content"]
+
+
+def test_reminder_batch_send_retries_and_marks_sent(monkeypatch, client: TestClient, user_a_token: str):
+    """Due reminders go out as one batch, retried with backoff, and are flushed as sent"""
+    due_local = datetime.now(ZoneInfo(settings.APP_TIMEZONE)).replace(microsecond=0) + timedelta(minutes=5)
+    for index in range(3):
+        client.post(
+            "/api/v1/todos/",
+            json={"title": f"Batch task {index}", "due_date": due_local.strftime("%Y-%m-%dT%H:%M:%S")},
+            headers={"Authorization": f"Bearer {user_a_token}"},
+        )
+
+    batches: list[list[dict]] = []
+    keys: list[str] = []
+    attempts = {"count": 0}
+
+    def flaky_batch(messages, *, idempotency_key):  # type: ignore[no-untyped-def]
+        attempts["count"] += 1
+        keys.append(idempotency_key)
+        if attempts["count"] == 1:
+            raise EmailError("temporary failure")
+        batches.append(messages)
+
+    scheduler = reminder_service.reminder_scheduler
+    monkeypatch.setattr(reminder_service, "send_batch_emails", flaky_batch)
+    monkeypatch.setattr(scheduler, "_sleep", lambda seconds: None)
+
+    scheduler._process_once()
+    assert attempts["count"] == 2
+    assert len(batches) == 1 and len(batches[0]) == 3
+    # The retry reuses the key, so Resend drops it if the first attempt did land
+    assert keys[0] == keys[1] and keys[0].startswith("todo-reminders/")
+
+    scheduler._process_once()
+    assert len(batches) == 1
+
+
+def test_reminder_batch_falls_back_only_when_rejected(monkeypatch, client: TestClient, user_a_token: str):
+    """Individual sends follow a batch only when Resend refused it, never after an ambiguous failure"""
+    due_local = datetime.now(ZoneInfo(settings.APP_TIMEZONE)).replace(microsecond=0) + timedelta(minutes=5)
+    for index in range(2):
+        client.post(
+            "/api/v1/todos/",
+            json={"title": f"Fallback task {index}", "due_date": due_local.strftime("%Y-%m-%dT%H:%M:%S")},
+            headers={"Authorization": f"Bearer {user_a_token}"},
+        )
+
+    failure = {"rejected": False}
+    singles: list[dict] = []
+
+    def failing_batch(messages, *, idempotency_key):  # type: ignore[no-untyped-def]
+        raise EmailError("batch failed", rejected=failure["rejected"])
+
+    scheduler = reminder_service.reminder_scheduler
+    monkeypatch.setattr(reminder_service, "send_batch_emails", failing_batch)
+    monkeypatch.setattr(reminder_service, "send_email", lambda **kwargs: singles.append(kwargs))
+    monkeypatch.setattr(scheduler, "_sleep", lambda seconds: None)
+
+    # A timeout may mean the batch went out: no resend, claims handed back
+    scheduler._process_once()
+    assert singles == []
+
+    failure["rejected"] = True
+    scheduler._process_once()
+    assert len(singles) == 2
+
+
+def test_reminder_claims_are_exclusive(client: TestClient, user_a_token: str):
+    """A reminder leased by one scheduler is invisible to another until released"""
+    due_local = datetime.now(ZoneInfo(settings.APP_TIMEZONE)).replace(microsecond=0) + timedelta(minutes=5)
+    client.post(
+        "/api/v1/todos/",
+        json={"title": "Claimed task", "due_date": due_local.strftime("%Y-%m-%dT%H:%M:%S")},
+        headers={"Authorization": f"Bearer {user_a_token}"},
+    )
+    now = datetime.now(timezone.utc)
+    args = (now, now - timedelta(minutes=5), 240)
+    first = todo_service.claim_due_reminders(*args, "worker-a", 600, 100)
+    second = todo_service.claim_due_reminders(*args, "worker-b", 600, 100)
+    assert len(first) == 1
+    assert second == []
+
+    todo_service.release_reminder_claims([first[0][0].id], "worker-a")
+    assert len(todo_service.claim_due_reminders(*args, "worker-b", 600, 100)) == 1
+
+
+def test_reminder_sent_moves_updated_at(client: TestClient, user_a_token: str):
+    """Marking a reminder sent is a visible change; the scheduler's lease is not serialised"""
+    headers = {"Authorization": f"Bearer {user_a_token}"}
+    due_local = datetime.now(ZoneInfo(settings.APP_TIMEZONE)).replace(microsecond=0) + timedelta(minutes=5)
+    created = client.post(
+        "/api/v1/todos/",
+        json={"title": "Reminded task", "due_date": due_local.strftime("%Y-%m-%dT%H:%M:%S")},
+        headers=headers,
+    ).json()
+    assert "reminder_claim_token" not in created and "reminder_claimed_at" not in created
+
+    now = datetime.now(timezone.utc)
+    todo_service.claim_due_reminders(now, now - timedelta(minutes=5), 240, "worker-a", 600, 100)
+    claimed = client.get(f"/api/v1/todos/{created['id']}", headers=headers).json()
+    assert claimed["updated_at"] == created["updated_at"]
+
+    todo_service.mark_reminders_sent([created["id"]], now)
+    sent = client.get(f"/api/v1/todos/{created['id']}", headers=headers).json()
+    assert sent["reminder_sent_at"] is not None
+    assert sent["updated_at"] > created["updated_at"]
+
+
+def test_reminder_scheduler_wakes_at_next_deadline(monkeypatch, client: TestClient, user_a_token: str):
+    """A newly created todo wakes the scheduler at its reminder deadline, not on the next sweep"""
+    scheduler = reminder_service.ReminderScheduler()
+    wakeups: list[datetime] = []
+    monkeypatch.setattr(scheduler, "_interval", 3600)
+    monkeypatch.setattr(scheduler, "_process_once", lambda: wakeups.append(datetime.now(timezone.utc)))
+    due_local = datetime.now(ZoneInfo(settings.APP_TIMEZONE)) + timedelta(minutes=30, seconds=1)
+
+    async def scenario() -> None:
+        scheduler._running = True
+        scheduler._loop = asyncio.get_running_loop()
+        todo_service.subscribe(scheduler._on_todo_event)
+        task = asyncio.create_task(scheduler._run_loop())
+        try:
+            await asyncio.sleep(0.2)
+            assert len(wakeups) == 1  # startup reconcile sweep
+            response = await asyncio.to_thread(
+                client.post,
+                "/api/v1/todos/",
+                json={"title": "Soon", "due_date": due_local.strftime("%Y-%m-%dT%H:%M:%S.%f")},
+                headers={"Authorization": f"Bearer {user_a_token}"},
+            )
+            assert response.status_code == 200
+            for _ in range(50):
+                if len(wakeups) > 1:
+                    break
+                await asyncio.sleep(0.1)
+        finally:
+            todo_service.unsubscribe(scheduler._on_todo_event)
+            task.cancel()
+
+    asyncio.run(scenario())
+    assert len(wakeups) == 2
+    assert wakeups[1] >= due_local.astimezone(timezone.utc) - timedelta(minutes=30)
+
+
+def test_task_metadata_columns(client: TestClient, user_a_token: str):
+    """Priority/category/status come from explicit fields or legacy tags JSON into typed columns"""
+    headers = {"Authorization": f"Bearer {user_a_token}"}
+    response = client.post(
+        "/api/v1/todos/",
+        json={"title": "Tagged task", "tags": json.dumps({"priority": "HIGH", "category": "Work"})},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["priority"], body["category"], body["status"]) == ("high", "Work", "backlog")
+
+    response = client.patch(
+        f"/api/v1/todos/{body['id']}",
+        json={"status": "in_progress", "reminder_minutes": 15},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["status"] == "in_progress"
+    assert response.json()["reminder_minutes"] == 15
+    assert response.json()["priority"] == "high"
+
+    response = client.post("/api/v1/todos/", json={"title": "Bad", "priority": "urgent"}, headers=headers)
+    assert response.status_code == 400
+
+
+def test_put_todo_sets_typed_fields(client: TestClient, user_a_token: str):
+    """PUT applies priority, category, status and reminder_minutes and validates them like PATCH"""
+    headers = {"Authorization": f"Bearer {user_a_token}"}
+    todo_id = client.post("/api/v1/todos/", json={"title": "Replace me"}, headers=headers).json()["id"]
+    payload = {
+        "title": "Replaced",
+        "priority": "high",
+        "category": "Work",
+        "status": "in_progress",
+        "reminder_minutes": 20,
+    }
+    assert client.put(f"/api/v1/todos/{todo_id}", json=payload, headers=headers).status_code == 200
+    body = client.get(f"/api/v1/todos/{todo_id}", headers=headers).json()
+    assert (body["title"], body["priority"], body["category"], body["status"], body["reminder_minutes"]) == (
+        "Replaced", "high", "Work", "in_progress", 20
+    )
+
+    for invalid in ({"priority": "bogus"}, {"status": "later"}):
+        response = client.put(f"/api/v1/todos/{todo_id}", json={"title": "Replaced", **invalid}, headers=headers)
+        assert response.status_code == 400
+    assert client.get(f"/api/v1/todos/{todo_id}", headers=headers).json()["priority"] == "high"
+
+
+def test_list_todos_filters_and_multi_key_sort(client: TestClient, user_a_token: str):
+    """Filters and multi-key sort are applied in the query, not by the client"""
+    headers = {"Authorization": f"Bearer {user_a_token}"}
+    base = datetime(2030, 1, 10, 9, 0)
+    for title, priority, days, category in [
+        ("Low soon", "low", 1, "Home"),
+        ("High late", "high", 3, "Work"),
+        ("High soon", "high", 2, "Work"),
+        ("Medium far", "medium", 30, "Work"),
+    ]:
+        client.post(
+            "/api/v1/todos/",
+            json={
+                "title": title,
+                "priority": priority,
+                "category": category,
+                "due_date": (base + timedelta(days=days)).isoformat(),
+            },
+            headers=headers,
+        )
+
+    response = client.get(
+        "/api/v1/todos/",
+        params={"due_from": "2030-01-10T00:00:00", "due_to": "2030-01-20T00:00:00", "sort": "-priority,due_date"},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert [item["title"] for item in response.json()["items"]] == ["High soon", "High late", "Low soon"]
+    assert response.json()["total"] == 3
+
+    response = client.get("/api/v1/todos/", params={"category": "Work", "priority": "HIGH"}, headers=headers)
+    assert {item["title"] for item in response.json()["items"]} == {"High soon", "High late"}
+
+    assert client.get("/api/v1/todos/", params={"sort": "title"}, headers=headers).status_code == 400
+    assert client.get("/api/v1/todos/", params={"status": "later"}, headers=headers).status_code == 400
+    response = client.get("/api/v1/todos/", params={"sort": "due_date", "cursor": "abc"}, headers=headers)
+    assert response.status_code == 400
+
+
+def test_fulltext_search_is_accent_insensitive_and_ranked(client: TestClient, user_a_token: str, user_b_token: str):
+    """search_mode=fulltext matches folded words in title and description, best match first"""
+    headers = {"Authorization": f"Bearer {user_a_token}"}
+    for title, description in [
+        ("Đi chợ mua rau", "Rau muống và cà chua"),
+        ("Họp nhóm", "Chuẩn bị báo cáo đi công tác"),
+        ("Viết báo cáo tuần", None),
+    ]:
+        client.post("/api/v1/todos/", json={"title": title, "description": description}, headers=headers)
+    client.post(
+        "/api/v1/todos/",
+        json={"title": "Báo cáo của người khác"},
+        headers={"Authorization": f"Bearer {user_b_token}"},
+    )
+
+    response = client.get("/api/v1/todos/", params={"q": "bao cao", "search_mode": "fulltext"}, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["title"] for item in body["items"]] == ["Viết báo cáo tuần", "Họp nhóm"]
+    assert body["total"] == 2
+    assert body["items"][0]["highlight"]["title"] == "Viết <mark>báo</mark> <mark>cáo</mark> tuần"
+
+    response = client.get("/api/v1/todos/", params={"q": "di", "search_mode": "fulltext"}, headers=headers)
+    assert {item["title"] for item in response.json()["items"]} == {"Đi chợ mua rau", "Họp nhóm"}
+
+    client.patch(f"/api/v1/todos/{body['items'][0]['id']}", json={"title": "Viết tổng kết"}, headers=headers)
+    response = client.get("/api/v1/todos/", params={"q": "báo", "search_mode": "fulltext"}, headers=headers)
+    assert [item["title"] for item in response.json()["items"]] == ["Họp nhóm"]
+
+    # The default LIKE mode keeps its title-substring semantics
+    response = client.get("/api/v1/todos/", params={"q": "bao cao"}, headers=headers)
+    assert response.json()["items"] == []
+
+
+def test_calendar_month_counts(client: TestClient, user_a_token: str):
+    """The calendar endpoint groups a month's todos per local day with done/overdue counts"""
+    headers = {"Authorization": f"Bearer {user_a_token}"}
+    for title, due in [
+        ("Past open", "2020-03-02T09:00:00"),
+        ("Past done", "2020-03-02T18:30:00"),
+        ("Month end", "2020-03-31T23:59:00"),
+        ("Next month", "2020-04-01T00:00:00"),
+    ]:
+        todo = client.post("/api/v1/todos/", json={"title": title, "due_date": due}, headers=headers).json()
+        if title == "Past done":
+            client.post(f"/api/v1/todos/{todo['id']}/complete", headers=headers)
+
+    response = client.get("/api/v1/todos/calendar", params={"month": "2020-03"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {
+        "month": "2020-03",
+        "days": [
+            {"date": "2020-03-02", "total": 2, "done": 1, "overdue": 1},
+            {"date": "2020-03-31", "total": 1, "done": 0, "overdue": 1},
+        ],
+    }
+
+    # The dashboard fetches it with the session cookie instead of a bearer header
+    client.cookies.set("access_token", user_a_token)
+    response = client.get("/api/v1/todos/calendar", params={"month": "2020-04"})
+    client.cookies.clear()
+    assert response.json()["days"] == [{"date": "2020-04-01", "total": 1, "done": 0, "overdue": 1}]
+
+    assert client.get("/api/v1/todos/calendar", params={"month": "2020-13"}, headers=headers).status_code == 400
+    assert client.get("/api/v1/todos/calendar", params={"month": "2020-4"}, headers=headers).status_code == 422
+
+
+def test_get_by_date_and_range_use_local_day_bounds(client: TestClient, user_a_token: str):
+    """Day and multi-day lookups are half-open local-time ranges"""
+    headers = {"Authorization": f"Bearer {user_a_token}"}
+    for title, due in [
+        ("Late evening", "2030-05-06T23:59:00"),
+        ("Just after midnight", "2030-05-07T00:00:00"),
+        ("Week later", "2030-05-13T12:00:00"),
+    ]:
+        client.post("/api/v1/todos/", json={"title": title, "due_date": due}, headers=headers)
+    owner_id = _user_from_token(user_a_token).id
+
+    assert [t.title for t in todo_service.get_by_date(owner_id, date(2030, 5, 6))] == ["Late evening"]
+    assert [t.title for t in todo_service.get_by_date(owner_id, date(2030, 5, 7))] == ["Just after midnight"]
+    week = todo_service.get_by_range(owner_id, date(2030, 5, 7), date(2030, 5, 14))
+    assert [t.title for t in week] == ["Just after midnight", "Week later"]
+
+
+def test_batch_operations_report_per_item_results(client: TestClient, session, user_a_token: str, user_b_token: str):
+    """Mixed batch ops run in one unit of work, creates as a single INSERT, with per-item results"""
+    headers = {"Authorization": f"Bearer {user_a_token}"}
+    existing = client.post("/api/v1/todos/", json={"title": "Existing"}, headers=headers).json()["id"]
+    foreign = client.post(
+        "/api/v1/todos/", json={"title": "Not mine"}, headers={"Authorization": f"Bearer {user_b_token}"}
+    ).json()["id"]
+
+    inserts: list[bool] = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("INSERT INTO TODO "):
+            inserts.append(executemany)
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        response = client.post(
+            "/api/v1/todos/batch",
+            json={
+                "operations": [
+                    {"op": "create", "data": {"title": "Batch one", "priority": "high"}},
+                    {"op": "create", "data": {"title": "Batch two"}},
+                    {"op": "create", "data": {"title": "x"}},
+                    {"op": "update", "id": existing, "data": {"status": "in_progress"}},
+                    {"op": "complete", "id": existing},
+                    {"op": "complete", "id": foreign},
+                    {"op": "delete", "id": existing},
+                    {"op": "delete"},
+                ]
+            },
+            headers=headers,
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (5, 3)
+    results = body["results"]
+    assert [r["status"] for r in results] == [201, 201, 400, 200, 200, 404, 204, 400]
+    assert results[0]["item"]["priority"] == "high"
+    assert results[2]["error"].startswith("title")
+    assert results[4]["item"]["status"] == "in_progress" and results[4]["item"]["is_done"] is True
+    # Both creates go out in one insertmanyvalues flush, not two single-row INSERTs
+    assert inserts and all(inserts)
+
+    titles = [t["title"] for t in client.get("/api/v1/todos/", headers=headers).json()["items"]]
+    assert sorted(titles) == ["Batch one", "Batch two"]
+
+    too_many = {"operations": [{"op": "delete", "id": 1}] * (settings.TODO_BATCH_MAX_ITEMS + 1)}
+    assert client.post("/api/v1/todos/batch", json=too_many, headers=headers).status_code == 400
+    assert client.post("/api/v1/todos/batch", json={"operations": []}, headers=headers).status_code == 422
+
+
+def test_changes_feed_returns_updates_and_tombstones(
+    monkeypatch, client: TestClient, user_a_token: str, user_b_token: str
+):
+    """The changes feed pages by watermark and reports deletes as tombstones"""
+    monkeypatch.setattr(settings, "CHANGES_SAFETY_LAG_SECONDS", 0)
+    headers = {"Authorization": f"Bearer {user_a_token}"}
+    ids = [
+        client.post("/api/v1/todos/", json={"title": f"Sync {index}"}, headers=headers).json()["id"]
+        for index in range(3)
+    ]
+    client.post("/api/v1/todos/", json={"title": "Other user"}, headers={"Authorization": f"Bearer {user_b_token}"})
+
+    first = client.get("/api/v1/todos/changes", params={"limit": 2}, headers=headers).json()
+    assert [item["id"] for item in first["items"]] == ids[:2] and first["has_more"] is True
+    rest = client.get("/api/v1/todos/changes", params={"since": first["watermark"]}, headers=headers).json()
+    assert [item["id"] for item in rest["items"]] == ids[2:] and rest["has_more"] is False
+    watermark = rest["watermark"]
+
+    idle = client.get("/api/v1/todos/changes", params={"since": watermark}, headers=headers).json()
+    assert idle == {"items": [], "tombstones": [], "watermark": watermark, "has_more": False}
+
+    client.patch(f"/api/v1/todos/{ids[0]}", json={"title": "Sync renamed"}, headers=headers)
+    client.delete(f"/api/v1/todos/{ids[1]}", headers=headers)
+    delta = client.get("/api/v1/todos/changes", params={"since": watermark}, headers=headers).json()
+    assert [item["title"] for item in delta["items"]] == ["Sync renamed"]
+    assert [tombstone["id"] for tombstone in delta["tombstones"]] == [ids[1]]
+    assert delta["tombstones"][0]["deleted_at"] is not None
+
+    assert client.get("/api/v1/todos/changes", params={"since": "bogus"}, headers=headers).status_code == 400
+
+
+def test_changes_feed_does_not_skip_late_commits(monkeypatch, session, client: TestClient, user_a_token: str):
+    """A row stamped before another but committed after it still reaches a client that synced in between"""
+    headers = {"Authorization": f"Bearer {user_a_token}"}
+    owner_id = _user_from_token(user_a_token).id
+
+    # Transaction 1 stamps updated_at, then stalls before committing
+    slow = Session(session.get_bind())
+    late = Todo(title="Slow writer", owner_id=owner_id, updated_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+    # Transaction 2 stamps later and commits first; a client syncs in between
+    fast_id = client.post("/api/v1/todos/", json={"title": "Fast writer"}, headers=headers).json()["id"]
+    synced = client.get("/api/v1/todos/changes", headers=headers).json()
+    assert [item["id"] for item in synced["items"]] == [fast_id]
+    slow.add(late)
+    slow.commit()
+    late_id = late.id
+    slow.close()
+
+    delta = client.get("/api/v1/todos/changes", params={"since": synced["watermark"]}, headers=headers).json()
+    assert [item["id"] for item in delta["items"]] == [late_id, fast_id]
+
+    # Once both are older than the lag the watermark moves past them for good
+    monkeypatch.setattr(settings, "CHANGES_SAFETY_LAG_SECONDS", 0)
+    settled = client.get("/api/v1/todos/changes", params={"since": delta["watermark"]}, headers=headers).json()
+    assert [item["id"] for item in settled["items"]] == [late_id, fast_id]
+    idle = client.get("/api/v1/todos/changes", params={"since": settled["watermark"]}, headers=headers).json()
+    assert idle["items"] == [] and idle["watermark"] == settled["watermark"]
+
+
+def test_list_and_detail_support_conditional_get(monkeypatch, client: TestClient, user_a_token: str):
+    """ETags revalidate with 304 until one of the user's todos changes"""
+    headers = {"Authorization": f"Bearer {user_a_token}"}
+    todo_id = client.post("/api/v1/todos/", json={"title": "Cached"}, headers=headers).json()["id"]
+
+    # A write younger than the safety lag may still be racing an older commit
+    fresh = client.get("/api/v1/todos/", params={"limit": 5}, headers=headers)
+    assert client.get(
+        "/api/v1/todos/", params={"limit": 5}, headers={**headers, "If-None-Match": fresh.headers["ETag"]}
+    ).status_code == 200
+
+    monkeypatch.setattr(settings, "CHANGES_SAFETY_LAG_SECONDS", 0)
+    listing = client.get("/api/v1/todos/", params={"limit": 5}, headers=headers)
+    etag = listing.headers["ETag"]
+    assert listing.headers["Cache-Control"] == "private, no-cache"
+    revalidated = client.get("/api/v1/todos/", params={"limit": 5}, headers={**headers, "If-None-Match": etag})
+    assert revalidated.status_code == 304 and revalidated.headers["ETag"] == etag
+    other_query = client.get("/api/v1/todos/", params={"limit": 6}, headers={**headers, "If-None-Match": etag})
+    assert other_query.status_code == 200
+
+    detail_etag = client.get(f"/api/v1/todos/{todo_id}", headers=headers).headers["ETag"]
+    assert detail_etag != etag
+    assert client.get(
+        f"/api/v1/todos/{todo_id}", headers={**headers, "If-None-Match": f'W/{detail_etag}'}
+    ).status_code == 304
+
+    client.patch(f"/api/v1/todos/{todo_id}", json={"title": "Cached again"}, headers=headers)
+    changed = client.get("/api/v1/todos/", params={"limit": 5}, headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    assert changed.json()["items"][0]["title"] == "Cached again"
+    assert client.get(
+        f"/api/v1/todos/{todo_id}", headers={**headers, "If-None-Match": detail_etag}
+    ).status_code == 200
+
+
+def test_event_stream_delivers_owner_changes(client: TestClient, user_a_token: str, user_b_token: str):
+    """Committed mutations reach the owner's open streams as SSE events, and only theirs"""
+    headers = {"Authorization": f"Bearer {user_a_token}"}
+    owner_id = _user_from_token(user_a_token).id
+    other_id = _user_from_token(user_b_token).id
+
+    async def scenario():
+        subscription = event_bus.connect(owner_id)
+        bystander = event_bus.connect(other_id)
+        disconnected = asyncio.Event()
+        stream = event_bus.stream(subscription, lambda: asyncio.sleep(0, disconnected.is_set()), heartbeat=1)
+        try:
+            assert await stream.__anext__() == "retry: 5000\n\n"
+            assert (await stream.__anext__()).startswith("event: ready")
+            created = await asyncio.to_thread(
+                client.post, "/api/v1/todos/", json={"title": "Live one"}, headers=headers
+            )
+            todo_id = created.json()["id"]
+            await asyncio.to_thread(
+                client.patch, f"/api/v1/todos/{todo_id}", json={"title": "Live two"}, headers=headers
+            )
+            await asyncio.to_thread(client.delete, f"/api/v1/todos/{todo_id}", headers=headers)
+            frames = [await stream.__anext__() for _ in range(3)]
+            assert [frame.split("\n")[0] for frame in frames] == [
+                "event: created", "event: updated", "event: deleted"
+            ]
+            updated = json.loads(frames[1].split("data: ", 1)[1])
+            assert updated["id"] == todo_id and updated["todo"]["title"] == "Live two"
+            assert bystander.queue.empty()
+            assert event_bus.stats()["connections"] == 2
+        finally:
+            disconnected.set()
+            await stream.aclose()
+            event_bus.disconnect(bystander)
+        assert event_bus.stats()["connections"] == 0
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        event_bus.stop()
+
+
+def test_unit_of_work_events_are_published_together(client: TestClient, user_a_token: str):
+    """A batch request reaches listeners as one list, and NOTIFY payloads pack several events"""
+    received: list[list] = []
+    todo_service.subscribe(received.append)
+    try:
+        client.post(
+            "/api/v1/todos/batch",
+            json={"operations": [{"op": "create", "data": {"title": f"Grouped {index}"}} for index in range(3)]},
+            headers={"Authorization": f"Bearer {user_a_token}"},
+        )
+    finally:
+        todo_service.unsubscribe(received.append)
+    assert [[item.kind for item in events] for events in received] == [["created"] * 3]
+
+    backend = PostgresNotifyBackend("postgresql://unused")
+    messages = [{"kind": "updated", "todo_id": index, "owner_id": 1, "data": {"title": "x" * 3000}} for index in range(5)]
+    messages.append({"kind": "updated", "todo_id": 9, "owner_id": 1, "data": {"title": "x" * 9000}})
+    payloads = backend._pack(messages)
+    assert len(payloads) == 3
+    assert all(len(payload.encode()) <= backend.MAX_PAYLOAD for payload in payloads)
+    unpacked = [message for payload in payloads for message in json.loads(payload)]
+    assert [message["todo_id"] for message in unpacked] == [0, 1, 2, 3, 4, 9]
+    assert unpacked[-1]["data"] == {}
+
+
+def test_event_stream_slot_is_released_when_the_body_never_starts(user_a_token: str):
+    """A response that fails before its first chunk still frees its connection slot"""
+    owner = _user_from_token(user_a_token)
+
+    async def scenario():
+        scope = {"type": "http", "asgi": {"spec_version": "2.4"}, "method": "GET", "headers": []}
+
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            raise RuntimeError("client went away")
+
+        response = await stream_todos(Request(scope, receive), owner)
+        assert event_bus.stats()["connections"] == 1
+        with pytest.raises(RuntimeError):
+            await response(scope, receive, send)
+        assert event_bus.stats()["connections"] == 0
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        event_bus.stop()
+
+
+def test_event_stream_connections_are_bounded(monkeypatch, client: TestClient, user_a_token: str):
+    """Past the per-worker limit the stream endpoint answers 503 with Retry-After"""
+    monkeypatch.setattr(event_bus, "max_connections", 0)
+    try:
+        client.cookies.set("access_token", user_a_token)
+        response = client.get("/api/v1/todos/stream")
+        client.cookies.clear()
+    finally:
+        event_bus.stop()
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"